@@ -4,7 +4,56 @@ from pydantic import BaseSettings
 class Settings(BaseSettings):
     MONGO_URL: str = "mongodb://localhost:27017"
     MONGO_DB: str = "malta_trip_buddy"
+    # Motor connection pool (these override the same options in MONGO_URL);
+    # MONGO_MIN_POOL_SIZE connections are opened at startup and kept warm
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 5
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    # How long a request waits for a free pooled connection before failing
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 2000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    # Wire compression, in order of preference ("zstd,snappy,zlib"; zstd
+    # and snappy need their optional packages); empty disables it
+    MONGO_COMPRESSORS: str = "zlib"
     JWT_SECRET: str = "supersecretkey"
     JWT_ALGORITHM: str = "HS256"
+    # "mongo" stores data in MongoDB; "memory" keeps it in this process
+    # (tests and benchmarks, nothing is persisted)
+    STORAGE_BACKEND: str = "mongo"
+    # "memory" serves /places/nearby from the in-process grid index,
+    # "mongo" asks the places repository ($geoNear on places.geo in Mongo)
+    GEO_BACKEND: str = "memory"
+    # Shared LRU + TTL cache of user documents used by the auth dependencies
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    # Ranked recommendation bands kept per preference signature
+    RECOMMENDATION_CACHE_SIZE: int = 1024
+    # Embed role/preferences in access tokens so read-only routes skip the
+    # user lookup; revocations reach every worker within the refresh interval
+    JWT_EMBED_CLAIMS: bool = False
+    TOKEN_VERSION_REFRESH_SECONDS: float = 30.0
+    # bcrypt cost; existing hashes are upgraded on the next successful login
+    BCRYPT_ROUNDS: int = 12
+    # Password hashing runs in a thread pool; beyond HASH_MAX_PENDING queued
+    # or running hashes, /auth/register and /auth/login answer 503
+    HASH_POOL_WORKERS: int = 4
+    HASH_MAX_PENDING: int = 32
+    # Write-behind sync of profile fields onto user documents
+    USER_SYNC_FLUSH_INTERVAL_MS: int = 50
+    USER_SYNC_BATCH_SIZE: int = 500
+    USER_SYNC_MAX_RETRIES: int = 5
+    # Largest accepted place image upload
+    MAX_IMAGE_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    # Processes resizing uploaded images into WebP variants
+    IMAGE_WORKERS: int = 2
+    # Request metrics middleware and the Prometheus /metrics endpoint
+    METRICS_ENABLED: bool = True
+    # Trace Mongo commands per route and query shape (/admin/stats/queries);
+    # commands slower than SLOW_QUERY_MS are logged, and that fraction of
+    # them also gets its plan explained (at most once a minute per shape)
+    DB_TRACING_ENABLED: bool = True
+    SLOW_QUERY_MS: float = 100.0
+    SLOW_QUERY_EXPLAIN_RATE: float = 0.1
 
 settings = Settings()
@@ -1,8 +1,21 @@
 # app/database.py
 import motor.motor_asyncio
 from .config import settings
+from .utils.db_tracing import command_tracer
 
-client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URL)
+# Command monitoring feeds the per-route query stats (utils/db_tracing.py)
+listeners = [command_tracer] if settings.DB_TRACING_ENABLED else []
+pool_options = dict(
+    maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+    minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+    waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+)
+if settings.MONGO_COMPRESSORS:
+    pool_options["compressors"] = settings.MONGO_COMPRESSORS
+client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URL, event_listeners=listeners, **pool_options)
 db = client[settings.MONGO_DB]
 
 # Define collections
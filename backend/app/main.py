@@ -1,10 +1,73 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from app.routers import auth, recommendations, users, places, profile   # import your routers
 from app.routers import admin
+from app import repositories
+from app.config import settings
+from app.utils.catalog import place_catalog
+from app.utils.image_variants import shutdown_pool
+from app.utils.images import STATIC_PLACES_DIR, UploadSizeLimit
+from app.utils.scoring import ScoringEngine
+from app.utils import metrics
+from app.utils.db_tracing import command_tracer
+from app.utils.static_files import PlaceImageFiles
+from app.utils.token_versions import token_versions
+from app.utils.write_behind import user_sync
+
+logger = logging.getLogger(__name__)
+
+# Set once startup has finished (indexes, pool, warm caches) and cleared
+# when shutdown begins; reported by /ready
+readiness = {"ready": False, "startup_ms": None}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    if settings.STORAGE_BACKEND == "mongo":
+        from app.database import client
+        # Opens the pool's first connections and fails fast if Mongo is unreachable
+        await client.admin.command("ping")
+        if settings.DB_TRACING_ENABLED:
+            command_tracer.attach(client)  # slow-query explains run on this loop
+    try:
+        await repositories.ensure_indexes()
+    except repositories.DuplicateKeys as e:
+        # Serving without the unique index would let register/upserts add more duplicates
+        logger.error("startup aborted: %s", e)
+        raise
+
+    # Load the catalog (and the index, geo grid and clusters that follow it)
+    # and build the scoring arrays so the first requests don't pay for them
+    await place_catalog.ensure_loaded()
+    await place_catalog.get_derived("scoring", ScoringEngine)
+
+    if settings.JWT_EMBED_CLAIMS:
+        await token_versions.refresh()
+        token_versions.start(settings.TOKEN_VERSION_REFRESH_SECONDS)
+    user_sync.start()
 
-app = FastAPI(title="Malta Trip Buddy API")
+    readiness["startup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    readiness["ready"] = True
+    logger.info("ready after %.1f ms with %d places", readiness["startup_ms"], len(await place_catalog.get_places()))
+    try:
+        yield
+    finally:
+        readiness["ready"] = False
+        await token_versions.stop()
+        await user_sync.stop()  # flushes pending user updates
+        shutdown_pool()
+
+app = FastAPI(title="Malta Trip Buddy API", lifespan=lifespan)
+
+# 413 for oversized image uploads before their body is buffered (inside CORS,
+# so the browser can read the error)
+app.add_middleware(UploadSizeLimit, paths=["/admin/places/upload-image"])
 
 # Enable CORS for frontend communication
 app.add_middleware(
@@ -13,8 +76,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # cursor of the next page on paginated lists
 )
 
+# Per-route request counts, in-flight requests and latency histograms for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(users.router)  # /users routes
@@ -23,9 +91,23 @@ app.include_router(places.router, prefix="/places", tags=["places"])
 app.include_router(profile.router)  # /profile routes
 app.include_router(admin.router)  # /admin routes
 
-# Serve static files for uploaded place images
+# Serve uploaded place images with long-lived caching (utils/static_files.py);
+# the /static/places mount must come before the generic /static one
+app.mount("/static/places", PlaceImageFiles(STATIC_PLACES_DIR), name="place-images")
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    """Readiness probe: 200 once startup has warmed everything, 503 before and while shutting down."""
+    if not readiness["ready"]:
+        return JSONResponse({"status": "starting"}, status_code=503)
+    return {"status": "ready", "startup_ms": readiness["startup_ms"], "catalog": place_catalog.stats_dict()}
+
 @app.get("/")
 async def root():
     return {"message": "Malta Trip Buddy API is running!"}
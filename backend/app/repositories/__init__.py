@@ -0,0 +1,40 @@
+# app/repositories/__init__.py
+"""Storage for users, profiles and places, selected by `STORAGE_BACKEND`.
+
+- "mongo" (default): Motor collections from `app/database.py`
+- "memory": plain dicts in this process (tests, benchmarks, profiling)
+
+Import the instances from here rather than the backend modules:
+
+    from ..repositories import places, profiles, users
+"""
+from ..config import settings
+from .base import DuplicateKeys, PlaceRepository, ProfileRepository, UserRepository
+
+if settings.STORAGE_BACKEND == "memory":
+    from .memory import MemoryPlaceRepository, MemoryProfileRepository, MemoryUserRepository
+
+    users: UserRepository = MemoryUserRepository()
+    profiles: ProfileRepository = MemoryProfileRepository()
+    places: PlaceRepository = MemoryPlaceRepository()
+elif settings.STORAGE_BACKEND == "mongo":
+    from ..database import db
+    from .mongo import MongoPlaceRepository, MongoProfileRepository, MongoUserRepository
+
+    users = MongoUserRepository(db.users)
+    profiles = MongoProfileRepository(db.profiles)
+    places = MongoPlaceRepository(db.places, db.place_images)
+else:
+    raise ValueError(f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r} (expected 'mongo' or 'memory')")
+
+
+async def ensure_indexes():
+    """Create every index the app relies on (idempotent, once per process).
+
+    Unique `users.email` (register relies on DuplicateKeyError), unique
+    `profiles.user_id`, and the place list, name and geo indexes. Raises
+    DuplicateKeys if existing data already breaks a unique key.
+    """
+    await users.ensure_indexes()
+    await profiles.ensure_indexes()
+    await places.ensure_indexes()
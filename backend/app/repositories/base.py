@@ -0,0 +1,157 @@
+# app/repositories/base.py
+"""Storage interfaces for users, profiles and places.
+
+Documents are plain dicts shaped like the Mongo documents (`_id` is an
+ObjectId), so routers and utils don't care which backend is in use. Both
+backends raise pymongo's DuplicateKeyError for unique-key violations and
+bson's InvalidId for malformed ids.
+
+Every place write increments the place's `rev` (missing on documents
+written before it existed, which counts as 0). Single-place ETags and
+admin `If-Match` checks are built on it (app/utils/etags.py).
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+
+class DuplicateKeys(Exception):
+    """A unique index can't be built: existing documents share a key value."""
+
+    def __init__(self, collection: str, key: str, examples: List):
+        self.collection = collection
+        self.key = key
+        self.examples = examples
+        super().__init__(
+            f"{collection}.{key} must be unique but has duplicate values (e.g. {examples}); "
+            f"merge or delete the duplicates and restart (README: Duplicate users or profiles)"
+        )
+
+
+class UserRepository(ABC):
+    @abstractmethod
+    async def ensure_indexes(self):
+        """Unique index on email (created once per process)."""
+
+    @abstractmethod
+    async def get(self, user_id) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def create(self, doc: dict) -> str:
+        """Insert a user (sets `doc["_id"]`) and return its id. Emails are unique."""
+
+    @abstractmethod
+    async def update(self, user_id, fields: dict):
+        ...
+
+    @abstractmethod
+    async def bulk_update(self, updates: Dict[str, dict]):
+        """`$set` fields on many users at once (unordered)."""
+
+    @abstractmethod
+    async def bump_token_version(self, user_id, now: datetime) -> Optional[int]:
+        """Increment `token_version`, set `auth_updated_at`; return the new version."""
+
+    @abstractmethod
+    def iter_auth_updated(self, since: Optional[datetime]) -> AsyncIterator[dict]:
+        """Users whose `auth_updated_at` is set (and >= `since` when given)."""
+
+    @abstractmethod
+    def iterate(self) -> AsyncIterator[dict]:
+        ...
+
+
+class ProfileRepository(ABC):
+    @abstractmethod
+    async def ensure_indexes(self):
+        """Unique index on user_id (created once per process)."""
+
+    @abstractmethod
+    async def get_by_user(self, user_id: ObjectId) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def upsert_for_user(self, user_id: ObjectId, fields: dict) -> dict:
+        """Create or update the user's profile and return it."""
+
+
+class PlaceRepository(ABC):
+    @abstractmethod
+    async def ensure_indexes(self):
+        """Indexes for list filters, the name natural key and geo queries (once per process)."""
+
+    @abstractmethod
+    async def all(self) -> List[dict]:
+        ...
+
+    @abstractmethod
+    async def get(self, place_id: ObjectId) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def find_page(
+        self, query: dict, after: Optional[ObjectId], limit: int, projection: Optional[dict] = None
+    ) -> List[dict]:
+        """Up to `limit` places matching `query` with `_id` > `after`, in `_id` order."""
+
+    @abstractmethod
+    def iterate(self, query: Optional[dict] = None, projection: Optional[dict] = None) -> AsyncIterator[dict]:
+        """Places matching `query` in `_id` order."""
+
+    @abstractmethod
+    async def insert(self, doc: dict):
+        """Insert a place; sets `doc["_id"]` and `doc["rev"]`."""
+
+    @abstractmethod
+    async def update(
+        self, place_id: ObjectId, fields: dict, unset: Tuple[str, ...] = (), revisions: Optional[List[int]] = None
+    ) -> Optional[dict]:
+        """`$set` fields (and `$unset` others) and bump `rev`; returns the updated place.
+
+        With `revisions`, only a place whose current `rev` is one of them is
+        updated. None if no place matched.
+        """
+
+    @abstractmethod
+    async def bulk_update(self, updates: List[Tuple[ObjectId, dict, Tuple[str, ...]]]) -> int:
+        """Unordered `(place id, fields to $set, fields to $unset)` updates, each bumping `rev`.
+
+        Returns how many places were modified.
+        """
+
+    @abstractmethod
+    async def delete(self, place_id: ObjectId) -> bool:
+        ...
+
+    @abstractmethod
+    async def bulk_upsert(self, items: List[Tuple[dict, dict, Tuple[str, ...]]]) -> dict:
+        """Unordered `(key, fields to $set, fields to $unset)` upserts; `rev` is bumped only where a field changes.
+
+        Returns Mongo's bulk result counts (`nUpserted`, `nModified`,
+        `nMatched`) and `writeErrors` (`index`, `errmsg`) for failed items.
+        """
+
+    @abstractmethod
+    async def near(
+        self, lat: float, lng: float, radius_km: Optional[float], category: Optional[str], limit: int
+    ) -> List[dict]:
+        """Nearest places first, each with `distance_m`."""
+
+    @abstractmethod
+    async def set_image_variants(self, image_url: str, info: dict) -> int:
+        """Set `image_variants` on every place using `image_url`; returns how many changed (and got a new `rev`)."""
+
+    @abstractmethod
+    async def get_image_variants(self, filename: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def save_image_variants(self, filename: str, info: dict):
+        ...
@@ -0,0 +1,398 @@
+# app/repositories/memory.py
+"""In-process implementations of the repositories.
+
+Used with `STORAGE_BACKEND=memory` for tests and benchmarks: no MongoDB,
+no network round trips. Only the query shapes the app uses are supported
+(equality, `$gt`/`$gte`/`$lt`/`$lte`, `$in`, `$all`, `$ne`, `$exists` and
+`$regex`, with Mongo's array-field semantics), plus include/exclude
+projections. Unique emails and one profile per user are enforced like the
+Mongo indexes would.
+
+Documents are copied on the way in and out, so callers can mutate what
+they get back as they would a Mongo result. `clear()` drops everything a
+repository holds, so tests sharing one process can each start empty.
+"""
+import re
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from .base import PlaceRepository, ProfileRepository, UserRepository
+
+_MISSING = object()
+
+
+def _copy(doc: dict) -> dict:
+    # Two levels deep: enough for tags, location and the like.
+    return {k: (v.copy() if isinstance(v, (dict, list)) else v) for k, v in doc.items()}
+
+
+def _bump_rev(doc: dict):
+    doc["rev"] = doc.get("rev", 0) + 1
+
+
+def _oid(value) -> ObjectId:
+    return value if isinstance(value, ObjectId) else ObjectId(value)
+
+
+def _get(doc: dict, path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _compare(value: Any, op: str, arg: Any) -> bool:
+    if isinstance(value, list):
+        return any(_compare(v, op, arg) for v in value)
+    if value is _MISSING or value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > arg
+        if op == "$gte":
+            return value >= arg
+        if op == "$lt":
+            return value < arg
+        return value <= arg
+    except TypeError:
+        return False
+
+
+def _equals(value: Any, expected: Any) -> bool:
+    if value is _MISSING:
+        return expected is None
+    if value == expected:
+        return True
+    return isinstance(value, list) and expected in value
+
+
+def _match_condition(value: Any, condition: Any) -> bool:
+    if not (isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition)):
+        return _equals(value, condition)
+    for op, arg in condition.items():
+        if op in ("$gt", "$gte", "$lt", "$lte"):
+            ok = _compare(value, op, arg)
+        elif op == "$in":
+            ok = any(_equals(value, a) for a in arg)
+        elif op == "$all":
+            ok = isinstance(value, list) and all(a in value for a in arg)
+        elif op == "$ne":
+            ok = not _equals(value, arg)
+        elif op == "$exists":
+            ok = (value is not _MISSING) == bool(arg)
+        elif op == "$regex":
+            flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+            values = value if isinstance(value, list) else [value]
+            ok = any(isinstance(v, str) and re.search(arg, v, flags) for v in values)
+        elif op == "$options":
+            continue
+        else:
+            raise ValueError(f"unsupported query operator {op}")
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc: dict, query: Optional[dict]) -> bool:
+    return all(_match_condition(_get(doc, path), cond) for path, cond in (query or {}).items())
+
+
+def project(doc: dict, projection: Optional[dict]) -> dict:
+    if not projection:
+        return _copy(doc)
+    include = {k for k, v in projection.items() if v}
+    if not include:
+        return _copy({k: v for k, v in doc.items() if k not in projection})
+    out: Dict[str, Any] = {"_id": doc["_id"]} if projection.get("_id", 1) else {}
+    for path in include:
+        value = _get(doc, path)
+        if value is _MISSING or path == "_id":
+            continue
+        *parents, leaf = path.split(".")
+        target = out
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value.copy() if isinstance(value, (dict, list)) else value
+    return out
+
+
+class _Collection:
+    """Documents by `_id`, with the ids kept sorted for `_id`-ordered scans.
+
+    String values of the `indexed` fields are also kept in value -> ids maps,
+    so `find_one` by one of them (a natural key) doesn't scan. Documents
+    must then be changed through `update`.
+    """
+
+    def __init__(self, indexed: Tuple[str, ...] = ()):
+        self.docs: Dict[Any, dict] = {}
+        self.ids: List[Any] = []
+        self._indexes: Dict[str, Dict[str, set]] = {field: {} for field in indexed}
+
+    def _index(self, doc: dict):
+        for field, index in self._indexes.items():
+            value = doc.get(field)
+            if isinstance(value, str):
+                index.setdefault(value, set()).add(doc["_id"])
+
+    def _unindex(self, doc: dict):
+        for field, index in self._indexes.items():
+            value = doc.get(field)
+            if isinstance(value, str):
+                ids = index[value]
+                ids.discard(doc["_id"])
+                if not ids:
+                    del index[value]
+
+    def add(self, doc: dict):
+        doc_id = doc["_id"]
+        self.docs[doc_id] = doc
+        self._index(doc)
+        if not self.ids or self.ids[-1] < doc_id:
+            self.ids.append(doc_id)  # new ObjectIds are increasing
+        else:
+            insort(self.ids, doc_id)
+
+    def update(self, doc: dict, fields: dict, unset: Tuple[str, ...] = ()):
+        self._unindex(doc)
+        doc.update(_copy(fields))
+        for field in unset:
+            doc.pop(field, None)
+        self._index(doc)
+
+    def remove(self, doc_id) -> Optional[dict]:
+        doc = self.docs.pop(doc_id, None)
+        if doc is not None:
+            self._unindex(doc)
+            del self.ids[bisect_left(self.ids, doc_id)]
+        return doc
+
+    def scan(self, query: Optional[dict] = None, after=None):
+        start = bisect_right(self.ids, after) if after is not None else 0
+        for doc_id in self.ids[start:]:
+            doc = self.docs[doc_id]
+            if matches(doc, query):
+                yield doc
+
+    def find_one(self, query: dict) -> Optional[dict]:
+        doc_id = query.get("_id")
+        if doc_id is not None and not isinstance(doc_id, dict):
+            doc = self.docs.get(doc_id)
+            return doc if doc is not None and matches(doc, query) else None
+        for field, index in self._indexes.items():
+            value = query.get(field)
+            if isinstance(value, str):
+                # Lowest `_id` first, as a scan would find them
+                for candidate in sorted(index.get(value, ())):
+                    doc = self.docs[candidate]
+                    if matches(doc, query):
+                        return doc
+                return None
+        return next(self.scan(query), None)
+
+
+class MemoryUserRepository(UserRepository):
+    def __init__(self):
+        self._users = _Collection()
+        self._by_email: Dict[str, ObjectId] = {}
+
+    def clear(self):
+        self.__init__()
+
+    async def ensure_indexes(self):
+        pass  # emails are always unique here
+
+    async def get(self, user_id) -> Optional[dict]:
+        doc = self._users.docs.get(_oid(user_id))
+        return _copy(doc) if doc else None
+
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        user_id = self._by_email.get(email)
+        return await self.get(user_id) if user_id else None
+
+    async def create(self, doc: dict) -> str:
+        email = doc.get("email")
+        if email in self._by_email:
+            raise DuplicateKeyError(f"duplicate email {email}")
+        doc.setdefault("_id", ObjectId())
+        self._users.add(_copy(doc))
+        if email is not None:
+            self._by_email[email] = doc["_id"]
+        return str(doc["_id"])
+
+    async def update(self, user_id, fields: dict):
+        doc = self._users.docs.get(_oid(user_id))
+        if doc is None:
+            return
+        if "email" in fields and fields["email"] != doc.get("email"):
+            if fields["email"] in self._by_email:
+                raise DuplicateKeyError(f"duplicate email {fields['email']}")
+            self._by_email.pop(doc.get("email"), None)
+            self._by_email[fields["email"]] = doc["_id"]
+        doc.update(_copy(fields))
+
+    async def bulk_update(self, updates: Dict[str, dict]):
+        for user_id, fields in updates.items():
+            await self.update(user_id, fields)
+
+    async def bump_token_version(self, user_id, now: datetime) -> Optional[int]:
+        doc = self._users.docs.get(_oid(user_id))
+        if doc is None:
+            return None
+        doc["token_version"] = doc.get("token_version", 0) + 1
+        doc["auth_updated_at"] = now
+        return doc["token_version"]
+
+    async def iter_auth_updated(self, since: Optional[datetime]) -> AsyncIterator[dict]:
+        query = {"auth_updated_at": {"$exists": True} if since is None else {"$gte": since}}
+        for doc in list(self._users.scan(query)):
+            yield _copy(doc)
+
+    async def iterate(self) -> AsyncIterator[dict]:
+        for doc in list(self._users.scan()):
+            yield _copy(doc)
+
+
+class MemoryProfileRepository(ProfileRepository):
+    def __init__(self):
+        self._profiles = _Collection()
+        self._by_user: Dict[ObjectId, ObjectId] = {}
+
+    def clear(self):
+        self.__init__()
+
+    async def ensure_indexes(self):
+        pass  # one profile per user is always enforced here
+
+    async def get_by_user(self, user_id: ObjectId) -> Optional[dict]:
+        profile_id = self._by_user.get(user_id)
+        return _copy(self._profiles.docs[profile_id]) if profile_id else None
+
+    async def upsert_for_user(self, user_id: ObjectId, fields: dict) -> dict:
+        profile_id = self._by_user.get(user_id)
+        if profile_id is None:
+            doc = {"_id": ObjectId(), "user_id": user_id}
+            self._profiles.add(doc)
+            self._by_user[user_id] = doc["_id"]
+        else:
+            doc = self._profiles.docs[profile_id]
+        doc.update(_copy(fields))
+        return _copy(doc)
+
+
+class MemoryPlaceRepository(PlaceRepository):
+    def __init__(self):
+        self._places = _Collection(indexed=("name",))  # natural key of bulk upserts
+        self._images: Dict[str, dict] = {}
+
+    def clear(self):
+        self.__init__()
+
+    async def ensure_indexes(self):
+        pass
+
+    async def all(self) -> List[dict]:
+        return [_copy(doc) for doc in self._places.scan()]
+
+    async def get(self, place_id: ObjectId) -> Optional[dict]:
+        doc = self._places.docs.get(place_id)
+        return _copy(doc) if doc else None
+
+    async def find_page(
+        self, query: dict, after: Optional[ObjectId], limit: int, projection: Optional[dict] = None
+    ) -> List[dict]:
+        page = []
+        for doc in self._places.scan(query, after):
+            page.append(project(doc, projection))
+            if len(page) >= limit:
+                break
+        return page
+
+    async def iterate(self, query: Optional[dict] = None, projection: Optional[dict] = None) -> AsyncIterator[dict]:
+        for doc in list(self._places.scan(query)):
+            yield project(doc, projection)
+
+    async def insert(self, doc: dict):
+        doc.setdefault("_id", ObjectId())
+        doc.setdefault("rev", 1)
+        if doc["_id"] in self._places.docs:
+            raise DuplicateKeyError(f"duplicate _id {doc['_id']}")
+        self._places.add(_copy(doc))
+
+    async def update(
+        self, place_id: ObjectId, fields: dict, unset: Tuple[str, ...] = (), revisions: Optional[List[int]] = None
+    ) -> Optional[dict]:
+        doc = self._places.docs.get(place_id)
+        if doc is None or (revisions is not None and doc.get("rev", 0) not in revisions):
+            return None
+        self._places.update(doc, fields, unset)
+        _bump_rev(doc)
+        return _copy(doc)
+
+    async def bulk_update(self, updates: List[Tuple[ObjectId, dict, Tuple[str, ...]]]) -> int:
+        modified = 0
+        for place_id, fields, unset in updates:
+            if await self.update(place_id, fields, unset) is not None:
+                modified += 1
+        return modified
+
+    async def delete(self, place_id: ObjectId) -> bool:
+        return self._places.remove(place_id) is not None
+
+    async def bulk_upsert(self, items: List[Tuple[dict, dict, Tuple[str, ...]]]) -> dict:
+        result = {"nUpserted": 0, "nModified": 0, "nMatched": 0, "writeErrors": []}
+        for key, fields, unset in items:
+            doc = self._places.find_one(key)
+            if doc is None:
+                # Like Mongo, the new document also gets the key's equality fields.
+                new = {"_id": key.get("_id") or ObjectId(), **key, **_copy(fields), "rev": 1}
+                self._places.add(new)
+                result["nUpserted"] += 1
+                continue
+            result["nMatched"] += 1
+            if any(doc.get(k, _MISSING) != v for k, v in fields.items()) or any(k in doc for k in unset):
+                self._places.update(doc, fields, unset)
+                _bump_rev(doc)
+                result["nModified"] += 1
+        return result
+
+    async def near(
+        self, lat: float, lng: float, radius_km: Optional[float], category: Optional[str], limit: int
+    ) -> List[dict]:
+        from ..utils.geo import haversine_km, place_coords  # utils.geo imports the catalog
+
+        wanted = category.lower() if category else None
+        found = []
+        for doc in self._places.scan():
+            coords = place_coords(doc)
+            if coords is None:
+                continue
+            if wanted is not None and (doc.get("category") or "").lower() != wanted:
+                continue
+            dist = haversine_km(lat, lng, *coords)
+            if radius_km is None or dist <= radius_km:
+                found.append((dist, doc))
+        found.sort(key=lambda pair: pair[0])
+        return [{**_copy(doc), "distance_m": dist * 1000} for dist, doc in found[:limit]]
+
+    async def set_image_variants(self, image_url: str, info: dict) -> int:
+        changed = 0
+        for doc in self._places.scan({"image": image_url}):
+            if doc.get("image_variants") != info:
+                doc["image_variants"] = _copy(info)
+                _bump_rev(doc)
+                changed += 1
+        return changed
+
+    async def get_image_variants(self, filename: str) -> Optional[dict]:
+        info = self._images.get(filename)
+        return _copy(info) if info else None
+
+    async def save_image_variants(self, filename: str, info: dict):
+        self._images[filename] = _copy(info)
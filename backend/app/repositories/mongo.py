@@ -0,0 +1,248 @@
+# app/repositories/mongo.py
+"""Motor implementations of the repositories."""
+import re
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+from .base import DuplicateKeys, PlaceRepository, ProfileRepository, UserRepository
+
+BATCH_SIZE = 1000
+
+# Equality fields first, then `_id` for the keyset sort of paginated lists.
+# A filter is answered in `_id` order only by an index whose equality fields
+# come right before `_id`; without one Mongo sorts every match in memory.
+# price_level+tags and all three filters use one of these and filter the rest.
+PLACE_LIST_INDEXES = [
+    [("category", 1), ("_id", 1)],
+    [("category", 1), ("price_level", 1), ("_id", 1)],
+    [("category", 1), ("tags", 1), ("_id", 1)],
+    [("price_level", 1), ("_id", 1)],
+    [("tags", 1), ("_id", 1)],
+]
+
+
+def _oid(value) -> ObjectId:
+    return value if isinstance(value, ObjectId) else ObjectId(value)
+
+
+async def _create_unique_index(collection, key: str):
+    try:
+        await collection.create_index(key, unique=True)
+    except OperationFailure as e:
+        if e.code != 11000:  # DuplicateKey
+            raise
+        duplicates = collection.aggregate([
+            {"$group": {"_id": f"${key}", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$limit": 5},
+        ])
+        examples = [str(group["_id"]) async for group in duplicates]
+        raise DuplicateKeys(collection.name, key, examples) from e
+
+
+def _set_bumping_rev(fields: dict, unset: Tuple[str, ...] = ()) -> list:
+    """Update pipeline that `$set`s `fields`, `$unset`s `unset` and bumps `rev` only if that changes anything.
+
+    An unchanged place stays unmodified (nModified doesn't count it), so
+    re-importing the same data keeps every place's ETag.
+    """
+    literals = {field: {"$literal": value} for field, value in fields.items()}
+    unchanged = {"$and": [{"$eq": [f"${field}", literal]} for field, literal in literals.items()]
+                 + [{"$eq": [{"$type": f"${field}"}, "missing"]} for field in unset]}
+    next_rev = {"$add": [{"$ifNull": ["$rev", 0]}, 1]}
+    pipeline = [{"$set": {"rev": {"$cond": [unchanged, "$rev", next_rev]}}}, {"$set": literals}]
+    if unset:
+        pipeline.append({"$unset": list(unset)})
+    return pipeline
+
+
+class MongoUserRepository(UserRepository):
+    def __init__(self, collection):
+        self.collection = collection
+        self._indexes_ready = False
+
+    async def ensure_indexes(self):
+        if not self._indexes_ready:
+            await _create_unique_index(self.collection, "email")
+            # Token-version polls ask for users changed since the last poll;
+            # sparse, since only users whose tokens or embedded claims changed have it
+            await self.collection.create_index("auth_updated_at", sparse=True)
+            self._indexes_ready = True
+
+    async def get(self, user_id) -> Optional[dict]:
+        return await self.collection.find_one({"_id": _oid(user_id)})
+
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        return await self.collection.find_one({"email": email})
+
+    async def create(self, doc: dict) -> str:
+        result = await self.collection.insert_one(doc)
+        return str(result.inserted_id)
+
+    async def update(self, user_id, fields: dict):
+        await self.collection.update_one({"_id": _oid(user_id)}, {"$set": fields})
+
+    async def bulk_update(self, updates: Dict[str, dict]):
+        ops = [UpdateOne({"_id": _oid(uid)}, {"$set": fields}) for uid, fields in updates.items()]
+        if ops:
+            await self.collection.bulk_write(ops, ordered=False)
+
+    async def bump_token_version(self, user_id, now: datetime) -> Optional[int]:
+        user = await self.collection.find_one_and_update(
+            {"_id": _oid(user_id)},
+            {"$inc": {"token_version": 1}, "$set": {"auth_updated_at": now}},
+            projection={"token_version": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        return user["token_version"] if user else None
+
+    async def iter_auth_updated(self, since: Optional[datetime]) -> AsyncIterator[dict]:
+        query = {"auth_updated_at": {"$exists": True}}
+        if since is not None:
+            query = {"auth_updated_at": {"$gte": since}}
+        projection = {"token_version": 1, "claims_updated_at": 1, "auth_updated_at": 1}
+        async for user in self.collection.find(query, projection):
+            yield user
+
+    async def iterate(self) -> AsyncIterator[dict]:
+        async for user in self.collection.find():
+            yield user
+
+
+class MongoProfileRepository(ProfileRepository):
+    def __init__(self, collection):
+        self.collection = collection
+        self._indexes_ready = False
+
+    async def ensure_indexes(self):
+        # upsert_for_user relies on one profile per user
+        if not self._indexes_ready:
+            await _create_unique_index(self.collection, "user_id")
+            self._indexes_ready = True
+
+    async def get_by_user(self, user_id: ObjectId) -> Optional[dict]:
+        return await self.collection.find_one({"user_id": user_id})
+
+    async def upsert_for_user(self, user_id: ObjectId, fields: dict) -> dict:
+        # One round trip: insert or update and get the result back
+        upsert = dict(
+            filter={"user_id": user_id},
+            update={"$set": fields},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        try:
+            return await self.collection.find_one_and_update(**upsert)
+        except DuplicateKeyError:
+            # A concurrent first write for this user won the insert; update it
+            return await self.collection.find_one_and_update(**upsert)
+
+
+class MongoPlaceRepository(PlaceRepository):
+    def __init__(self, collection, images_collection):
+        self.collection = collection
+        self.images = images_collection
+        self._indexes_ready = False
+
+    async def ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        for keys in PLACE_LIST_INDEXES:
+            await self.collection.create_index(keys)
+        await self.collection.create_index("name")  # natural key of bulk upserts
+        await self.collection.create_index([("geo", "2dsphere")])
+        self._indexes_ready = True
+
+    async def all(self) -> List[dict]:
+        return await self.collection.find().to_list(None)
+
+    async def get(self, place_id: ObjectId) -> Optional[dict]:
+        return await self.collection.find_one({"_id": place_id})
+
+    async def find_page(
+        self, query: dict, after: Optional[ObjectId], limit: int, projection: Optional[dict] = None
+    ) -> List[dict]:
+        if after is not None:
+            query = {**query, "_id": {"$gt": after}}
+        return await self.collection.find(query, projection).sort("_id", 1).limit(limit).to_list(limit)
+
+    async def iterate(self, query: Optional[dict] = None, projection: Optional[dict] = None) -> AsyncIterator[dict]:
+        cursor = self.collection.find(query or {}, projection).sort("_id", 1).batch_size(BATCH_SIZE)
+        async for doc in cursor:
+            yield doc
+
+    async def insert(self, doc: dict):
+        doc.setdefault("rev", 1)
+        await self.collection.insert_one(doc)
+
+    async def update(
+        self, place_id: ObjectId, fields: dict, unset: Tuple[str, ...] = (), revisions: Optional[List[int]] = None
+    ) -> Optional[dict]:
+        query = {"_id": place_id}
+        if revisions is not None:
+            # Documents from before `rev` existed are at revision 0
+            query["rev"] = {"$in": list(revisions) + [None] if 0 in revisions else list(revisions)}
+        update = {"$inc": {"rev": 1}}
+        if fields:
+            update["$set"] = fields
+        if unset:
+            update["$unset"] = {field: "" for field in unset}
+        return await self.collection.find_one_and_update(query, update, return_document=ReturnDocument.AFTER)
+
+    async def bulk_update(self, updates: List[Tuple[ObjectId, dict, Tuple[str, ...]]]) -> int:
+        ops = []
+        for place_id, fields, unset in updates:
+            update = {"$inc": {"rev": 1}}
+            if fields:
+                update["$set"] = fields
+            if unset:
+                update["$unset"] = {field: "" for field in unset}
+            ops.append(UpdateOne({"_id": place_id}, update))
+        if not ops:
+            return 0
+        result = await self.collection.bulk_write(ops, ordered=False)
+        return result.modified_count
+
+    async def delete(self, place_id: ObjectId) -> bool:
+        result = await self.collection.delete_one({"_id": place_id})
+        return result.deleted_count > 0
+
+    async def bulk_upsert(self, items: List[Tuple[dict, dict, Tuple[str, ...]]]) -> dict:
+        ops = [UpdateOne(key, _set_bumping_rev(fields, unset), upsert=True) for key, fields, unset in items]
+        try:
+            result = await self.collection.bulk_write(ops, ordered=False)
+            return result.bulk_api_result
+        except BulkWriteError as e:
+            return e.details
+
+    async def near(
+        self, lat: float, lng: float, radius_km: Optional[float], category: Optional[str], limit: int
+    ) -> List[dict]:
+        geo_near = {
+            "near": {"type": "Point", "coordinates": [lng, lat]},
+            "distanceField": "distance_m",
+            "key": "geo",
+            "spherical": True,
+        }
+        if radius_km is not None:
+            geo_near["maxDistance"] = radius_km * 1000
+        if category:
+            geo_near["query"] = {"category": {"$regex": f"^{re.escape(category)}$", "$options": "i"}}
+        return await self.collection.aggregate([{"$geoNear": geo_near}, {"$limit": limit}]).to_list(limit)
+
+    async def set_image_variants(self, image_url: str, info: dict) -> int:
+        result = await self.collection.update_many(
+            {"image": image_url, "image_variants": {"$ne": info}},
+            {"$set": {"image_variants": info}, "$inc": {"rev": 1}},
+        )
+        return result.modified_count
+
+    async def get_image_variants(self, filename: str) -> Optional[dict]:
+        return await self.images.find_one({"_id": filename}, {"_id": 0})
+
+    async def save_image_variants(self, filename: str, info: dict):
+        await self.images.replace_one({"_id": filename}, {"_id": filename, **info}, upsert=True)
@@ -1,12 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi import status
 from typing import List, Optional
 from bson import ObjectId
 import os
+import time
 
-from ..database import db
+from ..config import settings
+from ..repositories import places as places_repo
+from ..repositories import users as users_repo
 from ..schemas.place import PlaceCreate
-from ..utils.auth import get_current_admin_user
+from ..utils.auth import get_current_admin_claims, get_current_admin_user
+from ..utils.bulk_places import export_places, import_places, place_document, stale_fields
+from ..utils.catalog import place_catalog
+from ..utils.db_tracing import command_tracer
+from ..utils.etags import (
+    PRIVATE_CACHE_CONTROL,
+    catalog_etag,
+    if_match_revisions,
+    none_match,
+    not_modified,
+    place_etag,
+    place_revision,
+    set_etag,
+)
+from ..utils.geo import geo_point
+from ..utils.hashing import hash_stats
+from ..utils.image_variants import process_upload, variants_for_image
+from ..utils.images import ALLOWED_IMAGE_EXTENSIONS, ImageTooLarge, UnsupportedImage, image_url, store_upload
+from ..utils.metrics import IMAGE_WRITE_SECONDS
+from ..utils.pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    fetch_page,
+    parse_fields,
+    place_filter,
+)
+from ..utils.recommendation_cache import recommendation_cache
+from ..utils.user_cache import user_cache
+from ..utils.write_behind import user_sync
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -23,35 +55,118 @@ def _serialize_place(place: dict) -> dict:
 # --------- Places management ---------
 
 @router.get("/places")
-async def admin_list_places(current_admin: dict = Depends(get_current_admin_user)):
-  places_cursor = db.places.find()
-  places: List[dict] = []
-  async for p in places_cursor:
-      places.append(_serialize_place(p))
-  return places
+async def admin_list_places(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    category: Optional[str] = None,
+    price_level: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    fields: Optional[str] = None,
+    current_admin: dict = Depends(get_current_admin_claims),
+):
+  """All places, or one filtered page (cursor in X-Next-Cursor) when paging/filter params are given.
+
+  Tagged like GET /places/; a matching If-None-Match gets a 304.
+  """
+  if any((limit, after, category, price_level, tags, fields)):
+      await places_repo.ensure_indexes()
+      places, next_cursor, etag = await fetch_page(
+          places_repo,
+          place_filter(category, price_level, tags),
+          after=after,
+          limit=limit,
+          projection=parse_fields(fields),
+      )
+      if none_match(request, etag):
+          return not_modified(etag, PRIVATE_CACHE_CONTROL)
+      set_etag(response, etag, PRIVATE_CACHE_CONTROL)
+      if next_cursor:
+          response.headers[NEXT_CURSOR_HEADER] = next_cursor
+      return places
+
+  # Same list GET /places/ serves, without reading the collection again
+  await place_catalog.ensure_loaded()
+  etag = catalog_etag(place_catalog.loaded_version)
+  if none_match(request, etag):
+      return not_modified(etag, PRIVATE_CACHE_CONTROL)
+  set_etag(response, etag, PRIVATE_CACHE_CONTROL)
+  return await place_catalog.get_places()
 
 
 @router.post("/places", status_code=status.HTTP_201_CREATED)
-async def admin_create_place(place: PlaceCreate, current_admin: dict = Depends(get_current_admin_user)):
+async def admin_create_place(
+    place: PlaceCreate, response: Response, current_admin: dict = Depends(get_current_admin_user)
+):
   place_dict = place.dict()
-  res = await db.places.insert_one(place_dict)
-  created = await db.places.find_one({"_id": res.inserted_id})
-  return _serialize_place(created)
+  # GeoJSON copy of location for the 2dsphere index used by /places/nearby
+  geo = geo_point(place_dict.get("location"))
+  if geo:
+      place_dict["geo"] = geo
+  variants = await variants_for_image(place_dict.get("image"))
+  if variants:
+      place_dict["image_variants"] = variants
+  # insert sets place_dict["_id"]; no need to read the document back
+  await places_repo.insert(place_dict)
+  place_catalog.apply_upsert(place_dict)
+  set_etag(response, place_etag(str(place_dict["_id"]), place_revision(place_dict)), PRIVATE_CACHE_CONTROL)
+  return _serialize_place(place_dict)
+
+
+@router.post("/places/bulk")
+async def admin_bulk_import_places(request: Request, current_admin: dict = Depends(get_current_admin_user)):
+  """Upsert places from an NDJSON body (one PlaceCreate object per line).
+
+  Lines with an `id` update that place; others are matched by name. Valid
+  lines are written in batches; invalid ones are reported by line number.
+  """
+  report = await import_places(places_repo, request.stream())
+  if report.upserted or report.modified:
+      place_catalog.bump_version()
+  return report.as_dict()
+
+
+@router.get("/places/export")
+async def admin_export_places(current_admin: dict = Depends(get_current_admin_claims)):
+  """Stream every place as NDJSON (the format accepted by POST /admin/places/bulk)."""
+  return StreamingResponse(
+      export_places(places_repo),
+      media_type="application/x-ndjson",
+      headers={"Content-Disposition": 'attachment; filename="places.ndjson"'},
+  )
 
 
 @router.put("/places/{place_id}")
-async def admin_update_place(place_id: str, place: PlaceCreate, current_admin: dict = Depends(get_current_admin_user)):
+async def admin_update_place(
+    place_id: str,
+    place: PlaceCreate,
+    request: Request,
+    response: Response,
+    current_admin: dict = Depends(get_current_admin_user),
+):
+  """Update a place. With If-Match (the place's ETag), only if nobody changed it since; 412 otherwise."""
   try:
       obj_id = ObjectId(place_id)
   except Exception:
       raise HTTPException(status_code=400, detail="Invalid place id")
 
-  update_data = {k: v for k, v in place.dict().items() if v is not None}
-  result = await db.places.update_one({"_id": obj_id}, {"$set": update_data})
-  if result.matched_count == 0:
+  update_data = place_document(place)
+  if "image" in update_data:
+      # Resized variants of the new image, or None until they are built
+      update_data["image_variants"] = await variants_for_image(update_data["image"])
+  revisions = if_match_revisions(request, place_id)
+  updated = await places_repo.update(obj_id, update_data, stale_fields(update_data), revisions=revisions)
+  if updated is None:
+      if revisions is not None:
+          # A missing place fails the precondition too
+          raise HTTPException(
+              status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Place was modified; reload it and retry"
+          )
       raise HTTPException(status_code=404, detail="Place not found")
 
-  updated = await db.places.find_one({"_id": obj_id})
+  place_catalog.apply_upsert(updated)
+  set_etag(response, place_etag(place_id, place_revision(updated)), PRIVATE_CACHE_CONTROL)
   return _serialize_place(updated)
 
 
@@ -62,27 +177,68 @@ async def admin_delete_place(place_id: str, current_admin: dict = Depends(get_cu
   except Exception:
       raise HTTPException(status_code=400, detail="Invalid place id")
 
-  result = await db.places.delete_one({"_id": obj_id})
-  if result.deleted_count == 0:
+  if not await places_repo.delete(obj_id):
       raise HTTPException(status_code=404, detail="Place not found")
+  place_catalog.apply_remove(place_id)
   return {"status": "deleted"}
 
 
-# --------- Image upload for places ---------
+@router.get("/stats/catalog")
+async def admin_catalog_stats(current_admin: dict = Depends(get_current_admin_claims)):
+  """Hit/miss and reload timings of the in-process place catalog cache."""
+  return place_catalog.stats_dict()
+
 
-STATIC_PLACES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "places")
-os.makedirs(STATIC_PLACES_DIR, exist_ok=True)
+@router.get("/stats/user-cache")
+async def admin_user_cache_stats(current_admin: dict = Depends(get_current_admin_claims)):
+  """Hit/miss metrics of the user lookup cache used by the auth dependencies."""
+  return user_cache.stats_dict()
 
 
+@router.get("/stats/user-sync")
+async def admin_user_sync_stats(current_admin: dict = Depends(get_current_admin_claims)):
+  """Write-behind queue of profile fields synced onto user documents."""
+  data = user_sync.stats.as_dict()
+  data["pending"] = user_sync.pending()
+  return data
+
+
+@router.get("/stats/recommendations")
+async def admin_recommendation_cache_stats(current_admin: dict = Depends(get_current_admin_claims)):
+  """Hit ratio and size of the recommendation memo."""
+  return recommendation_cache.stats_dict()
+
+
+@router.get("/stats/hashing")
+async def admin_hashing_stats(current_admin: dict = Depends(get_current_admin_claims)):
+  """Pool wait time, hash time and rejections of the password hashing pool."""
+  return hash_stats.as_dict()
+
+
+@router.get("/stats/queries")
+async def admin_query_stats(
+    limit: int = Query(10, ge=1, le=100),
+    sort: str = Query("max_ms", regex="^(max_ms|avg_ms|total_ms|count)$"),
+    current_admin: dict = Depends(get_current_admin_claims),
+):
+  """Slowest Mongo query shapes with the routes issuing them and sampled plans."""
+  return command_tracer.stats_dict(limit, sort)
+
+
+# --------- Image upload for places ---------
+
 @router.post("/places/upload-image")
 async def upload_place_image(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_admin: dict = Depends(get_current_admin_user),
 ):
   """Upload an image file for a place.
 
-  Saves the file under backend/app/static/places and returns a URL path
-  that the frontend can store as the place.image value.
+  Saves the file under backend/app/static/places, named after the SHA-256 of
+  its content, and returns a URL path that the frontend can store as the
+  place.image value. Uploading the same image again returns the same path.
+  Resized WebP variants are built in the background (utils/image_variants.py).
   """
   filename = file.filename
   if not filename:
@@ -90,30 +246,34 @@ async def upload_place_image(
 
   # Basic extension check
   _, ext = os.path.splitext(filename)
-  if ext.lower() not in {".jpg", ".jpeg", ".png", ".webp"}:
+  if ext.lower() not in ALLOWED_IMAGE_EXTENSIONS:
       raise HTTPException(status_code=400, detail="Unsupported image type")
 
-  # Ensure unique-ish filename
-  safe_name = filename.replace(" ", "_")
-
-  dest_path = os.path.join(STATIC_PLACES_DIR, safe_name)
-
-  contents = await file.read()
-  with open(dest_path, "wb") as out_file:
-      out_file.write(contents)
+  started = time.perf_counter()
+  try:
+      stored_name = await store_upload(file)
+  except ImageTooLarge:
+      IMAGE_WRITE_SECONDS.observe(time.perf_counter() - started, "too_large")
+      raise HTTPException(
+          status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+          detail=f"Image larger than {settings.MAX_IMAGE_UPLOAD_BYTES} bytes",
+      )
+  except UnsupportedImage:
+      IMAGE_WRITE_SECONDS.observe(time.perf_counter() - started, "unsupported")
+      raise HTTPException(status_code=400, detail="Unsupported image type")
+  IMAGE_WRITE_SECONDS.observe(time.perf_counter() - started, "stored")
 
+  background_tasks.add_task(process_upload, stored_name)
   # URL path that FastAPI will serve via StaticFiles (mounted in main.py)
-  url_path = f"/static/places/{safe_name}"
-  return {"image": url_path}
+  return {"image": image_url(stored_name)}
 
 
 # --------- Users management (basic list) ---------
 
 @router.get("/users")
-async def admin_list_users(current_admin: dict = Depends(get_current_admin_user)):
-  cursor = db.users.find()
+async def admin_list_users(current_admin: dict = Depends(get_current_admin_claims)):
   users: List[dict] = []
-  async for u in cursor:
+  async for u in users_repo.iterate():
       users.append(
           {
               "id": str(u["_id"]),
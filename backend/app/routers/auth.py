@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from ..database import db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from ..repositories import users
 from app.schemas.user import UserCreate, UserLogin, UserOut
-from ..utils.hashing import hash_password, verify_password
-from ..utils.jwt_handler import create_access_token
-from app.database import users_collection
+from ..utils.hashing import (
+    HashPoolBusy,
+    hash_password_async,
+    needs_rehash,
+    verify_password_async,
+)
+from ..config import settings
+from ..utils.auth import get_current_user
+from ..utils.jwt_handler import create_access_token, user_claims
+from ..utils.token_versions import revoke_tokens
+from ..utils.user_cache import user_cache
 from pymongo.errors import DuplicateKeyError  
 
 from pydantic import BaseModel, EmailStr
@@ -16,12 +24,30 @@ class UserCreate(BaseModel):
     email: EmailStr
     password: str
 
-users_collection = db["users"]
+def _busy():
+    # Hashing pool is saturated: tell clients to back off instead of queueing
+    return HTTPException(
+        status_code=503,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+async def _rehash_password(user_id, password: str):
+    """Re-hash with the current BCRYPT_ROUNDS after a successful login."""
+    try:
+        new_hash = await hash_password_async(password)
+    except HashPoolBusy:
+        return  # try again on a later login
+    await users.update(user_id, {"password_hash": new_hash})
+    user_cache.invalidate(user_id)
 
 @router.post("/register")
 async def register(user: UserCreate):
     from datetime import datetime
-    hashed_password = hash_password(user.password)
+    try:
+        hashed_password = await hash_password_async(user.password)
+    except HashPoolBusy:
+        raise _busy()
     user_dict = {
         "name": user.name,
         "email": user.email,
@@ -31,16 +57,31 @@ async def register(user: UserCreate):
     }
 
     try:
-        new_user = await users_collection.insert_one(user_dict)
-        return {"status": "success", "user_id": str(new_user.inserted_id)}
+        user_id = await users.create(user_dict)
+        return {"status": "success", "user_id": user_id}
     except DuplicateKeyError:
         raise HTTPException(status_code=400, detail="User already exists")
 
 # Login
 @router.post("/login")
-async def login(form_data: UserLogin):
-    user = await db.users.find_one({"email": form_data.email})
-    if not user or not verify_password(form_data.password, user.get("password_hash","")):
+async def login(form_data: UserLogin, background_tasks: BackgroundTasks):
+    user = await users.get_by_email(form_data.email)
+    try:
+        valid = bool(user) and await verify_password_async(form_data.password, user.get("password_hash",""))
+    except HashPoolBusy:
+        raise _busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = create_access_token(subject=str(user["_id"]))
+    if needs_rehash(user["password_hash"]):
+        background_tasks.add_task(_rehash_password, user["_id"], form_data.password)
+    claims = {"tv": user.get("token_version", 0)}
+    if settings.JWT_EMBED_CLAIMS:
+        claims.update(user_claims(user))
+    token = create_access_token(subject=str(user["_id"]), claims=claims)
     return {"access_token": token, "token_type": "bearer"}
+
+# Logout: revokes every token issued to the user so far
+@router.post("/logout")
+async def logout(current_user: dict = Depends(get_current_user)):
+    await revoke_tokens(current_user["id"])
+    return {"status": "logged out"}
@@ -1,22 +1,152 @@
-from fastapi import APIRouter, HTTPException
-from ..database import db
+import math
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from ..config import settings
+from ..repositories import places as places_repo
+from ..utils.catalog import place_catalog, serialize_place
+from ..utils.clusters import ClusterTooLarge, cluster_pyramid
+from ..utils.etags import catalog_etag, none_match, not_modified, place_etag, place_revision, set_etag
+from ..utils.geo import spatial_index
+from ..utils.pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    fetch_page,
+    parse_fields,
+    place_filter,
+)
+from ..utils.search import search_index
+from ..utils.suggest import MAX_SUGGESTIONS, suggest_index
 
 router = APIRouter(tags=["places"])
 
 @router.get("/")
-async def get_all_places():
-    places = await db.places.find().to_list(1000)
-    for place in places:
-        place["id"] = str(place["_id"])
-        del place["_id"]
+async def get_all_places(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    category: Optional[str] = None,
+    price_level: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    fields: Optional[str] = None,
+):
+    """All places, or one filtered page when any paging/filter param is given.
+
+    Pages are ordered by `_id`; the next page's cursor is returned in the
+    X-Next-Cursor header and passed back as `after`. The full list is tagged
+    with the catalog version, so a matching If-None-Match gets a 304 without
+    building it; a page is tagged with its places' ids and revisions.
+    """
+    if not any((limit, after, category, price_level, tags, fields)):
+        await place_catalog.ensure_loaded()
+        etag = catalog_etag(place_catalog.loaded_version)
+        if none_match(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        return await place_catalog.get_places()
+
+    await places_repo.ensure_indexes()
+    places, next_cursor, etag = await fetch_page(
+        places_repo,
+        place_filter(category, price_level, tags),
+        after=after,
+        limit=limit,
+        projection=parse_fields(fields),
+    )
+    if none_match(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return places
 
+async def _nearby_from_repository(lat: float, lng: float, radius_km: Optional[float], category: Optional[str], limit: int):
+    # $geoNear needs the 2dsphere index
+    await places_repo.ensure_indexes()
+    docs = await places_repo.near(lat, lng, radius_km, category, limit)
+    results = []
+    for doc in docs:
+        place = serialize_place(doc)
+        place["distance_km"] = round(place.pop("distance_m") / 1000, 3)
+        results.append(place)
+    return results
+
+@router.get("/nearby")
+async def get_nearby_places(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0),
+    category: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Places closest to (lat, lng), nearest first, each with `distance_km`."""
+    if settings.GEO_BACKEND == "mongo":
+        return await _nearby_from_repository(lat, lng, radius_km, category, limit)
+
+    await place_catalog.ensure_loaded()
+    return [
+        {**place, "distance_km": round(dist, 3)}
+        for place, dist in spatial_index.nearby(lat, lng, radius_km, category, limit)
+    ]
+
+@router.get("/clusters")
+async def get_place_clusters(
+    bbox: str = Query(..., description="min_lng,min_lat,max_lng,max_lat"),
+    zoom: int = Query(..., ge=0, le=22),
+):
+    """Pre-aggregated map marker clusters (count, centroid, top categories) for a map view."""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lng,min_lat,max_lng,max_lat")
+    valid = (
+        all(math.isfinite(v) for v in (min_lng, min_lat, max_lng, max_lat))
+        and -180 <= min_lng <= max_lng <= 180
+        and -90 <= min_lat <= max_lat <= 90
+    )
+    if not valid:
+        raise HTTPException(status_code=400, detail="bbox must be min_lng,min_lat,max_lng,max_lat")
+
+    await place_catalog.ensure_loaded()
+    try:
+        return cluster_pyramid.clusters((min_lng, min_lat, max_lng, max_lat), zoom)
+    except ClusterTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/search")
+async def search_places(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Full-text search over name, description, tags and category.
+
+    Best match first, each with its BM25 `score`. Accents and Maltese letters
+    are folded (ħ → h, ġ → g) and misspellings by one letter still match.
+    """
+    await place_catalog.ensure_loaded()
+    return [{**place, "score": round(score, 4)} for place, score in search_index.search(q, limit)]
+
+@router.get("/suggest")
+async def suggest_places(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(5, ge=1, le=MAX_SUGGESTIONS),
+):
+    """Type-ahead: places whose name, and categories/tags whose words, start with `prefix`.
+
+    Places come best rated first, terms most used first. Matching ignores
+    case and accents, and any word of a name can start the match.
+    """
+    await place_catalog.ensure_loaded()
+    return suggest_index.suggest(prefix, limit)
+
 @router.get("/{place_id}")
-async def get_place(place_id: str):
-    from bson import ObjectId
-    place = await db.places.find_one({"_id": ObjectId(place_id)})
+async def get_place(place_id: str, request: Request, response: Response):
+    place = await place_catalog.get_place(place_id)
     if not place:
         raise HTTPException(status_code=404, detail="Place not found")
-    place["id"] = str(place["_id"])
-    del place["_id"]
+    etag = place_etag(place_id, place_revision(place))
+    if none_match(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return place
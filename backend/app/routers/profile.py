@@ -2,8 +2,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
 from bson import ObjectId
 from typing import Optional
-from ..database import db
+from ..repositories import profiles
 from ..utils.jwt_handler import decode_token
+from ..utils.token_versions import stale_claims_fields
+from ..utils.write_behind import user_sync
 from ..schemas.profile import ProfileCreate, ProfileOut
 
 router = APIRouter(prefix="/profile", tags=["profile"])
@@ -24,34 +26,20 @@ async def get_current_user_id(authorization: Optional[str] = Header(None)):
 async def create_or_update_profile(profile: ProfileCreate, authorization: str = Depends(get_current_user_id)):
     user_id = authorization
     obj_id = ObjectId(user_id)
-    existing = await db.profiles.find_one({"user_id": obj_id})
+    await profiles.ensure_indexes()
     profile_dict = profile.dict()
     profile_dict["user_id"] = obj_id
 
-    if existing:
-        await db.profiles.update_one({"_id": existing["_id"]}, {"$set": profile_dict})
-        updated = await db.profiles.find_one({"_id": existing["_id"]})
-        updated["id"] = str(updated["_id"])
-        updated["user_id"] = str(updated["user_id"])
-        del updated["_id"]
-    else:
-        res = await db.profiles.insert_one(profile_dict)
-        updated = await db.profiles.find_one({"_id": res.inserted_id})
-        updated["id"] = str(updated["_id"])
-        updated["user_id"] = str(updated["user_id"])
-        del updated["_id"]
+    updated = await profiles.upsert_for_user(obj_id, profile_dict)
+    updated["id"] = str(updated["_id"])
+    updated["user_id"] = str(updated["user_id"])
+    del updated["_id"]
 
-    # Also sync travel_style onto the user document for recommendations
+    # Also sync travel_style onto the user document for recommendations.
+    # Written behind the request; caches are refreshed once it lands.
     travel_style = profile_dict.get("travel_style")
     if travel_style:
-        try:
-            await db["users"].update_one(
-                {"_id": obj_id},
-                {"$set": {"travel_style": travel_style}}
-            )
-        except Exception:
-            # Fail silently if user update fails; profile update still succeeds
-            pass
+        user_sync.enqueue(user_id, {"travel_style": travel_style, **stale_claims_fields()})
 
     return updated
 
@@ -59,7 +47,7 @@ async def create_or_update_profile(profile: ProfileCreate, authorization: str =
 @router.get("/me", response_model=ProfileOut)
 async def get_my_profile(authorization: str = Depends(get_current_user_id)):
     user_id = ObjectId(authorization)
-    prof = await db.profiles.find_one({"user_id": user_id})
+    prof = await profiles.get_by_user(user_id)
     if not prof:
         raise HTTPException(status_code=404, detail="Profile not found")
     prof["id"] = str(prof["_id"])
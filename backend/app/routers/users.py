@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
 from bson import ObjectId
-from ..database import db
-from ..utils.jwt_handler import decode_token
+from ..utils.jwt_handler import decode_payload, token_revoked
+from ..utils.user_cache import user_cache
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -9,18 +9,21 @@ async def get_current_user(authorization: str = Header(...)):
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authentication")
     token = authorization.split(" ")[1]
-    user_id = decode_token(token)
+    payload = decode_payload(token)
+    user_id = payload.get("sub") if payload else None
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
     
     try:
-        obj_id = ObjectId(user_id)  # <-- convert string to ObjectId
+        ObjectId(user_id)  # <-- validate before hitting the cache / DB
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid user ID")
 
-    user = await db.users.find_one({"_id": obj_id})
+    user = await user_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    if token_revoked(payload, user):
+        raise HTTPException(status_code=401, detail="Token revoked")
     
     return {
         "id": str(user["_id"]), 
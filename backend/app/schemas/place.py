@@ -11,3 +11,4 @@ class PlaceCreate(BaseModel):
     tags: Optional[List[str]] = []    # extra tags e.g. ["family","outdoor"]
     image: Optional[str] = None       # URL or path to an image for this place
     duration: Optional[str] = None    # e.g. "2h", "Half day", "All day"
+    rating: Optional[float] = None    # 0-5, used as a tie-breaker by recommendations
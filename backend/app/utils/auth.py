@@ -2,12 +2,13 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from ..config import settings
-from ..database import db
-from bson import ObjectId
+from .jwt_handler import token_revoked
+from .token_versions import OK, REVOKED, token_versions
+from .user_cache import user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
- 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+
+def _decode(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
         user_id: str = payload.get("sub")
@@ -15,21 +16,44 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
- 
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    return payload
+
+async def _load_user(payload: dict) -> dict:
+    user = await user_cache.get(payload["sub"])
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
- 
-    # Convert _id to string for safety
-    user["id"] = str(user["_id"])
+    if token_revoked(payload, user):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
     return user
- 
 
-async def get_current_admin_user(current_user: dict = Depends(get_current_user)):
-    """Ensure the current user is an admin user.
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    return await _load_user(_decode(token))
 
-    Expects a `role` field on the user document with value "admin".
+
+async def get_current_user_claims(token: str = Depends(oauth2_scheme)):
+    """Current user for read-only routes.
+
+    When the token carries embedded claims (JWT_EMBED_CLAIMS) and the token
+    version table says they are current, the user is built from the claims
+    without touching Mongo. Otherwise falls back to `get_current_user`.
     """
+    payload = _decode(token)
+    if settings.JWT_EMBED_CLAIMS and "role" in payload:
+        state = token_versions.check(payload)
+        if state == REVOKED:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+        if state == OK:
+            return {
+                "id": payload["sub"],
+                "role": payload.get("role", "user"),
+                "travel_style": payload.get("travel_style"),
+                "budget": payload.get("budget"),
+                "interests": payload.get("interests") or [],
+            }
+    return await _load_user(payload)
+
+
+def _require_admin(current_user: dict) -> dict:
     role = current_user.get("role", "user")
     if role != "admin":
         raise HTTPException(
@@ -37,3 +61,16 @@ async def get_current_admin_user(current_user: dict = Depends(get_current_user))
             detail="Admin privileges required",
         )
     return current_user
+
+
+async def get_current_admin_user(current_user: dict = Depends(get_current_user)):
+    """Ensure the current user is an admin user.
+
+    Expects a `role` field on the user document with value "admin".
+    """
+    return _require_admin(current_user)
+
+
+async def get_current_admin_claims(current_user: dict = Depends(get_current_user_claims)):
+    """Admin check for read-only admin routes; may be answered from token claims."""
+    return _require_admin(current_user)
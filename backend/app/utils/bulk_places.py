@@ -0,0 +1,245 @@
+# app/utils/bulk_places.py
+"""Streaming NDJSON import/export of places for the admin API.
+
+Import reads the request body chunk by chunk, validates each line against
+`PlaceCreate` and applies valid lines as unordered bulk upserts in
+batches of BATCH_SIZE, so memory stays constant whatever the file size.
+
+Each line is upserted by `_id` when it carries an `id`, otherwise by its
+natural key (the place name). Fields a line leaves out keep their stored
+value.
+
+Export streams places straight from the repository, one JSON document per
+line.
+"""
+import json
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pydantic import ValidationError
+
+from ..schemas.place import PlaceCreate
+from .catalog import serialize_place
+from .geo import geo_point
+
+BATCH_SIZE = 1000
+MAX_LINE_BYTES = 1024 * 1024
+# Only the first errors are reported back; the rest are just counted.
+MAX_REPORTED_ERRORS = 100
+
+
+def natural_key(place: dict) -> dict:
+    return {"name": place["name"]}
+
+
+def place_document(place: PlaceCreate) -> dict:
+    """Fields to store for `place`; those left out (None) are not written at all."""
+    doc = place.dict(exclude_none=True)
+    geo = geo_point(doc.get("location"))
+    if geo:
+        doc["geo"] = geo
+    return doc
+
+
+def _has_value(value) -> bool:
+    return value is not None and value != "" and value != [] and value != {}
+
+
+def merge_document(stored: Optional[dict], doc: dict, fill_only: bool = False) -> Tuple[dict, Tuple[str, ...]]:
+    """`$set` and `$unset` that write `doc` over `stored`, the place already under its key.
+
+    A location without coordinates never replaces one with them, and a
+    `fill_only` doc (one normalized from a poorer shape, like the legacy
+    seeder's) only fills the fields `stored` lacks. `geo` follows whichever
+    location is written.
+    """
+    if stored is None:
+        return doc, ()
+    fields = {}
+    for key, value in doc.items():
+        current = stored.get(key)
+        if key == "geo" or (_has_value(current) and fill_only):
+            continue
+        if key == "location" and geo_point(current) and not geo_point(value):
+            continue
+        fields[key] = value
+    if "location" not in fields:
+        return fields, ()
+    if "geo" in doc:
+        fields["geo"] = doc["geo"]
+    return fields, stale_fields(fields)
+
+
+def stale_fields(doc: dict) -> Tuple[str, ...]:
+    """Fields to `$unset` when writing `doc` over a stored place.
+
+    A new location without usable coordinates drops the old `geo`, so
+    /places/nearby stops finding the place at its former position.
+    """
+    return ("geo",) if "location" in doc and "geo" not in doc else ()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """Yield `(line number, line)` from a byte stream; `None` for oversized lines."""
+    pending = b""
+    line_no = 0
+    oversized = False
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            line_no += 1
+            # A long line can also arrive whole within one chunk
+            yield line_no, None if oversized or len(line) > MAX_LINE_BYTES else line
+            oversized = False
+        if len(pending) > MAX_LINE_BYTES:
+            # Drop the rest of this line instead of buffering it.
+            pending = b""
+            oversized = True
+    if pending or oversized:
+        yield line_no + 1, None if oversized else pending
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+
+class ImportReport:
+    def __init__(self):
+        self.lines = 0
+        self.upserted = 0
+        self.modified = 0
+        self.matched = 0
+        self.error_count = 0
+        self.errors: List[dict] = []
+
+    def error(self, line_no: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "lines": self.lines,
+            "upserted": self.upserted,
+            "modified": self.modified,
+            "matched": self.matched,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+async def _flush(repository, ops: List[Tuple[dict, dict, Tuple[str, ...]]], line_numbers: List[int], report: ImportReport):
+    if not ops:
+        return
+    details = await repository.bulk_upsert(ops)
+    for err in details.get("writeErrors", []):
+        report.error(line_numbers[err["index"]], err.get("errmsg", "write error"))
+    report.upserted += details.get("nUpserted", 0)
+    report.modified += details.get("nModified", 0)
+    report.matched += details.get("nMatched", 0)
+    ops.clear()
+    line_numbers.clear()
+
+
+async def import_places(repository, chunks: AsyncIterator[bytes]) -> ImportReport:
+    report = ImportReport()
+    ops: List[Tuple[dict, dict, Tuple[str, ...]]] = []
+    line_numbers: List[int] = []
+
+    async for line_no, line in iter_lines(chunks):
+        if line is None:
+            report.lines += 1
+            report.error(line_no, f"line longer than {MAX_LINE_BYTES} bytes")
+            continue
+        if not line.strip():
+            continue
+        report.lines += 1
+
+        try:
+            raw = json.loads(line)
+        except ValueError as e:
+            report.error(line_no, f"invalid JSON: {e}")
+            continue
+        if not isinstance(raw, dict):
+            report.error(line_no, "expected a JSON object")
+            continue
+
+        place_id = raw.pop("id", None) or raw.pop("_id", None)
+        try:
+            place = PlaceCreate(**raw)
+        except ValidationError as e:
+            report.error(line_no, _describe(e))
+            continue
+
+        doc = place_document(place)
+        if place_id is not None:
+            try:
+                key = {"_id": ObjectId(place_id)}
+            except Exception:
+                report.error(line_no, "invalid id")
+                continue
+        else:
+            key = natural_key(doc)
+        ops.append((key, doc, stale_fields(doc)))
+        line_numbers.append(line_no)
+
+        if len(ops) >= BATCH_SIZE:
+            await _flush(repository, ops, line_numbers, report)
+
+    await _flush(repository, ops, line_numbers, report)
+    return report
+
+
+async def _merge_and_flush(repository, pending: List[Tuple[int, dict, bool]], report: ImportReport):
+    if not pending:
+        return
+    names = [doc["name"] for _, doc, _ in pending]
+    stored = {doc["name"]: doc async for doc in repository.iterate({"name": {"$in": names}})}
+    ops: List[Tuple[dict, dict, Tuple[str, ...]]] = []
+    positions: List[int] = []
+    for position, doc, fill_only in pending:
+        fields, unset = merge_document(stored.get(doc["name"]), doc, fill_only)
+        if not fields and not unset:
+            report.matched += 1  # nothing to add to the stored place
+            continue
+        ops.append((natural_key(doc), fields, unset))
+        positions.append(position)
+    pending.clear()
+    await _flush(repository, ops, positions, report)
+
+
+async def upsert_places(
+    repository, places: Iterable[Tuple[PlaceCreate, bool]], batch_size: int = BATCH_SIZE
+) -> ImportReport:
+    """Upsert already validated `(place, fill_only)` pairs by natural key, `batch_size` per bulk upsert.
+
+    Each batch first reads the places already stored under the same names
+    and merges into them (see `merge_document`). Used by the seeding CLI;
+    `lines` counts the places and errors refer to their position (1-based)
+    in `places`.
+    """
+    report = ImportReport()
+    pending: List[Tuple[int, dict, bool]] = []
+    names = set()
+    for position, (place, fill_only) in enumerate(places, start=1):
+        report.lines += 1
+        doc = place_document(place)
+        if doc["name"] in names:
+            # The second place with this name merges into the first one, once stored
+            await _merge_and_flush(repository, pending, report)
+            names.clear()
+        pending.append((position, doc, fill_only))
+        names.add(doc["name"])
+        if len(pending) >= batch_size:
+            await _merge_and_flush(repository, pending, report)
+            names.clear()
+    await _merge_and_flush(repository, pending, report)
+    return report
+
+
+async def export_places(repository) -> AsyncIterator[bytes]:
+    async for doc in repository.iterate(projection={"geo": 0}):
+        yield json.dumps(serialize_place(doc), ensure_ascii=False, default=str).encode("utf-8") + b"\n"
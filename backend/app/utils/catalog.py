@@ -0,0 +1,191 @@
+# app/utils/catalog.py
+"""In-process cache of the places collection.
+
+The catalog is small and read far more often than it is written, so the
+read-heavy routes (`GET /places/`, `GET /recommendations/`) serve it from
+memory instead of scanning Mongo on every request.
+
+Admin writes call `bump_version()`. The next read sees that the cached copy
+is older than the current version and reloads it; concurrent misses wait on
+the same reload instead of each scanning the collection.
+
+Writes that know the new document can use `apply_upsert()` / `apply_remove()`
+instead: the cached copy is patched in place and subscribed indexes are
+updated incrementally rather than rebuilt from a full reload.
+"""
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .. import repositories
+
+
+def serialize_place(doc: dict) -> dict:
+    """Return a copy of a Mongo place document with `_id` turned into `id`."""
+    place = dict(doc)
+    place["id"] = str(place.pop("_id"))
+    return place
+
+
+class CatalogStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.last_reload_ms = 0.0
+        self.total_reload_ms = 0.0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "reloads": self.reloads,
+            "last_reload_ms": round(self.last_reload_ms, 3),
+            "avg_reload_ms": round(self.total_reload_ms / self.reloads, 3) if self.reloads else 0.0,
+        }
+
+
+class PlaceCatalog:
+    """Versioned, lazily (re)loaded copy of the places repository.
+
+    Places are stored already serialized (`id` instead of `_id`). The lists
+    and dicts handed out are shared, so callers must copy before mutating.
+    """
+
+    def __init__(self, repository=None):
+        self._repository = repository
+        self.version = 0
+        self._loaded_version = -1
+        self._places: List[dict] = []
+        self._by_id: Dict[str, dict] = {}
+        self._lock = asyncio.Lock()
+        self._derived: Dict[str, tuple] = {}
+        self._listeners: List[Any] = []
+        self.stats = CatalogStats()
+
+    @property
+    def repository(self):
+        return self._repository if self._repository is not None else repositories.places
+
+    @property
+    def loaded_version(self) -> int:
+        """Version of the places currently held (-1 before the first load)."""
+        return self._loaded_version
+
+    def bump_version(self) -> int:
+        """Mark the cached catalog as stale. Called after every place write."""
+        self.version += 1
+        return self.version
+
+    def is_fresh(self) -> bool:
+        return self._loaded_version == self.version
+
+    async def ensure_loaded(self):
+        if self.is_fresh():
+            self.stats.hits += 1
+            return
+        self.stats.misses += 1
+        async with self._lock:
+            # Another request may have finished the reload while we waited.
+            if self.is_fresh():
+                return
+            await self._reload()
+
+    async def _reload(self):
+        version = self.version
+        started = time.perf_counter()
+        docs = await self.repository.all()
+        places = [serialize_place(doc) for doc in docs]
+
+        self._places = places
+        self._by_id = {p["id"]: p for p in places}
+        for listener in self._listeners:
+            listener.rebuild(places)
+        # If an admin write landed while we were reading, keep the old version
+        # tag so the next request reloads again.
+        self._loaded_version = version
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats.reloads += 1
+        self.stats.last_reload_ms = elapsed_ms
+        self.stats.total_reload_ms += elapsed_ms
+
+    def subscribe(self, listener):
+        """Keep `listener` in sync with the catalog.
+
+        Listeners implement `rebuild(places)`, called after every full reload,
+        and `upsert(place)` / `remove(place_id)` for incremental changes.
+        """
+        self._listeners.append(listener)
+        if self._loaded_version >= 0:
+            listener.rebuild(self._places)
+
+    def apply_upsert(self, doc: dict):
+        """Record a created or updated place document (as stored in Mongo)."""
+        if not self.is_fresh():
+            # Nothing usable cached (or a reload is due anyway); reload lazily.
+            self.bump_version()
+            return
+        place = serialize_place(doc)
+        previous = self._by_id.get(place["id"])
+        places = list(self._places)
+        if previous is None:
+            places.append(place)
+        else:
+            places[places.index(previous)] = place
+        self._commit(places, place["id"], place)
+        for listener in self._listeners:
+            listener.upsert(place)
+
+    def apply_remove(self, place_id: str):
+        """Record that a place was deleted."""
+        if not self.is_fresh():
+            self.bump_version()
+            return
+        places = [p for p in self._places if p["id"] != place_id]
+        self._commit(places, place_id, None)
+        for listener in self._listeners:
+            listener.remove(place_id)
+
+    def _commit(self, places: List[dict], place_id: str, place: Optional[dict]):
+        # Lists handed out earlier stay untouched; readers get the new copy.
+        self._places = places
+        if place is None:
+            self._by_id.pop(place_id, None)
+        else:
+            self._by_id[place_id] = place
+        self._loaded_version = self.bump_version()
+
+    async def get_places(self) -> List[dict]:
+        await self.ensure_loaded()
+        return self._places
+
+    async def get_place(self, place_id: str) -> Optional[dict]:
+        await self.ensure_loaded()
+        return self._by_id.get(place_id)
+
+    async def get_derived(self, name: str, build: Callable[[List[dict]], Any]) -> Any:
+        """Return `build(places)` for the current catalog, rebuilt only when it changes.
+
+        Used for structures compiled from the whole catalog (scoring arrays,
+        indexes) so their build cost is paid once per catalog version.
+        """
+        await self.ensure_loaded()
+        version = self._loaded_version
+        cached = self._derived.get(name)
+        if cached is None or cached[0] != version:
+            cached = (version, build(self._places))
+            self._derived[name] = cached
+        return cached[1]
+
+    def stats_dict(self) -> dict:
+        data = self.stats.as_dict()
+        data["version"] = self.version
+        data["loaded_version"] = self._loaded_version
+        data["places"] = len(self._places)
+        return data
+
+
+place_catalog = PlaceCatalog()
@@ -0,0 +1,168 @@
+# app/utils/clusters.py
+"""Zoom pyramid of pre-aggregated map marker clusters.
+
+For every zoom level the map is split into Web Mercator grid cells (each
+256px map tile is split into 4 x 4 cells, ~64px on screen). Every cell keeps
+the number of places in it, the sums of their coordinates (for the centroid)
+and per-category counts, so a map view is answered by reading the cells it
+covers instead of clustering raw places.
+
+The pyramid subscribes to `place_catalog`; a place write touches one cell
+per zoom level.
+
+Cells also keep the XOR of their members' ids (Mongo ObjectId hex strings),
+which equals the remaining member's id once a cell is down to one place, so
+single-place clusters can link to the place without storing member lists.
+"""
+import math
+from typing import Dict, List, Tuple
+
+from .catalog import place_catalog
+from .geo import place_coords
+
+MAX_ZOOM = 16
+CELL_BITS = 2  # 2**2 x 2**2 cells per map tile
+
+# A viewport needs at most a few thousand cells (a 4K screen is ~60 x 36);
+# larger requests are rejected so payloads stay bounded.
+MAX_CELLS_PER_QUERY = 4096
+
+TOP_CATEGORIES = 3
+
+MERCATOR_MAX_LAT = 85.05112878
+
+Cell = Tuple[int, int]
+
+
+def _unit_xy(lat: float, lng: float) -> Tuple[float, float]:
+    """Web Mercator position scaled to [0, 1) on both axes."""
+    lat = max(-MERCATOR_MAX_LAT, min(MERCATOR_MAX_LAT, lat))
+    x = (lng + 180.0) / 360.0
+    phi = math.radians(lat)
+    y = (1.0 - math.log(math.tan(phi) + 1.0 / math.cos(phi)) / math.pi) / 2.0
+    return x, y
+
+
+def _id_bits(place_id: str) -> int:
+    try:
+        return int(place_id, 16)
+    except ValueError:
+        return 0
+
+
+def _cell_at(ux: float, uy: float, zoom: int) -> Cell:
+    n = 1 << (zoom + CELL_BITS)
+    return min(int(ux * n), n - 1), min(int(uy * n), n - 1)
+
+
+class ClusterTooLarge(ValueError):
+    pass
+
+
+class ClusterPyramid:
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        # One dict per zoom level:
+        # cell -> [count, sum_lat, sum_lng, {category: count}, xor of id bits]
+        self._levels: List[Dict[Cell, list]] = [{} for _ in range(MAX_ZOOM + 1)]
+        self._points: Dict[str, Tuple[float, float, str, List[Cell]]] = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    # --------- Catalog listener ---------
+
+    def rebuild(self, places: List[dict]):
+        self._reset()
+        for place in places:
+            self.upsert(place)
+
+    def upsert(self, place: dict):
+        place_id = place["id"]
+        self.remove(place_id)
+        coords = place_coords(place)
+        if coords is None:
+            return
+        lat, lng = coords
+        category = (place.get("category") or "").lower()
+        ux, uy = _unit_xy(lat, lng)
+        cells = [_cell_at(ux, uy, zoom) for zoom in range(MAX_ZOOM + 1)]
+        bits = _id_bits(place_id)
+        for level, cell in zip(self._levels, cells):
+            entry = level.get(cell)
+            if entry is None:
+                entry = level[cell] = [0, 0.0, 0.0, {}, 0]
+            entry[0] += 1
+            entry[4] ^= bits
+            entry[1] += lat
+            entry[2] += lng
+            entry[3][category] = entry[3].get(category, 0) + 1
+        self._points[place_id] = (lat, lng, category, cells)
+
+    def remove(self, place_id: str):
+        point = self._points.pop(place_id, None)
+        if point is None:
+            return
+        lat, lng, category, cells = point
+        for level, cell in zip(self._levels, cells):
+            entry = level[cell]
+            entry[0] -= 1
+            if entry[0] == 0:
+                del level[cell]
+                continue
+            entry[1] -= lat
+            entry[2] -= lng
+            entry[4] ^= _id_bits(place_id)
+            entries = entry[3]
+            entries[category] -= 1
+            if not entries[category]:
+                del entries[category]
+
+    # --------- Queries ---------
+
+    def clusters(self, bbox: Tuple[float, float, float, float], zoom: int) -> List[dict]:
+        """Clusters inside `bbox` (min_lng, min_lat, max_lng, max_lat) at `zoom`.
+
+        Raises ClusterTooLarge if the box covers more than MAX_CELLS_PER_QUERY
+        cells at that zoom.
+        """
+        zoom = max(0, min(MAX_ZOOM, zoom))
+        min_lng, min_lat, max_lng, max_lat = bbox
+        x0, y0 = _cell_at(*_unit_xy(max_lat, min_lng), zoom)
+        x1, y1 = _cell_at(*_unit_xy(min_lat, max_lng), zoom)
+        area = (x1 - x0 + 1) * (y1 - y0 + 1)
+        if area > MAX_CELLS_PER_QUERY:
+            raise ClusterTooLarge(f"bbox covers {area} cells at zoom {zoom}")
+
+        level = self._levels[zoom]
+        if area <= len(level):
+            cells = ((x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1))
+            hits = [(cell, level[cell]) for cell in cells if cell in level]
+        else:
+            hits = [
+                (cell, entry) for cell, entry in level.items()
+                if x0 <= cell[0] <= x1 and y0 <= cell[1] <= y1
+            ]
+
+        results = []
+        for cell, (count, sum_lat, sum_lng, categories, id_bits) in hits:
+            top = sorted(categories.items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_CATEGORIES]
+            cluster = {
+                "count": count,
+                "lat": round(sum_lat / count, 6),
+                "lng": round(sum_lng / count, 6),
+                "top_categories": [{"category": c, "count": n} for c, n in top],
+            }
+            if count == 1:
+                place_id = format(id_bits, "024x")
+                point = self._points.get(place_id)
+                if point is not None and point[3][zoom] == cell:
+                    cluster["place_id"] = place_id
+            results.append(cluster)
+        return results
+
+
+cluster_pyramid = ClusterPyramid()
+place_catalog.subscribe(cluster_pyramid)
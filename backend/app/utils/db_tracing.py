@@ -0,0 +1,282 @@
+# app/utils/db_tracing.py
+"""Tracing of MongoDB commands through pymongo's command monitoring.
+
+`command_tracer` is registered on the Motor client (app/database.py). For
+every command on a collection it:
+
+- tags the command with the route template of the request that issued it
+  (`metrics.current_route`, carried into Motor's threads by contextvars),
+  or "background" outside requests
+- observes per-collection, per-operation latency on /metrics
+- aggregates count/total/max time per query shape: the filter, sort and
+  pipeline with values replaced by "?", so `{"email": "a@x.com"}` and
+  `{"email": "b@x.com"}` are the same shape
+- logs commands slower than SLOW_QUERY_MS, and for a sample of them
+  (SLOW_QUERY_EXPLAIN_RATE, at most once a minute per shape) runs
+  `explain` and keeps the winning plan next to the shape
+
+GET /admin/stats/queries lists the slowest shapes.
+
+Listener callbacks run on Motor's worker threads and must not block, so
+state is guarded by a lock and explains are scheduled on the event loop.
+"""
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from ..config import settings
+from .metrics import FAST_BUCKETS, Counter, Histogram, current_route
+
+logger = logging.getLogger(__name__)
+
+# Commands whose first value is the collection name
+COLLECTION_COMMANDS = {
+    "find", "aggregate", "count", "distinct", "insert", "update", "delete", "findAndModify", "createIndexes",
+}
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# Session/cluster fields that can't be sent back inside `explain`
+_NOT_EXPLAINABLE_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "$clusterTime", "$db",
+                           "$readPreference", "readConcern", "writeConcern"}
+EXPLAIN_COOLDOWN_SECONDS = 60.0
+MAX_SHAPES = 1000
+
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency by collection and operation.",
+    ("collection", "operation"),
+    buckets=FAST_BUCKETS + (0.5, 1.0, 2.5),
+)
+MONGO_COMMANDS = Counter(
+    "mongo_commands_total", "MongoDB commands by issuing route, collection and operation.",
+    ("route", "collection", "operation"),
+)
+MONGO_SLOW_COMMANDS = Counter(
+    "mongo_slow_commands_total", "MongoDB commands slower than SLOW_QUERY_MS.", ("collection", "operation"),
+)
+
+
+def _shape(value: Any) -> Any:
+    """`value` with every literal replaced by "?" (keys and operators kept)."""
+    if isinstance(value, dict):
+        return {k: _shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # `$in: [1, 2, 3]` and `$in: [4]` are one shape; pipelines keep their stages
+        shaped = [_shape(v) for v in value]
+        return shaped if any(isinstance(v, dict) for v in shaped) else "?"
+    return "?"
+
+
+def query_shape(command_name: str, command: dict) -> str:
+    if command_name in ("find", "count", "distinct"):
+        parts = {"filter": _shape(command.get("filter", command.get("query", {})))}
+        if command.get("sort"):
+            parts["sort"] = dict(command["sort"])
+        if command_name == "distinct":
+            parts["key"] = command.get("key")
+    elif command_name == "aggregate":
+        parts = {"pipeline": _shape(command.get("pipeline", []))}
+    elif command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        parts = {"filter": _shape(statements[0].get("q", {}))}
+    elif command_name == "findAndModify":
+        parts = {"filter": _shape(command.get("query", {}))}
+    else:
+        parts = {}
+    return json.dumps(parts, sort_keys=True, default=str)
+
+
+def plan_summary(explain: dict) -> Optional[str]:
+    """Winning plan as "FETCH > IXSCAN {category: 1, _id: 1}"-style text."""
+
+    def find_plan(node):
+        if isinstance(node, dict):
+            if "winningPlan" in node:
+                return node["winningPlan"]
+            for value in node.values():
+                found = find_plan(value)
+                if found is not None:
+                    return found
+        elif isinstance(node, list):
+            for value in node:
+                found = find_plan(value)
+                if found is not None:
+                    return found
+        return None
+
+    stage = find_plan(explain)
+    if stage is None:
+        return None
+    stage = stage.get("queryPlan", stage)  # slot-based engine
+    steps = []
+    while isinstance(stage, dict):
+        step = stage.get("stage", "?")
+        if "keyPattern" in stage:
+            step += " " + json.dumps(stage["keyPattern"], default=str)
+        steps.append(step)
+        stage = stage.get("inputStage") or (stage.get("inputStages") or [None])[0]
+    return " > ".join(steps)
+
+
+class ShapeStats:
+    def __init__(self, collection: str, operation: str, shape: str):
+        self.collection = collection
+        self.operation = operation
+        self.shape = shape
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow = 0
+        self.routes: Dict[str, int] = {}
+        self.plan: Optional[str] = None
+        self.last_explain = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "collection": self.collection,
+            "operation": self.operation,
+            "shape": self.shape,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "slow": self.slow,
+            "routes": dict(sorted(self.routes.items(), key=lambda item: -item[1])),
+            "plan": self.plan,
+        }
+
+
+class CommandTracer(monitoring.CommandListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (connection, request id) -> (route, collection, operation, shape, explainable command, db)
+        self._pending: Dict[Tuple[Any, int], tuple] = {}
+        self._shapes: Dict[Tuple[str, str, str], ShapeStats] = {}
+        self.untracked = 0  # commands of shapes past MAX_SHAPES
+        self.explains = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+
+    def attach(self, client, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Enable explains: they run on `loop` (the running one by default) through `client`."""
+        self._client = client
+        self._loop = loop or asyncio.get_running_loop()
+
+    # --------- pymongo listener ---------
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        name = event.command_name
+        if name not in COLLECTION_COMMANDS and name != "getMore":
+            return
+        command = event.command
+        collection = command.get("collection") if name == "getMore" else command.get(name)
+        if not isinstance(collection, str):
+            return
+        shape = "" if name == "getMore" else query_shape(name, command)
+        explainable = None
+        if name in EXPLAINABLE:
+            explainable = {k: v for k, v in command.items() if k not in _NOT_EXPLAINABLE_FIELDS}
+            for statements in ("updates", "deletes"):
+                if statements in explainable:  # explain takes one statement
+                    explainable[statements] = explainable[statements][:1]
+        route = current_route.get() or "background"
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                route, collection, name, shape, explainable, event.database_name,
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event)
+
+    def _finish(self, event):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        route, collection, operation, shape, explainable, database = pending
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.observe(seconds, collection, operation)
+        MONGO_COMMANDS.inc(route, collection, operation)
+
+        elapsed_ms = seconds * 1000
+        slow = elapsed_ms >= settings.SLOW_QUERY_MS
+        explain_now = False
+        with self._lock:
+            key = (collection, operation, shape)
+            stats = self._shapes.get(key)
+            if stats is None:
+                if len(self._shapes) >= MAX_SHAPES:
+                    self.untracked += 1
+                    stats = None
+                else:
+                    stats = self._shapes[key] = ShapeStats(collection, operation, shape)
+            if stats is not None:
+                stats.count += 1
+                stats.total_ms += elapsed_ms
+                stats.max_ms = max(stats.max_ms, elapsed_ms)
+                stats.routes[route] = stats.routes.get(route, 0) + 1
+                if slow:
+                    stats.slow += 1
+                    now = time.monotonic()
+                    if (
+                        explainable is not None
+                        and self._loop is not None
+                        and now - stats.last_explain >= EXPLAIN_COOLDOWN_SECONDS
+                        and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE
+                    ):
+                        stats.last_explain = now
+                        explain_now = True
+        if not slow:
+            return
+        MONGO_SLOW_COMMANDS.inc(collection, operation)
+        logger.warning("slow mongo %s on %s from %s: %.1f ms %s", operation, collection, route, elapsed_ms, shape)
+        if explain_now:
+            self._loop.call_soon_threadsafe(self._schedule_explain, key, database, operation, explainable)
+
+    # --------- explain ---------
+
+    def _schedule_explain(self, key, database: str, operation: str, command: dict):
+        asyncio.ensure_future(self._explain(key, database, operation, command))
+
+    async def _explain(self, key, database: str, operation: str, command: dict):
+        try:
+            result = await self._client[database].command({"explain": command, "verbosity": "queryPlanner"})
+        except Exception:
+            logger.exception("explain of slow %s on %s failed", operation, key[0])
+            return
+        plan = plan_summary(result)
+        with self._lock:
+            self.explains += 1
+            stats = self._shapes.get(key)
+            if stats is not None:
+                stats.plan = plan
+        logger.warning("plan of slow mongo %s on %s: %s", operation, key[0], plan)
+
+    # --------- reporting ---------
+
+    def top(self, limit: int = 10, sort: str = "max_ms") -> List[dict]:
+        """The `limit` slowest shapes by `sort` (max_ms, avg_ms, total_ms or count)."""
+        with self._lock:
+            shapes = [stats.as_dict() for stats in self._shapes.values()]
+        shapes.sort(key=lambda s: s[sort], reverse=True)
+        return shapes[:limit]
+
+    def stats_dict(self, limit: int = 10, sort: str = "max_ms") -> dict:
+        return {
+            "slow_query_ms": settings.SLOW_QUERY_MS,
+            "shapes": len(self._shapes),
+            "untracked": self.untracked,
+            "explains": self.explains,
+            "top": self.top(limit, sort),
+        }
+
+
+command_tracer = CommandTracer()
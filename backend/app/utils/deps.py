@@ -1,18 +1,18 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from .jwt_handler import decode_token
-from ..database import db
-from bson import ObjectId
+from .jwt_handler import decode_payload, token_revoked
+from .user_cache import user_cache
 
 auth_scheme = HTTPBearer()
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(auth_scheme)):
     token = credentials.credentials
-    user_id = decode_token(token)
-    if not user_id:
+    payload = decode_payload(token)
+    if not payload or not payload.get("sub"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    user = await user_cache.get(payload["sub"])
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    user["id"] = str(user["_id"])
+    if token_revoked(payload, user):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
     return user
@@ -0,0 +1,99 @@
+# app/utils/etags.py
+"""Strong ETags and conditional requests for places.
+
+- Full place lists (`GET /places/`, `GET /admin/places`), served from the
+  catalog, are tagged with the catalog version, so a matching
+  `If-None-Match` gets a 304 before any query runs. Versions restart with
+  the process and each worker counts its own, so the tag also carries a
+  random per-process epoch: after a restart, or on another worker, a
+  client gets a full response rather than a wrong 304.
+- Filtered or paginated lists come from the repository, which the catalog
+  version doesn't follow (a write from another worker or a script), so
+  they are tagged with the ids and revisions of the places on the page and
+  its next cursor (`page_etag`). The query has to run before a 304.
+- A single place is tagged with its `rev`, which every repository write
+  increments (app/repositories/base.py).
+- `PUT /admin/places/{place_id}` honours `If-Match` with a place tag: the
+  update only applies if the place is still at that revision, else 412.
+
+Responses carry `Cache-Control: no-cache`: browsers and the CDN may keep
+them but revalidate before each reuse, which is cheap with the tags above.
+"""
+import hashlib
+import re
+import secrets
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+EPOCH = secrets.token_hex(4)
+PUBLIC_CACHE_CONTROL = "no-cache"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+_ENTITY_TAG = re.compile(r'\*|(W/)?"([^"]*)"')
+_PLACE_TAG = re.compile(r"place-([0-9a-f]{24})-(\d+)")
+
+
+def catalog_etag(version: int) -> str:
+    return f'"catalog-{EPOCH}-{version}"'
+
+
+def place_etag(place_id: str, rev: int) -> str:
+    return f'"place-{place_id}-{rev}"'
+
+
+def page_etag(revisions: Iterable[Tuple[str, int]], next_cursor: Optional[str]) -> str:
+    """Tag for a page of places given as `(id, rev)` pairs and the cursor of the page after it."""
+    digest = hashlib.blake2b(digest_size=16)
+    for place_id, rev in revisions:
+        digest.update(f"{place_id}:{rev},".encode())
+    digest.update((next_cursor or "").encode())
+    return f'"page-{digest.hexdigest()}"'
+
+
+def place_revision(doc: dict) -> int:
+    # Places written before `rev` existed are at revision 0
+    return doc.get("rev") or 0
+
+
+def _tags(header: str) -> List[tuple]:
+    """`(weak, opaque tag)` pairs of an If-Match / If-None-Match header; "*" is `(False, "*")`."""
+    return [(bool(m.group(1)), m.group(2) if m.group(0) != "*" else "*") for m in _ENTITY_TAG.finditer(header)]
+
+
+def none_match(request: Request, etag: str) -> bool:
+    """True when `If-None-Match` lists `etag` (weak comparison, as for any GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    opaque = etag.strip('"')
+    return any(tag in ("*", opaque) for _, tag in _tags(header))
+
+
+def not_modified(etag: str, cache_control: str = PUBLIC_CACHE_CONTROL) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def set_etag(response: Response, etag: str, cache_control: str = PUBLIC_CACHE_CONTROL):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def if_match_revisions(request: Request, place_id: str) -> Optional[List[int]]:
+    """Revisions of `place_id` that `If-Match` accepts.
+
+    None when the header is absent or "*" (any existing place matches).
+    Strong comparison: weak tags and tags of other places never match, so
+    the list can be empty.
+    """
+    header = request.headers.get("if-match")
+    if not header:
+        return None
+    revisions = []
+    for weak, tag in _tags(header):
+        if tag == "*":
+            return None
+        match = _PLACE_TAG.fullmatch(tag)
+        if not weak and match and match.group(1) == place_id:
+            revisions.append(int(match.group(2)))
+    return revisions
@@ -0,0 +1,186 @@
+# app/utils/geo.py
+"""Spatial index over place locations for "places near me" queries.
+
+Places are bucketed into a fixed lat/lng grid. A query visits grid cells in
+rings around the query point and refines candidates with the haversine
+distance, stopping as soon as no unvisited cell can hold a closer place.
+
+The index subscribes to `place_catalog`, so admin writes keep it current.
+With `settings.GEO_BACKEND == "mongo"` the route instead runs a `$geoNear`
+aggregation over the GeoJSON `geo` field written by the admin router.
+"""
+import heapq
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+from .catalog import place_catalog
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# ~1.1 km of latitude per cell; Malta spans roughly 50 x 60 cells.
+CELL_DEG = 0.01
+
+Cell = Tuple[int, int]
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def place_coords(place: dict) -> Optional[Tuple[float, float]]:
+    """Return `(lat, lng)` from a place's `location` dict, or None if unusable."""
+    location = place.get("location")
+    if not isinstance(location, dict):
+        return None
+    lat, lng = location.get("lat"), location.get("lng")
+    if isinstance(lat, bool) or isinstance(lng, bool):
+        return None
+    if not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return float(lat), float(lng)
+
+
+def geo_point(location: Optional[dict]) -> Optional[dict]:
+    """GeoJSON point for a `{"lat", "lng"}` location (for the 2dsphere index)."""
+    coords = place_coords({"location": location})
+    if coords is None:
+        return None
+    return {"type": "Point", "coordinates": [coords[1], coords[0]]}
+
+
+def _cell(lat: float, lng: float) -> Cell:
+    return math.floor(lat / CELL_DEG), math.floor(lng / CELL_DEG)
+
+
+def _ring(center: Cell, r: int, bounds: List[int]):
+    """Cells exactly `r` rings away from `center`, clipped to `bounds`."""
+    row, col = center
+    min_row, max_row, min_col, max_col = bounds
+    col_lo, col_hi = max(col - r, min_col), min(col + r, max_col)
+    for cell_row in range(max(row - r, min_row), min(row + r, max_row) + 1):
+        if abs(cell_row - row) == r:
+            for cell_col in range(col_lo, col_hi + 1):
+                yield cell_row, cell_col
+        else:
+            if col - r >= min_col:
+                yield cell_row, col - r
+            if col + r <= max_col:
+                yield cell_row, col + r
+
+
+class SpatialIndex:
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._cells: Dict[Cell, Set[str]] = {}
+        self._points: Dict[str, Tuple[float, float, Cell]] = {}
+        self._docs: Dict[str, dict] = {}
+        # Bounding box of every cell ever occupied (rows, then cols). Not
+        # shrunk on removal; it only limits how far a query keeps searching.
+        self._bounds: Optional[List[int]] = None
+
+    def __len__(self):
+        return len(self._points)
+
+    # --------- Catalog listener ---------
+
+    def rebuild(self, places: List[dict]):
+        self._reset()
+        for place in places:
+            self.upsert(place)
+
+    def upsert(self, place: dict):
+        place_id = place["id"]
+        self.remove(place_id)
+        coords = place_coords(place)
+        if coords is None:
+            return
+        cell = _cell(*coords)
+        if self._bounds is None:
+            self._bounds = [cell[0], cell[0], cell[1], cell[1]]
+        else:
+            b = self._bounds
+            b[0], b[1] = min(b[0], cell[0]), max(b[1], cell[0])
+            b[2], b[3] = min(b[2], cell[1]), max(b[3], cell[1])
+        self._cells.setdefault(cell, set()).add(place_id)
+        self._points[place_id] = (coords[0], coords[1], cell)
+        self._docs[place_id] = place
+
+    def remove(self, place_id: str):
+        point = self._points.pop(place_id, None)
+        if point is None:
+            return
+        del self._docs[place_id]
+        ids = self._cells[point[2]]
+        ids.discard(place_id)
+        if not ids:
+            del self._cells[point[2]]
+
+    # --------- Queries ---------
+
+    def _ring_span(self, center: Cell) -> Tuple[int, int]:
+        """First and last ring around `center` that can hold an occupied cell."""
+        min_row, max_row, min_col, max_col = self._bounds
+        row, col = center
+        first = max(0, min_row - row, row - max_row, min_col - col, col - max_col)
+        last = max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+        return first, last
+
+    def nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius_km: Optional[float] = None,
+        category: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Tuple[dict, float]]:
+        """Return up to `limit` `(place, distance_km)` pairs, nearest first.
+
+        With `radius_km` only places within that distance are returned.
+        """
+        if limit <= 0 or self._bounds is None:
+            return []
+        center = _cell(lat, lng)
+        wanted = category.lower() if category else None
+        r, max_ring = self._ring_span(center)
+
+        # Max-heap (negated distances) of the best `limit` places so far.
+        best: List[Tuple[float, str]] = []
+        while r <= max_ring:
+            for cell in _ring(center, r, self._bounds):
+                for place_id in self._cells.get(cell, ()):
+                    p_lat, p_lng, _ = self._points[place_id]
+                    if wanted and (self._docs[place_id].get("category") or "").lower() != wanted:
+                        continue
+                    dist = haversine_km(lat, lng, p_lat, p_lng)
+                    if radius_km is not None and dist > radius_km:
+                        continue
+                    if len(best) < limit:
+                        heapq.heappush(best, (-dist, place_id))
+                    elif dist < -best[0][0]:
+                        heapq.heapreplace(best, (-dist, place_id))
+
+            # Anything outside ring r is at least r cells away along one axis.
+            # Longitude cells are narrowest at the most poleward row searched.
+            pole_lat = min(89.0, abs(lat) + (r + 1) * CELL_DEG)
+            reach_km = r * CELL_DEG * KM_PER_DEGREE * math.cos(math.radians(pole_lat))
+            if radius_km is not None and reach_km > radius_km:
+                break
+            if len(best) == limit and reach_km >= -best[0][0]:
+                break
+            r += 1
+
+        ranked = sorted((-neg, place_id) for neg, place_id in best)
+        return [(self._docs[place_id], dist) for dist, place_id in ranked]
+
+
+spatial_index = SpatialIndex()
+place_catalog.subscribe(spatial_index)
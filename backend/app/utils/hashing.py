@@ -1,6 +1,13 @@
 # app/utils/hashing.py
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
+from ..config import settings
+from .metrics import PASSWORD_HASH_REJECTED, PASSWORD_HASH_SECONDS, PASSWORD_HASH_WAIT_SECONDS
+
 MAX_BCRYPT_BYTES = 72  # bcrypt only uses the first 72 bytes
 
 def hash_password(password: str) -> str:
@@ -8,7 +15,7 @@ def hash_password(password: str) -> str:
     safe_password = password[:MAX_BCRYPT_BYTES]
     # Convert to bytes and hash
     password_bytes = safe_password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -19,3 +26,91 @@ def verify_password(password: str, hashed_password: str) -> bool:
     password_bytes = safe_password.encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
     return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different cost than BCRYPT_ROUNDS."""
+    try:
+        # "$2b$12$<salt+hash>"
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+# --------- Off-event-loop hashing ---------
+# bcrypt takes ~100-300 ms per call and releases the GIL, so the async
+# handlers run it in a bounded thread pool. When more than HASH_MAX_PENDING
+# calls are queued or running, new ones are refused (HashPoolBusy) instead
+# of piling up behind the pool.
+
+class HashPoolBusy(Exception):
+    pass
+
+
+class HashStats:
+    def __init__(self):
+        self.calls = 0
+        self.rejected = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_hash_ms = 0.0
+        self.max_hash_ms = 0.0
+
+    def record(self, wait_ms: float, hash_ms: float):
+        self.calls += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.total_hash_ms += hash_ms
+        self.max_hash_ms = max(self.max_hash_ms, hash_ms)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "pending": _pending,
+            "workers": settings.HASH_POOL_WORKERS,
+            "max_pending": settings.HASH_MAX_PENDING,
+            "avg_wait_ms": round(self.total_wait_ms / self.calls, 3) if self.calls else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+            "avg_hash_ms": round(self.total_hash_ms / self.calls, 3) if self.calls else 0.0,
+            "max_hash_ms": round(self.max_hash_ms, 3),
+        }
+
+
+hash_stats = HashStats()
+_executor = ThreadPoolExecutor(max_workers=settings.HASH_POOL_WORKERS, thread_name_prefix="bcrypt")
+_pending = 0
+
+
+async def _run_in_pool(operation: str, fn, *args):
+    global _pending
+    if _pending >= settings.HASH_MAX_PENDING:
+        hash_stats.rejected += 1
+        PASSWORD_HASH_REJECTED.inc(operation)
+        raise HashPoolBusy()
+
+    def timed():
+        started = time.perf_counter()
+        result = fn(*args)
+        return result, started, time.perf_counter()
+
+    _pending += 1
+    submitted = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        result, started, finished = await loop.run_in_executor(_executor, timed)
+    finally:
+        _pending -= 1
+    hash_stats.record((started - submitted) * 1000, (finished - started) * 1000)
+    PASSWORD_HASH_WAIT_SECONDS.observe(started - submitted, operation)
+    PASSWORD_HASH_SECONDS.observe(finished - started, operation)
+    return result
+
+
+async def hash_password_async(password: str) -> str:
+    """`hash_password` in the hashing pool. Raises HashPoolBusy when full."""
+    return await _run_in_pool("hash", hash_password, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """`verify_password` in the hashing pool. Raises HashPoolBusy when full."""
+    return await _run_in_pool("verify", verify_password, password, hashed_password)
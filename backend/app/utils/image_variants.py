@@ -0,0 +1,139 @@
+# app/utils/image_variants.py
+"""Resized WebP variants of place images, built off the API process.
+
+After an upload, `process_upload` runs the image through a process pool.
+The worker writes `<stem>-<width>w.webp` next to the original for each of
+VARIANT_WIDTHS narrower than the source, plus a tiny blurred placeholder
+returned inline as a data URI. The result is stored in the `place_images`
+collection and copied onto every place using that image as
+`image_variants`:
+
+    {"srcset": "/static/places/<stem>-320w.webp 320w, ...",
+     "variants": [{"url": ..., "width": 320, "height": 213}, ...],
+     "placeholder": "data:image/webp;base64,...",
+     "width": 1600, "height": 1067}
+
+Places created or updated later pick the stored result up via
+`variants_for_image`. `backfill_image_variants.py` runs the same pipeline
+for images uploaded before it existed.
+"""
+import asyncio
+import base64
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from ..config import settings
+from ..repositories import places
+from .catalog import place_catalog
+from .images import STATIC_PLACES_DIR, STATIC_PLACES_URL
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1024)
+WEBP_QUALITY = 80
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 30
+
+_executor: Optional[ProcessPoolExecutor] = None
+_running: set = set()
+
+
+def image_filename(image_url: Optional[str]) -> Optional[str]:
+    """Filename under static/places for a place.image value, if it is one of ours."""
+    prefix = STATIC_PLACES_URL + "/"
+    if not image_url or not image_url.startswith(prefix):
+        return None
+    name = image_url[len(prefix):]
+    if not name or "/" in name or name.startswith("."):
+        return None
+    return name
+
+
+# --------- Worker side (runs in the process pool) ---------
+
+def render_variants(filename: str) -> dict:
+    from PIL import Image, ImageOps
+
+    stem, _ = os.path.splitext(filename)
+    with Image.open(os.path.join(STATIC_PLACES_DIR, filename)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        width, height = image.size
+
+        variants = []
+        for target in VARIANT_WIDTHS:
+            if target >= width:
+                break
+            target_height = max(1, round(height * target / width))
+            name = f"{stem}-{target}w.webp"
+            path = os.path.join(STATIC_PLACES_DIR, name)
+            if not os.path.exists(path):
+                resized = image.resize((target, target_height), Image.LANCZOS)
+                tmp_path = os.path.join(STATIC_PLACES_DIR, f".{name}.tmp")
+                resized.save(tmp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+                os.replace(tmp_path, path)
+            variants.append({"url": f"{STATIC_PLACES_URL}/{name}", "width": target, "height": target_height})
+
+        tiny = image.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.BILINEAR)
+        buf = io.BytesIO()
+        tiny.save(buf, "WEBP", quality=PLACEHOLDER_QUALITY)
+
+    srcset = [f"{v['url']} {v['width']}w" for v in variants]
+    srcset.append(f"{STATIC_PLACES_URL}/{filename} {width}w")
+    return {
+        "srcset": ", ".join(srcset),
+        "variants": variants,
+        "placeholder": "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii"),
+        "width": width,
+        "height": height,
+    }
+
+
+# --------- API side ---------
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return _executor
+
+
+async def build_variants(filename: str) -> dict:
+    """Render the variants of one image in the pool and record them."""
+    loop = asyncio.get_running_loop()
+    info = await loop.run_in_executor(_pool(), render_variants, filename)
+    await places.save_image_variants(filename, info)
+    if await places.set_image_variants(f"{STATIC_PLACES_URL}/{filename}", info):
+        place_catalog.bump_version()
+    return info
+
+
+async def process_upload(filename: str):
+    """Background task after an upload: build variants unless they already exist."""
+    if filename in _running or await places.get_image_variants(filename):
+        return
+    _running.add(filename)
+    try:
+        await build_variants(filename)
+    except Exception:
+        logger.exception("building variants of %s failed", filename)
+    finally:
+        _running.discard(filename)
+
+
+async def variants_for_image(image_url: Optional[str]) -> Optional[dict]:
+    """Stored variants of a place.image value, or None if there are none (yet)."""
+    filename = image_filename(image_url)
+    if filename is None:
+        return None
+    return await places.get_image_variants(filename)
+
+
+def shutdown_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
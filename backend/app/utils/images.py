@@ -0,0 +1,149 @@
+# app/utils/images.py
+"""Content-addressed storage for uploaded place images.
+
+Uploads are streamed in chunks to a temporary file next to their final
+location, hashing as they go; file I/O runs in the thread pool so a large
+upload never blocks the event loop. The SHA-256 of the content becomes the
+stored filename, so uploading the same image twice keeps one file, and two
+different images can never overwrite each other.
+
+Starlette spools the whole multipart body before the route runs, so
+`UploadSizeLimit` refuses oversized uploads at the ASGI level first: on
+Content-Length before reading anything, or once a chunked body passes the
+limit. The size check in `store_upload` stays as the backstop.
+"""
+import hashlib
+import os
+import tempfile
+from typing import Iterable
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from ..config import settings
+
+STATIC_PLACES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "places")
+STATIC_PLACES_URL = "/static/places"
+
+ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+CHUNK_SIZE = 256 * 1024
+# Multipart boundaries, part headers and other form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class ImageTooLarge(Exception):
+    pass
+
+
+class UnsupportedImage(Exception):
+    pass
+
+
+def sniff_extension(head: bytes) -> str:
+    """File extension for the image format in the first bytes of a file."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    raise UnsupportedImage()
+
+
+def _open_temp():
+    os.makedirs(STATIC_PLACES_DIR, exist_ok=True)
+    # Same directory as the destination so the final rename is atomic.
+    return tempfile.NamedTemporaryFile(dir=STATIC_PLACES_DIR, prefix=".upload-", delete=False)
+
+
+def _finish(tmp_path: str, filename: str) -> bool:
+    """Move the temp file into place. Returns False if the content already existed."""
+    dest = os.path.join(STATIC_PLACES_DIR, filename)
+    if os.path.exists(dest):
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, dest)
+    return True
+
+
+def _discard(tmp_path: str):
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+async def store_upload(file: UploadFile) -> str:
+    """Store an uploaded image under its content hash and return the filename.
+
+    Raises ImageTooLarge past MAX_IMAGE_UPLOAD_BYTES and UnsupportedImage when
+    the content is not a JPEG, PNG or WebP image.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    out = await run_in_threadpool(_open_temp)
+    try:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > settings.MAX_IMAGE_UPLOAD_BYTES:
+                raise ImageTooLarge()
+            if len(head) < 12:
+                head += chunk[:12]
+            digest.update(chunk)
+            await run_in_threadpool(out.write, chunk)
+        await run_in_threadpool(out.close)
+
+        filename = digest.hexdigest() + sniff_extension(head)
+        await run_in_threadpool(_finish, out.name, filename)
+        return filename
+    except BaseException:
+        await run_in_threadpool(out.close)
+        await run_in_threadpool(_discard, out.name)
+        raise
+
+
+def image_url(filename: str) -> str:
+    return f"{STATIC_PLACES_URL}/{filename}"
+
+
+def _too_large_detail() -> str:
+    return f"Image larger than {settings.MAX_IMAGE_UPLOAD_BYTES} bytes"
+
+
+class UploadSizeLimit:
+    """ASGI middleware answering 413 for request bodies to `paths` over the upload limit."""
+
+    def __init__(self, app, paths: Iterable[str]):
+        self.app = app
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.MAX_IMAGE_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            response = JSONResponse({"detail": _too_large_detail()}, status_code=413, headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised while the form is parsed; FastAPI passes HTTPException through
+                    raise HTTPException(status_code=413, detail=_too_large_detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,15 +1,35 @@
 from datetime import datetime, timedelta
+from typing import Optional
 from jose import jwt
 from ..config import settings
 
-def create_access_token(subject: str, expires_minutes: int = 60*24):
-    expire = datetime.utcnow() + timedelta(minutes=expires_minutes)
-    to_encode = {"exp": expire, "sub": str(subject)}
+def user_claims(user: dict) -> dict:
+    """Claims embedded in access tokens so read-only routes can skip the DB."""
+    return {
+        "role": user.get("role", "user"),
+        "travel_style": user.get("travel_style"),
+        "budget": user.get("budget"),
+        "interests": user.get("interests") or [],
+    }
+
+def create_access_token(subject: str, expires_minutes: int = 60*24, claims: Optional[dict] = None):
+    now = datetime.utcnow()
+    expire = now + timedelta(minutes=expires_minutes)
+    to_encode = {"exp": expire, "iat": now, "sub": str(subject)}
+    if claims:
+        to_encode.update(claims)
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
-def decode_token(token: str):
+def decode_payload(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        return payload.get("sub")
+        return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
     except Exception:
         return None
+
+def decode_token(token: str):
+    payload = decode_payload(token)
+    return payload.get("sub") if payload else None
+
+def token_revoked(payload: dict, user: dict) -> bool:
+    """True if the user's token_version moved past the one in the token (logout, role change)."""
+    return payload.get("tv", 0) < user.get("token_version", 0)
@@ -0,0 +1,239 @@
+# app/utils/metrics.py
+"""In-process metrics exposed on /metrics in the Prometheus text format.
+
+- `MetricsMiddleware` counts requests per method, route template and status,
+  tracks in-flight requests and observes latency histograms. Routes are
+  labelled by template (`/places/{place_id}`), never by raw path, so label
+  values stay bounded; paths no route matches share one label, as do
+  nonstandard methods.
+- `Counter`, `Gauge` and `Histogram` are for custom timers (hashing, scoring,
+  image writes) defined at the bottom of this module.
+
+The middleware also publishes the route template in `current_route` so
+code further down (the Mongo command tracer) can tag its work by route.
+
+Metrics are per process: with several uvicorn workers each one exposes its
+own values, as with any Prometheus client without multiprocess mode. Updates
+take a module lock, since the Mongo tracer observes from Motor's threads.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.routing import Match, Mount
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends the charset
+UNMATCHED_ROUTE = "<unmatched>"
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+_registry: List["_Metric"] = []
+_lock = threading.Lock()
+
+# Route template of the request being served, or None outside requests
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(v) for v in labels)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(header + self._samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts, +Inf last; sum)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        key = self._key(labels)
+        slot = bisect_left(self.buckets, value)  # len(buckets) is +Inf
+        with _lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][slot] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        """Observe the duration of the `with` block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    with _lock:
+        return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# --------- HTTP middleware ---------
+
+def route_template(scope) -> str:
+    """Path template of the route serving `scope` (e.g. `/places/{place_id}`).
+
+    Matched the same way the router does; a route that matches the path but
+    not the method (405) still gives its template.
+    """
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.NONE:
+            continue
+        path = route.path + "/{path}" if isinstance(route, Mount) else route.path
+        if match == Match.FULL:
+            return path
+        partial = partial or path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+        route = route_template(scope)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc(method, route)
+        token = current_route.set(route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method, route)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_IN_PROGRESS.dec(method, route)
+            current_route.reset(token)
+
+
+# --------- Metrics ---------
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by method, route template and status.", ("method", "route", "status")
+)
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served.", ("method", "route"))
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template.", ("method", "route")
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds", "bcrypt time per call in the hashing pool.", ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.5),
+)
+PASSWORD_HASH_WAIT_SECONDS = Histogram(
+    "password_hash_wait_seconds", "Time queued for a hashing pool thread.", ("operation",)
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Hashing calls refused because the pool was full.", ("operation",)
+)
+RECOMMENDATION_SCORING_SECONDS = Histogram(
+    "recommendation_scoring_duration_seconds",
+    "Time to rank recommendations, by where the ranked band came from.",
+    ("source",),
+    buckets=FAST_BUCKETS,
+)
+IMAGE_WRITE_SECONDS = Histogram(
+    "image_write_duration_seconds", "Time to stream an uploaded place image to disk.", ("outcome",)
+)
@@ -0,0 +1,79 @@
+# app/utils/pagination.py
+"""Keyset (`_id` cursor) pagination, filters and projection for place lists.
+
+List routes return a plain JSON array as before; when more results exist the
+cursor for the next page is sent in the `X-Next-Cursor` response header and
+passed back as `?after=`. Filters are plain equality / `$all` matches so Mongo
+can answer them from the compound indexes in `repositories.mongo`
+(PLACE_LIST_INDEXES), walking `_id` in order and stopping after one page.
+"""
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from .catalog import serialize_place
+from .etags import page_etag, place_revision
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def place_filter(
+    category: Optional[str] = None,
+    price_level: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+) -> dict:
+    query = {}
+    if category:
+        query["category"] = category
+    if price_level:
+        query["price_level"] = price_level
+    if tags:
+        query["tags"] = {"$all": tags}
+    return query
+
+
+def parse_fields(fields: Optional[str]) -> Optional[dict]:
+    """Mongo projection for `fields=name,category,...` (`_id` is always kept)."""
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    for name in names:
+        if name.startswith("$") or name.startswith(".") or name.endswith("."):
+            raise HTTPException(status_code=400, detail=f"Invalid field name: {name}")
+    return {name: 1 for name in names}
+
+
+def parse_cursor(after: Optional[str]) -> Optional[ObjectId]:
+    if not after:
+        return None
+    try:
+        return ObjectId(after)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def fetch_page(
+    repository,
+    query: dict,
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+    projection: Optional[dict] = None,
+) -> Tuple[List[dict], Optional[str], str]:
+    """Return one page of serialized places, the cursor of the next page and the page's ETag."""
+    limit = limit or DEFAULT_PAGE_SIZE
+    hide_rev = projection is not None and "rev" not in projection
+    if hide_rev:
+        projection = {**projection, "rev": 1}  # the ETag needs it
+    # Fetch one extra document to know whether another page exists.
+    docs = await repository.find_page(query, parse_cursor(after), limit + 1, projection)
+    next_cursor = str(docs[limit - 1]["_id"]) if len(docs) > limit else None
+    docs = docs[:limit]
+    etag = page_etag(((str(doc["_id"]), place_revision(doc)) for doc in docs), next_cursor)
+    places = [serialize_place(doc) for doc in docs]
+    if hide_rev:
+        for place in places:
+            place.pop("rev", None)
+    return places, next_cursor, etag
@@ -0,0 +1,229 @@
+# app/utils/place_index.py
+"""Inverted index over the place catalog for candidate pruning.
+
+Most places share nothing with a given user's interests, so instead of
+scoring the whole catalog `PlaceIndex.band` only scores the places that can
+earn interest or style points:
+
+- postings from tag/category term to place ids
+- postings from travel style to the places carrying one of its tags
+- postings from description word to the places using it, so an interest
+  found in descriptions is the intersection of the postings of its words
+
+Every other place scores exactly its "base" (budget points + rating
+points). Per user budget the index keeps all places sorted by base score, so
+the best of those can be found by walking that list until no remaining place
+can come within jitter range of the current top-k.
+
+The index subscribes to `place_catalog` and is updated incrementally when
+the admin router creates, updates or deletes a place.
+"""
+import heapq
+import math
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set, Tuple
+
+from .catalog import place_catalog
+from .scoring import (
+    BUDGET_ORDER,
+    BAND_MARGIN,
+    BUDGET_POINTS,
+    STYLE_TAGS,
+    Preferences,
+    RankedBand,
+    description_words,
+    interest_words,
+    jitter_key,
+    place_budget_idx,
+    place_tags,
+    rating_points,
+    score_place,
+)
+
+# Queries whose postings cover more than this share of the catalog are
+# cheaper to score with the batched ScoringEngine (one candidate here costs
+# about as much as 100 places there, at 10k and at 100k places).
+BROAD_QUERY_FRACTION = 0.01
+
+
+def _place_terms(place: dict) -> Set[str]:
+    terms = place_tags(place)
+    category = (place.get("category") or "").lower()
+    if category:
+        terms.add(category)
+    return terms
+
+
+class PlaceIndex:
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._docs: Dict[str, dict] = {}
+        self._seq: Dict[str, int] = {}
+        self._keys: Dict[str, int] = {}
+        self._next_seq = 0
+        self._terms: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._style_postings: Dict[str, Set[str]] = {style: set() for style in STYLE_TAGS}
+        self._desc_words: Dict[str, Set[str]] = {}
+        self._word_postings: Dict[str, Set[str]] = {}
+        # One list per user budget index: (-base score, seq, place id)
+        self._by_base: List[List[Tuple[float, int, str]]] = [[] for _ in BUDGET_ORDER]
+        self._base_keys: Dict[str, List[Tuple[float, int, str]]] = {}
+
+    def __len__(self):
+        return len(self._docs)
+
+    # --------- Catalog listener ---------
+
+    def rebuild(self, places: List[dict]):
+        self._reset()
+        for place in places:
+            self._add(place)
+        for entries in self._by_base:
+            entries.sort()
+
+    def upsert(self, place: dict):
+        place_id = place["id"]
+        seq = self._seq.get(place_id)
+        if seq is not None:
+            self._discard(place_id)
+        self._add(place, seq, sort=True)
+
+    def remove(self, place_id: str):
+        if place_id in self._docs:
+            self._discard(place_id)
+
+    def _add(self, place: dict, seq: Optional[int] = None, sort: bool = False):
+        place_id = place["id"]
+        if seq is None:
+            seq = self._next_seq
+            self._next_seq += 1
+        self._docs[place_id] = place
+        self._seq[place_id] = seq
+        self._keys[place_id] = jitter_key(place_id)
+
+        terms = _place_terms(place)
+        self._terms[place_id] = terms
+        for term in terms:
+            self._postings.setdefault(term, set()).add(place_id)
+        for style, style_tags in STYLE_TAGS.items():
+            if terms & style_tags:
+                self._style_postings[style].add(place_id)
+
+        words = description_words(place)
+        self._desc_words[place_id] = words
+        for word in words:
+            self._word_postings.setdefault(word, set()).add(place_id)
+
+        place_idx = place_budget_idx(place)
+        rating = rating_points(place)
+        keys = []
+        for user_idx, entries in enumerate(self._by_base):
+            key = (-(BUDGET_POINTS[abs(user_idx - place_idx)] + rating), seq, place_id)
+            keys.append(key)
+            if sort:
+                insort(entries, key)
+            else:
+                entries.append(key)
+        self._base_keys[place_id] = keys
+
+    def _discard(self, place_id: str):
+        del self._docs[place_id]
+        del self._seq[place_id]
+        del self._keys[place_id]
+        for term in self._terms.pop(place_id):
+            ids = self._postings[term]
+            ids.discard(place_id)
+            if not ids:
+                del self._postings[term]
+        for ids in self._style_postings.values():
+            ids.discard(place_id)
+        for word in self._desc_words.pop(place_id):
+            ids = self._word_postings[word]
+            ids.discard(place_id)
+            if not ids:
+                del self._word_postings[word]
+        for entries, key in zip(self._by_base, self._base_keys.pop(place_id)):
+            del entries[bisect_left(entries, key)]
+
+    # --------- Queries ---------
+
+    def _desc_matches(self, interest: str) -> Set[str]:
+        postings = [self._word_postings.get(word) for word in interest_words(interest)]
+        if not postings or any(ids is None for ids in postings):
+            return set()
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def _candidate_postings(self, prefs: Preferences) -> List[Set[str]]:
+        postings = []
+        for interest in set(prefs.interests):
+            if interest in self._postings:
+                postings.append(self._postings[interest])
+            if interest:
+                postings.append(self._desc_matches(interest))
+        if prefs.style in self._style_postings:
+            postings.append(self._style_postings[prefs.style])
+        return postings
+
+    def _base_walk(self, budget_idx: int, k: int) -> int:
+        """Upper bound on the places `band` takes from the base walk.
+
+        Candidates only score above their base, so the band floor is at
+        least the k-th best base minus BAND_MARGIN.
+        """
+        by_base = self._by_base[budget_idx]
+        if not by_base or k <= 0:
+            return 0
+        kth = by_base[min(k, len(by_base)) - 1][0]
+        return bisect_left(by_base, (kth + BAND_MARGIN, math.inf))
+
+    def is_selective(self, prefs: Preferences, k: int) -> bool:
+        """Whether pruning is worth it for `prefs` (upper bound on the places `band` handles)."""
+        estimate = sum(len(ids) for ids in self._candidate_postings(prefs))
+        estimate += self._base_walk(prefs.budget_idx, k)
+        return estimate <= BROAD_QUERY_FRACTION * len(self._docs)
+
+    def band(self, prefs: Preferences, k: int) -> RankedBand:
+        """Every place that can reach the top `k` for `prefs` once jitter is added.
+
+        Same places as `ScoringEngine.band`, without scoring the whole catalog.
+        """
+        candidates: Set[str] = set()
+        for ids in self._candidate_postings(prefs):
+            candidates |= ids
+        scored = [
+            (score_place(self._docs[pid], prefs, self._desc_words[pid]), self._seq[pid], pid) for pid in candidates
+        ]
+
+        # Every other place scores its base exactly, and the best k of those
+        # come first on the base walk.
+        by_base = self._by_base[prefs.budget_idx]
+        best = [s for s, _, _ in scored]
+        found = 0
+        for neg_base, _, place_id in by_base:
+            if found == k:
+                break
+            if place_id not in candidates:
+                best.append(-neg_base)
+                found += 1
+        top = heapq.nlargest(k, best)
+        if not top:
+            return RankedBand([], [], [], [])
+
+        floor = top[-1] - BAND_MARGIN
+        members = [entry for entry in scored if entry[0] >= floor]
+        # Entries sort before (-floor, inf) exactly when their base reaches the floor
+        cut = bisect_left(by_base, (-floor, math.inf))
+        members += [(-neg_base, seq, pid) for neg_base, seq, pid in by_base[:cut] if pid not in candidates]
+        return RankedBand(
+            [self._docs[pid] for _, _, pid in members],
+            [score for score, _, _ in members],
+            [seq for _, seq, _ in members],
+            [self._keys[pid] for _, _, pid in members],
+        )
+
+place_index = PlaceIndex()
+place_catalog.subscribe(place_index)
@@ -0,0 +1,82 @@
+# app/utils/recommendation_cache.py
+"""LRU memo of recommendation rankings keyed by preference signature.
+
+Users with the same normalized interests, budget and travel style get the
+same unjittered scores, so the `RankedBand` computed for one of them serves
+all of them until the catalog changes. Jitter is applied per request from
+the user's id (see `scoring.user_jitter`), so each user still gets their own
+stable order.
+
+Entries are tied to the catalog version they were computed from; the first
+lookup against a newer version drops them all.
+"""
+from collections import OrderedDict
+from typing import Optional
+
+from ..config import settings
+from .scoring import RankedBand
+
+
+class RecommendationCacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class RecommendationCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, RankedBand]" = OrderedDict()
+        self._version: Optional[int] = None
+        self.stats = RecommendationCacheStats()
+
+    def _sync_version(self, version: int):
+        if version != self._version:
+            if self._entries:
+                self.stats.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, signature: tuple, version: int) -> Optional[RankedBand]:
+        self._sync_version(version)
+        band = self._entries.get(signature)
+        if band is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(signature)
+        self.stats.hits += 1
+        return band
+
+    def put(self, signature: tuple, version: int, band: RankedBand):
+        if version != self._version or self.maxsize <= 0:
+            return  # computed from a catalog that has since changed
+        self._entries[signature] = band
+        self._entries.move_to_end(signature)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats_dict(self) -> dict:
+        data = self.stats.as_dict()
+        data["size"] = len(self._entries)
+        data["maxsize"] = self.maxsize
+        data["version"] = self._version
+        return data
+
+
+recommendation_cache = RecommendationCache(settings.RECOMMENDATION_CACHE_SIZE)
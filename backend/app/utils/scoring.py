@@ -0,0 +1,445 @@
+# app/utils/scoring.py
+"""Rule-based place scoring used by `GET /recommendations/`.
+
+`score_place` is the reference implementation of the rules, one place at a
+time. `ScoringEngine` compiles the catalog into NumPy arrays once per catalog
+version and scores every place in a single batched pass; it produces the same
+scores as `score_place` (before jitter is added).
+
+An interest found in a description earns a point when each of its words is
+a word of the description ("sea" doesn't match "seafood"), so the engine can
+answer it from postings built once per catalog version.
+
+Jitter is deterministic per user: it comes from the place's 64-bit
+`jitter_key` XORed with a hash of the user id instead of a random draw. The
+unjittered part of a ranking therefore only depends on the
+`preference_signature`, and `RankedBand` holds the places that can still
+reach the top k once any user's jitter is added.
+"""
+import hashlib
+import heapq
+import itertools
+import re
+from bisect import bisect_left
+from functools import reduce
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+BUDGET_ORDER = {"low": 0, "medium": 1, "high": 2}
+
+STYLE_TAGS = {
+    "family": {"family", "kids", "playground", "easy"},
+    "nightlife": {"nightlife", "bar", "club", "music"},
+    "relaxed": {"relax", "chill", "spa", "beach"},
+    "adventurous": {"hiking", "cliff", "dive", "adventure"},
+    # extend with whatever travel_style values you actually use
+}
+
+# Points for a budget difference of 0, 1 and 2 steps.
+BUDGET_POINTS = (4, 2, 0)
+
+JITTER_MAX = 0.3
+
+# Places within this much of the k-th best score can still reach the top k
+# once jitter is added (+0.001 for the rounding to 3 decimals).
+BAND_MARGIN = JITTER_MAX + 0.001
+
+_WORD = re.compile(r"[^\W_]+")
+_WORD_OR_BREAK = re.compile(r"[^\W_]+|\n")
+
+
+class Preferences(NamedTuple):
+    interests: List[str]
+    budget_idx: int
+    style: str
+    style_tags: frozenset
+
+
+def normalize_preferences(user: dict) -> Preferences:
+    """Extract and normalize the preferences stored on a user document."""
+    raw_interests: List[str] = user.get("interests", []) or []
+    interests = [i.lower().strip() for i in raw_interests if isinstance(i, str)]
+
+    raw_budget = (user.get("budget") or "medium").lower()
+    budget_idx = BUDGET_ORDER.get(raw_budget, 1)  # default to medium
+
+    style = (user.get("travel_style") or "").lower().strip()
+    style_tags = frozenset(STYLE_TAGS.get(style, set()))
+    return Preferences(interests, budget_idx, style, style_tags)
+
+
+def preference_signature(prefs: Preferences) -> tuple:
+    """Canonical, hashable form of `prefs`; equal signatures give equal scores."""
+    style = prefs.style if prefs.style in STYLE_TAGS else ""
+    return (tuple(sorted(prefs.interests)), prefs.budget_idx, style)
+
+
+def place_tags(place: dict) -> set:
+    return {t.lower() for t in (place.get("tags") or []) if isinstance(t, str)}
+
+
+def description_words(place: dict) -> Set[str]:
+    return set(_WORD.findall((place.get("description") or "").lower()))
+
+
+def interest_words(interest: str) -> Tuple[str, ...]:
+    """Words an interest needs in a description to match it ("street food" -> both)."""
+    return tuple(_WORD.findall(interest))
+
+
+def mentions(words: Set[str], interest: str) -> bool:
+    terms = interest_words(interest)
+    return bool(terms) and all(term in words for term in terms)
+
+
+def place_budget_idx(place: dict) -> int:
+    price_level_raw = (place.get("price_level") or "medium").lower()
+    return BUDGET_ORDER.get(price_level_raw, 1)
+
+
+def rating_points(place: dict) -> float:
+    rating = place.get("rating")
+    if isinstance(rating, (int, float)):
+        return (float(rating) / 5.0) * 2  # normalize 0-5 into ~0-2
+    return 0.0
+
+
+def score_place(place: dict, prefs: Preferences, desc_words: Optional[Set[str]] = None) -> float:
+    """Score one place against a user's preferences (without jitter).
+
+    Takes into account:
+    - user interests vs place.tags & description words
+    - user budget vs place.price_level
+    - travel style vs style-specific tags
+    - place.rating as a tie-breaker
+
+    `desc_words` saves splitting the description again when the caller
+    already has its `description_words`.
+    """
+    score = 0.0
+
+    if desc_words is None:
+        desc_words = description_words(place)
+    category = (place.get("category") or "").lower()
+    tags = place_tags(place)
+
+    # 1) Interests vs tags & description
+    for interest in prefs.interests:
+        if interest in tags:
+            score += 3
+        elif mentions(desc_words, interest):
+            score += 1
+
+    # 2) Category match with interests
+    if category and category in prefs.interests:
+        score += 3
+
+    # 3) Budget vs price_level
+    diff = abs(prefs.budget_idx - place_budget_idx(place))
+    score += BUDGET_POINTS[diff]
+
+    # 4) Travel style vs tags
+    if prefs.style_tags:
+        score += 2 * len(prefs.style_tags.intersection(tags))
+        if category in prefs.style_tags:
+            score += 2
+
+    # 5) Rating as tie-breaker if stored on place
+    score += rating_points(place)
+    return score
+
+
+# --------- Deterministic jitter ---------
+
+# Below this many keys a tier range is simply sorted by jitter.
+_LEAF_SIZE = 32
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def jitter_key(place_id: str) -> int:
+    """64-bit key of a place, computed once per catalog version rather than per request."""
+    return _hash64(place_id)
+
+
+def jitter_keys(place_ids: Sequence[str]) -> np.ndarray:
+    return np.fromiter(map(jitter_key, place_ids), dtype=np.uint64, count=len(place_ids))
+
+
+def user_jitter(seed: str, place_keys: np.ndarray) -> np.ndarray:
+    """Jitter in [0, JITTER_MAX) for each place key, fixed for a given seed.
+
+    Monotonic in `key ^ hash(seed)`, which lets `RankedBand` visit places in
+    jitter order without computing every place's jitter.
+    """
+    mixed = place_keys ^ np.uint64(_hash64(seed))
+    return (mixed >> np.uint64(11)).astype(np.float64) / float(1 << 53) * JITTER_MAX
+
+
+def _jitter(key: int, seed_hash: int) -> float:
+    # Scalar `user_jitter`, bit for bit
+    return ((key ^ seed_hash) >> 11) / float(1 << 53) * JITTER_MAX
+
+
+def _round3(value: float) -> float:
+    # np.round(value, 3), bit for bit
+    return round(value * 1000.0) / 1000.0
+
+
+def _by_jitter(keys: List[int], seed_hash: int) -> Iterator[int]:
+    """Positions of the ascending `keys` in descending `key ^ seed_hash` order.
+
+    Walks the binary trie the sorted keys form: at the highest bit where a
+    range splits, the half whose bit differs from the seed's comes first.
+    Each position costs a few bisects, so the first few are found without
+    looking at the rest.
+    """
+    stack = [(0, len(keys), 63)]
+    while stack:
+        lo, hi, bit = stack.pop()
+        if hi - lo <= _LEAF_SIZE:
+            yield from sorted(range(lo, hi), key=lambda i: keys[i] ^ seed_hash, reverse=True)
+            continue
+        # keys[lo:hi] share every bit above `bit`; find the highest one they split on
+        while bit >= 0:
+            split = bisect_left(keys, (keys[lo] >> (bit + 1) << (bit + 1)) | (1 << bit), lo, hi)
+            if lo < split < hi:
+                break
+            bit -= 1
+        else:
+            yield from range(lo, hi)  # identical keys
+            continue
+        if seed_hash >> bit & 1:
+            stack.extend(((split, hi, bit - 1), (lo, split, bit - 1)))
+        else:
+            stack.extend(((lo, split, bit - 1), (split, hi, bit - 1)))
+
+
+class _Tier:
+    """Band members sharing one unjittered score, sorted by jitter key."""
+
+    __slots__ = ("score", "keys", "members")
+
+    def __init__(self, score: float, keys: List[int], members: List[int]):
+        self.score = score
+        self.keys = keys
+        self.members = members
+
+
+class RankedBand:
+    """Unjittered scores of the places that can make the top k, for one signature.
+
+    `order` is each place's catalog position, used to break ties the same way
+    a stable sort of the whole catalog would. `keys` are the places'
+    `jitter_key`s.
+
+    Members are grouped into tiers of equal score. `top_k` merges the tiers
+    in descending score + jitter, opening a tier only once it can beat what
+    is left, so a request touches about k members however many places tie.
+    """
+
+    def __init__(self, places: List[dict], scores: Sequence[float], order: Sequence[int], keys: Sequence[int]):
+        self.places = places
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.order = np.asarray(order, dtype=np.int64)
+        self.keys = np.asarray(keys, dtype=np.uint64)
+
+        by_tier = np.lexsort((self.keys, -self.scores))
+        tier_scores = self.scores[by_tier]
+        starts = np.flatnonzero(np.r_[True, tier_scores[1:] != tier_scores[:-1]]) if len(by_tier) else by_tier
+        bounds = np.r_[starts, len(by_tier)].tolist()
+        sorted_keys = self.keys[by_tier].tolist()
+        members = by_tier.tolist()
+        self._tiers = [
+            _Tier(float(tier_scores[lo]), sorted_keys[lo:hi], members[lo:hi]) for lo, hi in zip(bounds, bounds[1:])
+        ]
+
+    def __len__(self):
+        return len(self.places)
+
+    def top_k(self, k: int, seed: str) -> List[Tuple[dict, float]]:
+        """Return `(place, rounded score)` for the `k` best places with `seed`'s jitter.
+
+        Same result as sorting every member by (-round(score + jitter, 3), order).
+        """
+        if not self.places or k <= 0:
+            return []
+        seed_hash = _hash64(seed)
+        order = self.order.tolist()
+        # (-(score + jitter), catalog order, member, tier, position walk)
+        heap: list = []
+
+        def push_next(tier: _Tier, walk: Iterator[int]):
+            for pos in walk:
+                member = tier.members[pos]
+                value = tier.score + _jitter(tier.keys[pos], seed_hash)
+                heapq.heappush(heap, (-value, order[member], member, tier, walk))
+                return
+
+        tiers = iter(self._tiers)
+        waiting = next(tiers, None)
+        picked: List[Tuple[float, int, int]] = []
+        kth = None
+        while True:
+            # A tier's members all score below score + JITTER_MAX
+            while waiting is not None and (not heap or waiting.score + JITTER_MAX >= -heap[0][0]):
+                push_next(waiting, _by_jitter(waiting.keys, seed_hash))
+                waiting = next(tiers, None)
+            if not heap:
+                break
+            neg_value, member_order, member, tier, walk = heapq.heappop(heap)
+            rounded = _round3(-neg_value)
+            if kth is not None and rounded < kth:
+                break
+            # Keep going while members still round to the k-th score: catalog order decides among them
+            picked.append((rounded, member_order, member))
+            if len(picked) == k:
+                kth = rounded
+            push_next(tier, walk)
+
+        picked.sort(key=lambda p: (-p[0], p[1]))
+        return [(self.places[member], rounded) for rounded, _, member in picked[:k]]
+
+
+def _group(rows: np.ndarray, cols: np.ndarray, n_cols: int) -> List[np.ndarray]:
+    """Sorted rows of each column of the (rows, cols) pairs."""
+    order = np.argsort(cols, kind="stable")
+    bounds = np.searchsorted(cols[order], np.arange(n_cols + 1))
+    sorted_rows = rows[order]
+    return [sorted_rows[bounds[j]:bounds[j + 1]] for j in range(n_cols)]
+
+
+def _word_postings(texts: List[str]) -> Dict[str, np.ndarray]:
+    """Sorted positions of the texts using each word, as `description_words` splits them.
+
+    The texts are tokenized in one pass and grouped with NumPy; a Python
+    loop per word occurrence would dominate the engine's build time.
+    """
+    joined = "\n".join(text.replace("\n", " ") for text in texts).lower()
+    tokens = _WORD_OR_BREAK.findall(joined)
+    ids: Dict[str, int] = {}
+    # setdefault keeps the first id seen for a word: ids are unique, not dense
+    token_ids = np.fromiter(map(ids.setdefault, tokens, itertools.count()), dtype=np.int64, count=len(tokens))
+    breaks = token_ids == ids.pop("\n", -1)
+    rows = np.cumsum(breaks)[~breaks]
+    # One (word, text) pair per word used in a text, sorted by word, then text
+    # (sorting beats np.unique's hashing here)
+    pairs = np.sort(token_ids[~breaks] * max(len(texts), 1) + rows)
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+    cols, rows = np.divmod(pairs, max(len(texts), 1))
+    starts = np.flatnonzero(np.r_[True, cols[1:] != cols[:-1]]) if len(cols) else cols
+    words = {word_id: word for word, word_id in ids.items()}
+    return {words[c]: r for c, r in zip(cols[starts].tolist(), np.split(rows, starts[1:]))}
+
+
+class ScoringEngine:
+    """Catalog compiled into arrays for batched scoring.
+
+    - tag/category incidence: sparse COO pairs (`_rows`, `_cols`) over a term
+      vocabulary, with per-term posting arrays for membership tests
+    - `_category`: category term index per place (-1 when empty)
+    - `_budget`: budget index per place
+    - `_rating`: precomputed rating points per place
+    - `_desc_postings`: description word -> sorted positions of the places
+      using it, so an interest costs as much as the places that mention it
+    - `_keys`: `jitter_key` per place
+    """
+
+    def __init__(self, places: List[dict]):
+        self.places = places
+        self.size = len(places)
+        self._vocab: Dict[str, int] = {}
+
+        rows: List[int] = []
+        cols: List[int] = []
+        category = np.full(self.size, -1, dtype=np.int64)
+        budget = np.empty(self.size, dtype=np.int8)
+        rating = np.empty(self.size, dtype=np.float64)
+
+        for i, place in enumerate(places):
+            for tag in place_tags(place):
+                rows.append(i)
+                cols.append(self._term(tag))
+            cat = (place.get("category") or "").lower()
+            if cat:
+                category[i] = self._term(cat)
+            budget[i] = place_budget_idx(place)
+            rating[i] = rating_points(place)
+
+        self._rows = np.asarray(rows, dtype=np.int64)
+        self._cols = np.asarray(cols, dtype=np.int64)
+        self._category = category
+        self._budget = budget
+        self._rating = rating
+        self._postings = _group(self._rows, self._cols, len(self._vocab))
+        self._desc_postings = _word_postings([place.get("description") or "" for place in places])
+        self._keys = jitter_keys([place["id"] for place in places])
+
+    def _term(self, term: str) -> int:
+        idx = self._vocab.get(term)
+        if idx is None:
+            idx = self._vocab[term] = len(self._vocab)
+        return idx
+
+    def _desc_matches(self, interest: str) -> np.ndarray:
+        """Positions of the places whose description mentions `interest`."""
+        postings = [self._desc_postings.get(term) for term in interest_words(interest)]
+        if not postings or any(p is None for p in postings):
+            return np.empty(0, dtype=np.int64)
+        return reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), sorted(postings, key=len))
+
+    def score_all(self, prefs: Preferences) -> np.ndarray:
+        """Scores of every place for `prefs` (without jitter)."""
+        n = self.size
+        counts: Dict[str, int] = {}
+        for interest in prefs.interests:
+            counts[interest] = counts.get(interest, 0) + 1
+
+        # Query vector over the term vocabulary: +3 per matching interest,
+        # +2 per matching style tag.
+        weights = np.zeros(len(self._vocab), dtype=np.float64)
+        for interest, count in counts.items():
+            j = self._vocab.get(interest)
+            if j is not None:
+                weights[j] += 3 * count
+        for tag in prefs.style_tags:
+            j = self._vocab.get(tag)
+            if j is not None:
+                weights[j] += 2
+        # (bincount falls back to integers when no place has a tag)
+        score = np.bincount(self._rows, weights=weights[self._cols], minlength=n).astype(np.float64, copy=False)
+
+        # Interests found in the description but not in the tags: +1 each.
+        for interest, count in counts.items():
+            desc_hits = self._desc_matches(interest)
+            j = self._vocab.get(interest)
+            if j is not None and len(desc_hits):
+                desc_hits = np.setdiff1d(desc_hits, self._postings[j], assume_unique=True)
+            score[desc_hits] += count
+
+        # Category matches an interest (+3) or a style tag (+2).
+        interest_cats = [self._vocab[c] for c in counts if c and c in self._vocab]
+        if interest_cats:
+            score += 3 * np.isin(self._category, interest_cats)
+        style_cats = [self._vocab[c] for c in prefs.style_tags if c in self._vocab]
+        if style_cats:
+            score += 2 * np.isin(self._category, style_cats)
+
+        budget_points = np.asarray(BUDGET_POINTS, dtype=np.float64)
+        score += budget_points[np.abs(self._budget.astype(np.int64) - prefs.budget_idx)]
+
+        score += self._rating
+        return score
+
+    def band(self, prefs: Preferences, k: int) -> "RankedBand":
+        """Every place that can reach the top `k` for `prefs` once jitter is added."""
+        if self.size == 0 or k <= 0:
+            return RankedBand([], [], [], [])
+        scores = self.score_all(prefs)
+        k = min(k, self.size)
+        kth = np.partition(scores, self.size - k)[self.size - k]
+        members = np.flatnonzero(scores >= kth - BAND_MARGIN)
+        return RankedBand([self.places[i] for i in members], scores[members], members, self._keys[members])
@@ -0,0 +1,261 @@
+# app/utils/search.py
+"""Full-text place search (BM25) over the catalog.
+
+- Text is folded before indexing and querying: case-folded, accents
+  stripped, Maltese ħ → h (ġ, ċ, ż fold through Unicode decomposition) and
+  apostrophes dropped, so "Mellieħa", "MELLIEHA" and "mellieha" are one
+  term and "St. Peter’s" matches "st peters".
+- Fields are weighted (name counts most, then category and tags, then
+  description) into one term frequency per place, ranked with BM25.
+- A query term missing from the vocabulary is matched to the terms one edit
+  away (insert, delete, substitute or swap adjacent letters), found through
+  an index of single-letter deletions. Those matches score less than exact
+  ones.
+
+Postings are plain dicts so admin writes can update them incrementally; the
+arrays used to score a term are compiled on first use and dropped when a
+write touches that term. An updated place keeps its slot; a removed place
+leaves an empty one, and once those pass COMPACT_DEAD_FRACTION of the
+index it is rebuilt from the live places.
+"""
+import math
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .catalog import place_catalog
+
+FIELD_WEIGHTS = (("name", 3.0), ("category", 2.0), ("tags", 2.0), ("description", 1.0))
+K1 = 1.2
+B = 0.75
+# Typo matches: shortest and longest query term tried, score multiplier,
+# most terms tried
+MIN_FUZZY_LENGTH = 4
+MAX_FUZZY_LENGTH = 32
+FUZZY_PENALTY = 0.6
+MAX_FUZZY_EXPANSIONS = 8
+# Empty slots left by removals are compacted away past this share of the
+# live places (and at least COMPACT_MIN_DEAD of them)
+COMPACT_DEAD_FRACTION = 0.25
+COMPACT_MIN_DEAD = 64
+
+_FOLD = str.maketrans({
+    "ħ": "h", "ı": "i", "ł": "l", "ø": "o", "đ": "d", "æ": "ae", "œ": "oe",
+    "'": "", "’": "", "‘": "", "ʼ": "", "`": "",
+})
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.casefold().translate(_FOLD))
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(fold(text))
+
+
+def _deletes(term: str) -> Set[str]:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _fuzzy_target(term: str) -> bool:
+    # Numbers (street numbers, "#12") are only ever matched exactly, and so
+    # are runs of letters no word has: indexing every deletion of them would
+    # cost the square of their length
+    return MIN_FUZZY_LENGTH - 1 <= len(term) <= MAX_FUZZY_LENGTH + 1 and term.isalpha()
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Optimal string alignment distance of at most 1."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        i = diff[0]
+        return len(diff) == 2 and diff[1] == i + 1 and a[i] == b[i + 1] and a[i + 1] == b[i]
+    if la > lb:
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+def place_term_frequencies(place: dict) -> Dict[str, float]:
+    tf: Dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS:
+        value = place.get(field)
+        if isinstance(value, list):
+            value = " ".join(v for v in value if isinstance(v, str))
+        if not isinstance(value, str):
+            continue
+        for term in tokenize(value):
+            tf[term] = tf.get(term, 0.0) + weight
+    return tf
+
+
+class SearchIndex:
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._slots: Dict[str, int] = {}
+        self._places: List[Optional[dict]] = []
+        self._doc_terms: List[Optional[Dict[str, float]]] = []
+        self._lengths: List[float] = []
+        self._total_length = 0.0
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._by_delete: Dict[str, Set[str]] = {}
+        self._compiled: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._norm: Optional[np.ndarray] = None
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    # --------- Catalog listener ---------
+
+    def rebuild(self, places: List[dict]):
+        self._reset()
+        for place in places:
+            self._add(place)
+
+    def upsert(self, place: dict):
+        slot = self._slots.get(place["id"])
+        if slot is not None:
+            self._discard(place["id"])
+        self._add(place, slot)
+
+    def remove(self, place_id: str):
+        if place_id not in self._slots:
+            return
+        self._discard(place_id)
+        self._dead += 1
+        if self._dead >= max(COMPACT_MIN_DEAD, COMPACT_DEAD_FRACTION * len(self._slots)):
+            self.rebuild([place for place in self._places if place is not None])
+
+    def _add(self, place: dict, slot: Optional[int] = None):
+        tf = place_term_frequencies(place)
+        length = sum(tf.values())
+        if slot is None:
+            slot = len(self._places)
+            self._places.append(place)
+            self._doc_terms.append(tf)
+            self._lengths.append(length)
+        else:
+            self._places[slot] = place
+            self._doc_terms[slot] = tf
+            self._lengths[slot] = length
+        self._slots[place["id"]] = slot
+        self._total_length += length
+        for term, freq in tf.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if _fuzzy_target(term):
+                    for variant in _deletes(term):
+                        self._by_delete.setdefault(variant, set()).add(term)
+            postings[slot] = freq
+            self._compiled.pop(term, None)
+        self._norm = None
+
+    def _discard(self, place_id: str):
+        slot = self._slots.pop(place_id)
+        tf = self._doc_terms[slot]
+        self._places[slot] = None
+        self._doc_terms[slot] = None
+        self._total_length -= self._lengths[slot]
+        self._lengths[slot] = 0.0
+        for term in tf:
+            postings = self._postings[term]
+            del postings[slot]
+            self._compiled.pop(term, None)
+            if not postings:
+                del self._postings[term]
+                if _fuzzy_target(term):
+                    for variant in _deletes(term):
+                        terms = self._by_delete[variant]
+                        terms.discard(term)
+                        if not terms:
+                            del self._by_delete[variant]
+        self._norm = None
+
+    # --------- Querying ---------
+
+    def _term_arrays(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._compiled.get(term)
+        if arrays is None:
+            postings = self._postings[term]
+            slots = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            freqs = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            arrays = self._compiled[term] = (slots, freqs)
+        return arrays
+
+    def _length_norm(self) -> np.ndarray:
+        if self._norm is None:
+            avg = self._total_length / len(self._slots) if self._slots else 1.0
+            lengths = np.asarray(self._lengths, dtype=np.float64)
+            self._norm = K1 * (1 - B + B * lengths / (avg or 1.0))
+        return self._norm
+
+    def expand(self, term: str) -> List[Tuple[str, float]]:
+        """Index terms for a query term with their score multipliers."""
+        if term in self._postings:
+            return [(term, 1.0)]
+        if not MIN_FUZZY_LENGTH <= len(term) <= MAX_FUZZY_LENGTH or not term.isalpha():
+            return []
+        candidates = set(self._by_delete.get(term, ()))  # one letter missing from the query
+        for variant in _deletes(term):
+            if variant in self._postings:
+                candidates.add(variant)  # one extra letter in the query
+            candidates |= self._by_delete.get(variant, set())  # substituted or swapped letters
+        matches = [t for t in candidates if _within_one_edit(term, t)]
+        matches.sort(key=lambda t: (-len(self._postings[t]), t))
+        return [(t, FUZZY_PENALTY) for t in matches[:MAX_FUZZY_EXPANSIONS]]
+
+    def search(self, query: str, limit: int) -> List[Tuple[dict, float]]:
+        """Best `limit` places for `query` with their BM25 scores, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._slots:
+            return []
+        n = len(self._slots)
+        norm = self._length_norm()
+        scores = np.zeros(len(self._places), dtype=np.float64)
+        for term in terms:
+            expansions = self.expand(term)
+            if not expansions:
+                continue
+            # With several typo matches a place counts its best one only
+            best = scores if len(expansions) == 1 else np.zeros_like(scores)
+            for index_term, multiplier in expansions:
+                slots, freqs = self._term_arrays(index_term)
+                df = len(slots)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                contrib = multiplier * idf * freqs * (K1 + 1) / (freqs + norm[slots])
+                if best is scores:
+                    scores[slots] += contrib
+                else:
+                    np.maximum.at(best, slots, contrib)
+            if best is not scores:
+                scores += best
+
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        # Best score first; ties keep catalog order
+        matched = matched[np.lexsort((matched, -scores[matched]))]
+        return [(self._places[slot], float(scores[slot])) for slot in matched]
+
+
+search_index = SearchIndex()
+place_catalog.subscribe(search_index)
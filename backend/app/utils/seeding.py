@@ -0,0 +1,209 @@
+# app/utils/seeding.py
+"""Place normalization and catalog generation for `seed_catalog.py`.
+
+Two place shapes exist in the wild:
+
+- `backend/seed_places.py`: `location` as `{"lat", "lng"}`, `price_level`
+  ("low"/"medium"/"high") and `tags`
+- the top-level `seed_places.py` (and documents it inserted): `location` as
+  an address string, `price` as "€"/"€€"/"€€€", `type` next to `category`
+  and no tags
+
+`normalize_place` maps either onto `PlaceCreate`; `is_legacy` tells them
+apart. `synthetic_places`
+generates a deterministic catalog of any size inside Malta, Gozo and Comino
+for load tests.
+"""
+import ast
+import json
+import math
+import os
+import random
+from typing import Iterator, List, Optional
+
+from ..schemas.place import PlaceCreate
+from .scoring import BUDGET_ORDER
+
+PRICE_SYMBOLS = {"€": "low", "€€": "medium", "€€€": "high", "€€€€": "high", "free": "low"}
+
+# Fields of the legacy shape that have no place in PlaceCreate.
+LEGACY_FIELDS = ("type", "price")
+
+
+class SeedFileError(Exception):
+    pass
+
+
+def is_legacy(raw: dict) -> bool:
+    """True for a place in the old seeder shape (address string location, `price`, `type`)."""
+    return isinstance(raw.get("location"), str) or any(field in raw for field in LEGACY_FIELDS)
+
+
+def _price_level(raw: dict) -> Optional[str]:
+    level = raw.get("price_level")
+    if isinstance(level, str) and level.lower().strip() in BUDGET_ORDER:
+        return level.lower().strip()
+    price = raw.get("price")
+    if isinstance(price, str):
+        return PRICE_SYMBOLS.get(price.strip().lower())
+    return None
+
+
+def _location(raw: dict) -> Optional[dict]:
+    location = raw.get("location")
+    if isinstance(location, dict):
+        lat, lng = location.get("lat"), location.get("lng")
+        if isinstance(lat, (int, float)) and isinstance(lng, (int, float)):
+            return {**location, "lat": float(lat), "lng": float(lng)}
+        return location or None
+    if isinstance(location, str) and location.strip():
+        return {"address": location.strip()}
+    return None
+
+
+def normalize_place(raw: dict) -> PlaceCreate:
+    """Map a place in either seeder shape onto `PlaceCreate`.
+
+    Raises pydantic's ValidationError when required fields are missing.
+    """
+    category = (raw.get("category") or raw.get("type") or "").lower().strip()
+    kind = (raw.get("type") or "").lower().strip()
+
+    tags = [t.lower().strip() for t in (raw.get("tags") or []) if isinstance(t, str) and t.strip()]
+    if not tags:
+        # Legacy places have no tags; their category and type are the best we have.
+        tags = [t for t in dict.fromkeys([category, kind]) if t]
+
+    rating = raw.get("rating")
+    if isinstance(rating, bool) or not isinstance(rating, (int, float)):
+        rating = None
+
+    return PlaceCreate(
+        name=(raw.get("name") or "").strip() or None,
+        category=category or None,
+        description=raw.get("description"),
+        location=_location(raw),
+        price_level=_price_level(raw),
+        tags=list(dict.fromkeys(tags)),
+        image=raw.get("image"),
+        duration=raw.get("duration"),
+        rating=float(rating) if rating is not None else None,
+    )
+
+
+def load_seed_file(path: str) -> List[dict]:
+    """Raw places from a seeder module (its top-level list literal), JSON or NDJSON.
+
+    Seeder modules are parsed, not imported, so their database side effects
+    never run.
+    """
+    _, ext = os.path.splitext(path)
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if ext == ".py":
+        for node in ast.parse(text, filename=path).body:
+            if isinstance(node, ast.Assign) and isinstance(node.value, ast.List):
+                names = [t.id for t in node.targets if isinstance(t, ast.Name)]
+                if any(name.lower() == "places" for name in names):
+                    return ast.literal_eval(node.value)
+        raise SeedFileError(f"{path}: no top-level `places`/`PLACES` list")
+    if ext in (".ndjson", ".jsonl"):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    if not isinstance(data, list):
+        raise SeedFileError(f"{path}: expected a JSON array of places")
+    return data
+
+
+# --------- Synthetic catalog ---------
+
+# (south, west, north, east) and share of places
+REGIONS = [
+    ((35.81, 14.33, 35.99, 14.57), 0.80),  # Malta
+    ((36.01, 14.19, 36.08, 14.34), 0.18),  # Gozo
+    ((36.00, 14.32, 36.02, 14.35), 0.02),  # Comino
+]
+
+TOWNS = [
+    "Valletta", "Sliema", "St. Julian's", "Mdina", "Rabat", "Mellieħa", "Marsaxlokk",
+    "Birgu", "Senglea", "Bugibba", "Qawra", "Mosta", "Naxxar", "Żebbuġ", "Gżira",
+    "Marsaskala", "Victoria", "Xlendi", "Marsalforn", "Xagħra", "Għajnsielem",
+]
+
+# category: (share, price level weights low/medium/high, tag pool, nouns)
+CATEGORIES = {
+    "restaurant": (0.24, (0.3, 0.5, 0.2), ["food", "seafood", "maltese", "wine", "romantic", "view", "family"],
+                   ["Kitchen", "Trattoria", "Grill", "Bistro"]),
+    "beach": (0.12, (0.8, 0.15, 0.05), ["beach", "swimming", "snorkeling", "family", "sunset", "outdoor", "relax"],
+              ["Bay", "Beach", "Cove", "Lido"]),
+    "bar": (0.12, (0.3, 0.5, 0.2), ["nightlife", "bar", "music", "club", "cocktails", "view"],
+            ["Bar", "Lounge", "Club", "Pub"]),
+    "history": (0.12, (0.4, 0.5, 0.1), ["history", "culture", "architecture", "photography", "unesco"],
+                ["Fort", "Tower", "Palazzo", "Temples"]),
+    "church": (0.08, (0.8, 0.2, 0.0), ["church", "history", "architecture", "baroque", "culture"],
+               ["Parish Church", "Chapel", "Basilica"]),
+    "museum": (0.08, (0.3, 0.6, 0.1), ["museum", "history", "culture", "art", "kids", "easy"],
+               ["Museum", "Gallery", "Collection"]),
+    "nature": (0.12, (0.9, 0.1, 0.0), ["nature", "hiking", "cliff", "photography", "sunset", "adventure", "dive"],
+               ["Cliffs", "Valley", "Trail", "Gardens"]),
+    "activity": (0.08, (0.2, 0.5, 0.3), ["dive", "adventure", "boat", "kids", "playground", "spa", "chill"],
+                 ["Dive Centre", "Boat Trips", "Spa", "Adventure Park"]),
+    "culture": (0.04, (0.6, 0.3, 0.1), ["market", "culture", "festa", "photography", "food"],
+                ["Market", "Square", "Festa Grounds"]),
+}
+
+DESCRIPTIONS = [
+    "A favourite with locals, known for its {0} and {1}.",
+    "Great for {0}; come early to enjoy the {1} before the crowds.",
+    "Popular spot for {0} with easy access to {1}.",
+    "Hidden gem offering {0}, {1} and views over the harbour.",
+]
+
+
+def _zipf_weights(n: int, s: float = 1.1) -> List[float]:
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def synthetic_places(count: int, seed: int = 0) -> Iterator[dict]:
+    """Yield `count` places deterministically for `seed`, one at a time.
+
+    Categories follow the shares above; within a category, tags follow a
+    Zipf distribution (the first ones in each pool are the most common), so
+    some interests match many places and others few, as in real data.
+    Names are unique, so reseeding upserts instead of duplicating.
+    """
+    rng = random.Random(seed)
+    categories = list(CATEGORIES)
+    shares = [CATEGORIES[c][0] for c in categories]
+    regions = [r for r, _ in REGIONS]
+    region_shares = [w for _, w in REGIONS]
+    levels = ["low", "medium", "high"]
+
+    for i in range(count):
+        category = rng.choices(categories, shares)[0]
+        _, price_weights, pool, nouns = CATEGORIES[category]
+        south, west, north, east = rng.choices(regions, region_shares)[0]
+
+        n_tags = min(len(pool), 1 + int(rng.expovariate(0.6)))
+        tags = []
+        weights = _zipf_weights(len(pool))
+        while len(tags) < n_tags:
+            tag = rng.choices(pool, weights)[0]
+            if tag not in tags:
+                tags.append(tag)
+
+        described = rng.sample(pool, 2)
+        rating = min(5.0, max(1.0, rng.gauss(4.2, 0.45)))
+        yield {
+            "name": f"{rng.choice(TOWNS)} {rng.choice(nouns)} #{i + 1}",
+            "category": category,
+            "description": rng.choice(DESCRIPTIONS).format(*described),
+            "location": {
+                "lat": round(rng.uniform(south, north), 5),
+                "lng": round(rng.uniform(west, east), 5),
+            },
+            "price_level": rng.choices(levels, price_weights)[0],
+            "tags": tags,
+            "duration": rng.choice(["1h", "2h", "3h", "Half day", "All day"]),
+            "rating": math.floor(rating * 10) / 10,
+        }
@@ -0,0 +1,205 @@
+# app/utils/static_files.py
+"""Cache-friendly serving of place images under /static/places.
+
+Uploaded images are named after the SHA-256 of their content (see
+`utils/images.py`) and their WebP variants after the same hash, so a given
+URL never changes content. For those names:
+
+- the ETag is the hash itself (strong, no file read needed)
+- `Cache-Control: public, max-age=31536000, immutable`
+
+Older, hand-named files get an ETag from size and mtime and a short
+max-age. Every response supports `If-None-Match` / `If-Modified-Since`
+(304), single byte ranges (206/416, honouring `If-Range`) and HEAD. A
+`.br` or `.gz` file next to a compressible asset is served instead when the
+client accepts it; raster images are already compressed and never are.
+
+Bodies are sent with the ASGI zero-copy extension when the server offers
+it, and otherwise read in chunks in the thread pool.
+"""
+import mimetypes
+import os
+import re
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Optional, Tuple
+
+import anyio
+
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MUTABLE_CACHE_CONTROL = "public, max-age=3600"
+
+# "<sha256>.<ext>" and "<sha256>-<width>w.webp"
+CONTENT_ADDRESSED = re.compile(r"^([0-9a-f]{64}(?:-\d+w)?)\.[a-z0-9]+$")
+COMPRESSIBLE_TYPES = {"image/svg+xml", "application/json", "text/plain", "text/css", "application/javascript"}
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag(filename: str, st: os.stat_result) -> Tuple[str, bool]:
+    match = CONTENT_ADDRESSED.match(filename)
+    if match:
+        return f'"{match.group(1)}"', True
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"', False
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match.
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _not_modified_since(header: str, st: os.stat_result) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(st.st_mtime) <= since
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """`(start, end)` inclusive for a single `bytes=` range.
+
+    Returns None when the header should be ignored (malformed or several
+    ranges) and raises ValueError when the range cannot be satisfied.
+    """
+    match = RANGE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0:
+            raise ValueError()
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError()
+    return start, end
+
+
+class PlaceImageFiles:
+    """ASGI app serving the files of one flat directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    async def __call__(self, scope, receive, send):
+        assert scope["type"] == "http"
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._send_empty(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+
+        filename = scope["path"].lstrip("/")
+        if not filename or "/" in filename or "\\" in filename or filename.startswith("."):
+            await self._send_empty(send, 404)
+            return
+        path = os.path.join(self.directory, filename)
+        try:
+            st = await anyio.to_thread.run_sync(os.stat, path)
+        except (FileNotFoundError, NotADirectoryError):
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            await self._send_empty(send, 404)
+            return
+
+        request_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        encoding = None
+        if media_type in COMPRESSIBLE_TYPES:
+            accepted = request_headers.get("accept-encoding", "")
+            for name, suffix in PRECOMPRESSED:
+                if name in accepted:
+                    try:
+                        compressed = await anyio.to_thread.run_sync(os.stat, path + suffix)
+                    except FileNotFoundError:
+                        continue
+                    encoding, path, st = name, path + suffix, compressed
+                    break
+
+        etag, immutable = _etag(filename, st)
+        if encoding:
+            etag = f'{etag[:-1]}-{encoding}"'  # each representation has its own tag
+        headers: List[Tuple[bytes, bytes]] = [
+            (b"etag", etag.encode()),
+            (b"last-modified", formatdate(st.st_mtime, usegmt=True).encode()),
+            (b"cache-control", (IMMUTABLE_CACHE_CONTROL if immutable else MUTABLE_CACHE_CONTROL).encode()),
+            (b"accept-ranges", b"bytes"),
+        ]
+        if media_type in COMPRESSIBLE_TYPES:
+            headers.append((b"vary", b"accept-encoding"))
+
+        if "if-none-match" in request_headers:
+            not_modified = _etag_matches(request_headers["if-none-match"], etag)
+        else:
+            not_modified = "if-modified-since" in request_headers and _not_modified_since(
+                request_headers["if-modified-since"], st
+            )
+        if not_modified:
+            await self._send_empty(send, 304, headers)
+            return
+
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode()))
+        headers.append((b"content-type", media_type.encode()))
+
+        status, start, end = 200, 0, st.st_size - 1
+        range_header = request_headers.get("range")
+        if range_header and st.st_size and self._if_range_ok(request_headers.get("if-range"), etag, st):
+            try:
+                requested = parse_range(range_header, st.st_size)
+            except ValueError:
+                await self._send_empty(send, 416, headers + [(b"content-range", f"bytes */{st.st_size}".encode())])
+                return
+            if requested is not None:
+                status, (start, end) = 206, requested
+                headers.append((b"content-range", f"bytes {start}-{end}/{st.st_size}".encode()))
+
+        length = end - start + 1
+        headers.append((b"content-length", str(length).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        if scope["method"] == "HEAD" or length <= 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await self._send_file(scope, send, path, start, length)
+
+    @staticmethod
+    def _if_range_ok(if_range: Optional[str], etag: str, st: os.stat_result) -> bool:
+        if if_range is None:
+            return True
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            return if_range == etag  # strong comparison
+        return _not_modified_since(if_range, st)
+
+    @staticmethod
+    async def _send_empty(send, status: int, headers: Optional[List[Tuple[bytes, bytes]]] = None):
+        await send({"type": "http.response.start", "status": status, "headers": headers or []})
+        await send({"type": "http.response.body", "body": b""})
+
+    @staticmethod
+    async def _send_file(scope, send, path: str, start: int, length: int):
+        zerocopy = "http.response.zerocopy" in scope.get("extensions", {})
+        file = await anyio.to_thread.run_sync(open, path, "rb")
+        with file:
+            if zerocopy:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": file.fileno(),
+                    "offset": start,
+                    "count": length,
+                })
+                return
+            await anyio.to_thread.run_sync(file.seek, start)
+            remaining = length
+            while remaining:
+                chunk = await anyio.to_thread.run_sync(file.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining:
+                await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,215 @@
+# app/utils/suggest.py
+"""Type-ahead suggestions for place names, categories and tags.
+
+Every suggestion is indexed under folded keys (see `search.fold`): a place
+under its name from each word on, so "bay" and "mellieha b" both reach
+"Mellieħa Bay"; categories and tags likewise under their own words.
+
+Keys live in one sorted array, so a prefix is a contiguous range found by
+binary search. A short range is scanned for its best entries directly.
+A long one (a one- or two-letter prefix) is a prefix-trie node whose
+best-`MAX_SUGGESTIONS` list is kept: computed the first time the prefix is
+asked for, then patched by every write under it instead of being rescanned.
+
+Places rank by rating, categories and tags by how many places carry them.
+The index subscribes to `place_catalog`, so admin writes keep it current.
+"""
+import heapq
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .catalog import place_catalog
+from .search import tokenize
+
+MAX_SUGGESTIONS = 10
+# Prefix ranges up to this many keys are scanned instead of keeping a top list
+SCAN_LIMIT = 256
+
+# (-weight, label, item id): ascending order is best first
+Rank = Tuple[float, str, str]
+
+
+def suggestion_keys(text: str) -> List[str]:
+    """Folded `text` from each of its words on: "Blue Lagoon" -> ["blue lagoon", "lagoon"]."""
+    tokens = tokenize(text)
+    return [" ".join(tokens[i:]) for i in range(len(tokens))]
+
+
+def normalize_prefix(prefix: str) -> str:
+    folded = " ".join(tokenize(prefix))
+    # "mellieha " asks for the next word, not for "melliehabay"
+    return folded + " " if folded and prefix[-1:].isspace() else folded
+
+
+class PrefixIndex:
+    """Weighted items under string keys, queried by key prefix."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._entries: List[Tuple[str, str]] = []  # sorted (key, item id)
+        self._items: Dict[str, Tuple[List[str], Rank, dict]] = {}  # item id -> (keys, rank, payload)
+        self._tops: Dict[str, List[Rank]] = {}  # prefix -> best ranks, for long ranges only
+
+    def __len__(self):
+        return len(self._items)
+
+    def load(self, items: Iterable[Tuple[str, List[str], float, str, dict]]):
+        """Replace the contents with `(item id, keys, weight, label, payload)` items."""
+        self._reset()
+        for item_id, keys, weight, label, payload in items:
+            keys = sorted(set(keys))
+            self._items[item_id] = (keys, (-weight, label, item_id), payload)
+            self._entries.extend((key, item_id) for key in keys)
+        self._entries.sort()
+
+    def set(self, item_id: str, keys: List[str], weight: float, label: str, payload: dict):
+        keys = sorted(set(keys))
+        old = self._items.get(item_id)
+        old_keys, old_rank = (old[0], old[1]) if old else ([], None)
+        rank = (-weight, label, item_id)
+        for key in set(old_keys) - set(keys):
+            del self._entries[bisect_left(self._entries, (key, item_id))]
+        for key in set(keys) - set(old_keys):
+            insort(self._entries, (key, item_id))
+        self._items[item_id] = (keys, rank, payload)
+        self._update_tops(item_id, old_keys, old_rank, keys, rank)
+
+    def discard(self, item_id: str):
+        old = self._items.pop(item_id, None)
+        if old is None:
+            return
+        old_keys, old_rank, _ = old
+        for key in old_keys:
+            del self._entries[bisect_left(self._entries, (key, item_id))]
+        self._update_tops(item_id, old_keys, old_rank, [], None)
+
+    def _update_tops(self, item_id: str, old_keys: List[str], old_rank: Optional[Rank],
+                     keys: List[str], rank: Optional[Rank]):
+        if not self._tops:
+            return
+        prefixes = {key[:i] for key in old_keys + keys for i in range(1, len(key) + 1)}
+        for prefix in prefixes:
+            top = self._tops.get(prefix)
+            if top is None:
+                continue
+            present = any(key.startswith(prefix) for key in keys)
+            if old_rank is not None and old_rank in top:
+                if present and rank <= old_rank:
+                    # Moved up (or stayed): re-sort in place
+                    top.remove(old_rank)
+                    insort(top, rank)
+                else:
+                    # Dropped out or moved down: an item outside the list may now belong in it
+                    self._tops[prefix] = self._scan(*self._range(prefix), MAX_SUGGESTIONS)
+            elif present and (len(top) < MAX_SUGGESTIONS or rank < top[-1]):
+                insort(top, rank)
+                del top[MAX_SUGGESTIONS:]
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self._entries, (prefix,))
+        hi = bisect_left(self._entries, (prefix + "\U0010ffff",), lo)
+        return lo, hi
+
+    def _scan(self, lo: int, hi: int, limit: int) -> List[Rank]:
+        # An item can sit under several keys of one range; count it once
+        item_ids = {item_id for _, item_id in self._entries[lo:hi]}
+        return heapq.nsmallest(limit, (self._items[item_id][1] for item_id in item_ids))
+
+    def top(self, prefix: str, limit: int) -> List[dict]:
+        """Payloads of the best `limit` (at most MAX_SUGGESTIONS) items with a key starting with `prefix`."""
+        lo, hi = self._range(prefix)
+        if hi - lo <= SCAN_LIMIT:
+            ranks = self._scan(lo, hi, limit)
+        else:
+            ranks = self._tops.get(prefix)
+            if ranks is None:
+                ranks = self._tops[prefix] = self._scan(lo, hi, MAX_SUGGESTIONS)
+        return [self._items[item_id][2] for _, _, item_id in ranks[:limit]]
+
+
+def _place_weight(place: dict) -> float:
+    rating = place.get("rating")
+    return float(rating) if isinstance(rating, (int, float)) and not isinstance(rating, bool) else 0.0
+
+
+def _place_terms(place: dict) -> Set[Tuple[str, str]]:
+    terms = set()
+    if isinstance(place.get("category"), str) and place["category"]:
+        terms.add(("category", place["category"]))
+    for tag in place.get("tags") or []:
+        if isinstance(tag, str) and tag:
+            terms.add(("tag", tag))
+    return terms
+
+
+class SuggestIndex:
+    """Place names and category/tag terms, suggested separately."""
+
+    def __init__(self):
+        self.places = PrefixIndex()
+        self.terms = PrefixIndex()
+        self._place_terms: Dict[str, Set[Tuple[str, str]]] = {}
+        self._term_counts: Dict[Tuple[str, str], int] = {}
+
+    def __len__(self):
+        return len(self.places)
+
+    # --------- Catalog listener ---------
+
+    def rebuild(self, places: List[dict]):
+        self._place_terms = {place["id"]: _place_terms(place) for place in places}
+        self._term_counts = {}
+        for terms in self._place_terms.values():
+            for term in terms:
+                self._term_counts[term] = self._term_counts.get(term, 0) + 1
+        self.places.load(self._place_item(place) for place in places if isinstance(place.get("name"), str))
+        self.terms.load(self._term_item(term, count) for term, count in self._term_counts.items())
+
+    def upsert(self, place: dict):
+        if isinstance(place.get("name"), str):
+            self.places.set(*self._place_item(place))
+        else:
+            self.places.discard(place["id"])
+        self._set_terms(place["id"], _place_terms(place))
+
+    def remove(self, place_id: str):
+        self.places.discard(place_id)
+        self._set_terms(place_id, set())
+
+    def _set_terms(self, place_id: str, terms: Set[Tuple[str, str]]):
+        old = self._place_terms.pop(place_id, set())
+        if terms:
+            self._place_terms[place_id] = terms
+        for term in old ^ terms:
+            count = self._term_counts.get(term, 0) + (1 if term in terms else -1)
+            if count > 0:
+                self._term_counts[term] = count
+                self.terms.set(*self._term_item(term, count))
+            else:
+                self._term_counts.pop(term, None)
+                self.terms.discard(f"{term[0]}:{term[1]}")
+
+    @staticmethod
+    def _place_item(place: dict) -> tuple:
+        payload = {"id": place["id"], "name": place["name"], "category": place.get("category")}
+        return place["id"], suggestion_keys(place["name"]), _place_weight(place), place["name"], payload
+
+    @staticmethod
+    def _term_item(term: Tuple[str, str], count: int) -> tuple:
+        kind, value = term
+        payload = {"type": kind, "value": value, "places": count}
+        return f"{kind}:{value}", suggestion_keys(value), float(count), value, payload
+
+    # --------- Querying ---------
+
+    def suggest(self, prefix: str, limit: int) -> dict:
+        key = normalize_prefix(prefix)
+        if not key:
+            return {"places": [], "terms": []}
+        return {"places": self.places.top(key, limit), "terms": self.terms.top(key, limit)}
+
+
+suggest_index = SuggestIndex()
+place_catalog.subscribe(suggest_index)
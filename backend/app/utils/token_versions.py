@@ -0,0 +1,114 @@
+# app/utils/token_versions.py
+"""In-memory token version table for stateless (claims-carrying) JWTs.
+
+With `JWT_EMBED_CLAIMS` on, tokens carry the user's role and preferences so
+read-only routes can authorize and personalize without loading the user.
+Two per-user fields on the user document keep that safe:
+
+- `token_version`: bumped on logout or a role change. Tokens carrying an
+  older `tv` claim are rejected.
+- `claims_updated_at`: set when a field embedded in the token changes
+  (e.g. travel_style via PUT /profile/me). Tokens issued before it fall back
+  to loading the user, so they are never served stale preferences.
+
+Both writes also set `auth_updated_at`. A background task polls users whose
+`auth_updated_at` moved since the last poll, so a change made by another
+worker takes effect here within TOKEN_VERSION_REFRESH_SECONDS. Changes made
+by this worker are recorded immediately.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from ..repositories import users
+from .user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+STALE = "stale"
+REVOKED = "revoked"
+
+
+class TokenVersionTable:
+    def __init__(self):
+        # user id -> (token_version, claims_updated_at as a unix timestamp)
+        self._entries: Dict[str, Tuple[int, float]] = {}
+        self._last_seen: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.ready = False
+
+    def record(self, user_id: str, token_version: Optional[int] = None, claims_updated_at: Optional[datetime] = None):
+        version, updated = self._entries.get(user_id, (0, 0.0))
+        if token_version is not None:
+            version = max(version, token_version)
+        if claims_updated_at is not None:
+            # Stored datetimes are naive UTC, like the token's `iat`
+            updated = max(updated, claims_updated_at.replace(tzinfo=timezone.utc).timestamp())
+        self._entries[user_id] = (version, updated)
+
+    def check(self, payload: dict) -> str:
+        """Whether the claims in a decoded token can be trusted as-is.
+
+        Returns STALE (load the user instead) until the table has been loaded
+        at least once.
+        """
+        if not self.ready:
+            return STALE
+        version, updated = self._entries.get(payload.get("sub"), (0, 0.0))
+        if payload.get("tv", 0) < version:
+            return REVOKED
+        if payload.get("iat", 0) <= updated:
+            return STALE
+        return OK
+
+    async def refresh(self):
+        async for user in users.iter_auth_updated(self._last_seen):
+            self.record(str(user["_id"]), user.get("token_version", 0), user.get("claims_updated_at"))
+            seen = user.get("auth_updated_at")
+            if seen and (self._last_seen is None or seen > self._last_seen):
+                self._last_seen = seen
+        self.ready = True
+
+    async def _run(self, interval: float):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("token version refresh failed")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+token_versions = TokenVersionTable()
+
+
+async def revoke_tokens(user_id: str):
+    """Invalidate every token issued to a user so far (logout, role change)."""
+    version = await users.bump_token_version(user_id, datetime.utcnow())
+    if version is not None:
+        token_versions.record(user_id, token_version=version)
+    user_cache.invalidate(user_id)
+
+
+def stale_claims_fields(now: Optional[datetime] = None) -> dict:
+    """User fields to `$set` alongside a change to an embedded claim.
+
+    Tokens issued before `now` stop being trusted once the write lands and
+    the table records it (immediately here, via polling elsewhere).
+    """
+    now = now or datetime.utcnow()
+    return {"claims_updated_at": now, "auth_updated_at": now}
@@ -0,0 +1,95 @@
+# app/utils/user_cache.py
+"""Bounded LRU + TTL cache of user documents for the auth dependencies.
+
+`utils/auth.py`, `utils/deps.py` and `routers/users.py` all load the current
+user on every authenticated request; they share this cache so repeat
+requests skip the `users.find_one` round trip.
+
+Entries expire after USER_CACHE_TTL_SECONDS, which bounds how stale a user
+changed outside the API can be. Code that writes to a user document calls
+`user_cache.invalidate(user_id)` so its own changes are seen immediately.
+"""
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ..config import settings
+from ..repositories import users
+
+
+class UserCacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class UserCache:
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.stats = UserCacheStats()
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        """Return a copy of the user document (with `id` set), or None if missing.
+
+        Raises bson's InvalidId for ids that are not ObjectIds.
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.stats.hits += 1
+                return dict(user)
+            del self._entries[user_id]
+            self.stats.expired += 1
+
+        self.stats.misses += 1
+        user = await users.get(user_id)
+        if not user:
+            return None
+        # Convert _id to string for safety
+        user["id"] = str(user["_id"])
+        self.put(user_id, user)
+        return dict(user)
+
+    def put(self, user_id: str, user: dict):
+        if self.maxsize <= 0:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, user_id: str):
+        if self._entries.pop(str(user_id), None) is not None:
+            self.stats.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats_dict(self) -> dict:
+        data = self.stats.as_dict()
+        data["size"] = len(self._entries)
+        data["maxsize"] = self.maxsize
+        data["ttl_seconds"] = self.ttl_seconds
+        return data
+
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
@@ -0,0 +1,142 @@
+# app/utils/write_behind.py
+"""Write-behind queue for denormalized fields copied onto user documents.
+
+`PUT /profile/me` copies `travel_style` onto the user document so the auth
+dependencies and recommendations see it. That copy doesn't need to be part
+of the request: the profile route enqueues it here and returns after its own
+single write.
+
+Updates for the same user are coalesced. A background task flushes them as
+one bulk update every USER_SYNC_FLUSH_INTERVAL_MS, retrying failed batches
+with exponential backoff. After a user's update lands, the registered hooks
+run (cache invalidation etc.).
+"""
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+from ..config import settings
+from ..repositories import users
+from .token_versions import token_versions
+from .user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 5.0
+
+
+class UserSyncStats:
+    def __init__(self):
+        self.enqueued = 0
+        self.coalesced = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class UserSyncQueue:
+    def __init__(self):
+        self._pending: Dict[str, dict] = {}
+        self._attempts: Dict[str, int] = {}
+        self._hooks: List[Callable[[str, dict], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.stats = UserSyncStats()
+
+    def add_hook(self, hook: Callable[[str, dict], None]):
+        """Call `hook(user_id, fields)` after a user's update is written."""
+        self._hooks.append(hook)
+
+    def enqueue(self, user_id: str, fields: dict):
+        """Schedule `$set: fields` on the user; later fields win over earlier ones."""
+        self.stats.enqueued += 1
+        if user_id in self._pending:
+            self.stats.coalesced += 1
+            self._pending[user_id].update(fields)
+        else:
+            self._pending[user_id] = dict(fields)
+        if self._task is None:
+            self.start()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> bool:
+        """Write one batch of pending updates. Returns False if the write failed."""
+        if not self._pending:
+            return True
+        batch = {}
+        for user_id in list(self._pending)[:settings.USER_SYNC_BATCH_SIZE]:
+            batch[user_id] = self._pending.pop(user_id)
+
+        try:
+            await users.bulk_update(batch)
+        except Exception:
+            self.stats.failures += 1
+            logger.exception("user sync batch of %d failed", len(batch))
+            self._requeue(batch)
+            return False
+
+        self.stats.batches += 1
+        self.stats.written += len(batch)
+        for user_id, fields in batch.items():
+            self._attempts.pop(user_id, None)
+            for hook in self._hooks:
+                hook(user_id, fields)
+        return True
+
+    def _requeue(self, batch: Dict[str, dict]):
+        for user_id, fields in batch.items():
+            attempts = self._attempts.get(user_id, 0) + 1
+            if attempts > settings.USER_SYNC_MAX_RETRIES:
+                self.stats.dropped += 1
+                self._attempts.pop(user_id, None)
+                logger.error("dropping user sync for %s after %d attempts", user_id, attempts - 1)
+                continue
+            self._attempts[user_id] = attempts
+            # Anything enqueued since is newer and wins.
+            self._pending[user_id] = {**fields, **self._pending.get(user_id, {})}
+
+    async def _run(self):
+        interval = settings.USER_SYNC_FLUSH_INTERVAL_MS / 1000
+        failures = 0
+        while True:
+            await asyncio.sleep(interval if not failures else min(interval * 2 ** failures, MAX_BACKOFF_SECONDS))
+            while self._pending:
+                if not await self.flush():
+                    failures += 1
+                    break
+            else:
+                failures = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Last chance for anything still queued.
+        while self._pending:
+            if not await self.flush():
+                break
+
+
+user_sync = UserSyncQueue()
+
+
+def _refresh_auth_state(user_id: str, fields: dict):
+    user_cache.invalidate(user_id)
+    if "claims_updated_at" in fields:
+        token_versions.record(user_id, claims_updated_at=fields["claims_updated_at"])
+
+
+user_sync.add_hook(_refresh_auth_state)
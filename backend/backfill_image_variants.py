@@ -0,0 +1,52 @@
+# backfill_image_variants.py
+"""Build WebP variants for place images uploaded before the variant pipeline.
+
+Usage (from backend/):
+    python backfill_image_variants.py          # places without image_variants
+    python backfill_image_variants.py --all    # rebuild every referenced image
+"""
+import asyncio
+import os
+import sys
+
+from app.config import settings
+from app.repositories import places
+from app.utils.image_variants import build_variants, image_filename, shutdown_pool
+from app.utils.images import STATIC_PLACES_DIR
+
+
+async def backfill(rebuild_all: bool = False):
+    query = {"image": {"$regex": "^/static/places/"}}
+    if not rebuild_all:
+        query["image_variants"] = None
+
+    filenames = set()
+    missing = 0
+    async for place in places.iterate(query, {"image": 1}):
+        name = image_filename(place.get("image"))
+        if name is None:
+            continue
+        if os.path.exists(os.path.join(STATIC_PLACES_DIR, name)):
+            filenames.add(name)
+        else:
+            missing += 1
+
+    print(f"🖼️ Building variants for {len(filenames)} images ({missing} places point at missing files)...")
+    pending = sorted(filenames)
+    done = failed = 0
+    # One batch per pool worker at a time
+    for start in range(0, len(pending), settings.IMAGE_WORKERS):
+        batch = pending[start:start + settings.IMAGE_WORKERS]
+        results = await asyncio.gather(*(build_variants(name) for name in batch), return_exceptions=True)
+        for name, result in zip(batch, results):
+            if isinstance(result, Exception):
+                failed += 1
+                print(f"⚠️ {name}: {result}")
+            else:
+                done += 1
+    shutdown_pool()
+    print(f"✅ Built variants for {done} images, {failed} failed.")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill(rebuild_all="--all" in sys.argv[1:]))
@@ -0,0 +1,5 @@
+"""Benchmarks for the API, run from backend/ (see README).
+
+They import the app in-process with the in-memory storage backend, so no
+MongoDB or server is needed and results only reflect the app's own work.
+"""
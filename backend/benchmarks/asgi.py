@@ -0,0 +1,82 @@
+# benchmarks/asgi.py
+"""Minimal in-process ASGI client.
+
+Calls the app directly (no sockets, no HTTP parsing), so the measured
+latency is the app's: routing, middleware, dependencies and handlers.
+"""
+import json
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+
+class Response:
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class ASGIClient:
+    def __init__(self, app):
+        self.app = app
+
+    async def request(
+        self, method: str, path: str, headers: Optional[Dict[str, str]] = None, json_body=None
+    ) -> Response:
+        url = urlsplit(path)
+        body = b"" if json_body is None else json.dumps(json_body).encode()
+        raw_headers = [(b"host", b"benchmark")]
+        if json_body is not None:
+            raw_headers.append((b"content-type", b"application/json"))
+            raw_headers.append((b"content-length", str(len(body)).encode()))
+        for name, value in (headers or {}).items():
+            raw_headers.append((name.lower().encode(), value.encode()))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("benchmark", 80),
+        }
+        sent = False
+        status = 500
+        response_headers: Dict[str, str] = {}
+        chunks = []
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers.update((k.decode(), v.decode()) for k, v in message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return Response(status, response_headers, b"".join(chunks))
+
+    async def get(self, path: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        return await self.request("GET", path, headers)
+
+    async def post(self, path: str, json_body=None, headers: Optional[Dict[str, str]] = None) -> Response:
+        return await self.request("POST", path, headers, json_body)
+
+
+def bearer(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
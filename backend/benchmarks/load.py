@@ -0,0 +1,217 @@
+# benchmarks/load.py
+"""End-to-end load benchmark of the main API routes.
+
+Usage (from backend/):
+    python -m benchmarks.load                                  # defaults below
+    python -m benchmarks.load --users 500 --places 10000 --concurrency 64 --duration 30
+    python -m benchmarks.load --mix recommendations=1,place=1   # only these routes
+    python -m benchmarks.load --output benchmarks/baseline.json # store a baseline
+    python -m benchmarks.load --baseline benchmarks/baseline.json --tolerance 0.2
+
+The app is imported in-process with STORAGE_BACKEND=memory and seeded with
+synthetic users (with profiles) and places, then `--concurrency` workers
+send requests picked by `--mix` weights for `--duration` seconds after a
+warmup. Throughput and p50/p95/p99 per route are printed and saved as JSON
+(benchmarks/results/ unless `--output` is given).
+
+With `--baseline`, the run exits with status 1 if any route's p99 is more
+than `--tolerance` worse than in the baseline file.
+
+Login runs real bcrypt at BCRYPT_ROUNDS through the hash pool, so it is
+slow by design; requests it sheds with 503 count as errors. Other settings
+(JWT_EMBED_CLAIMS, cache sizes, ...) are read from the environment as
+usual, so their effect can be compared run against run.
+"""
+import os
+
+# Never seed a real database; must be set before the app is imported
+os.environ["STORAGE_BACKEND"] = "memory"
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from app.config import settings
+from app.main import app
+from app.repositories import places, profiles, users
+from app.utils.bulk_places import upsert_places
+from app.utils.hashing import hash_password
+from app.utils.jwt_handler import create_access_token, user_claims
+from app.utils.scoring import BUDGET_ORDER, STYLE_TAGS
+from app.utils.seeding import normalize_place, synthetic_places
+
+from . import results
+from .asgi import ASGIClient, bearer
+
+PASSWORD = "benchmark-password"
+
+# Workload name -> route template reported in the results
+ROUTES = {
+    "login": "POST /auth/login",
+    "recommendations": "GET /recommendations/",
+    "places": "GET /places/",
+    "place": "GET /places/{place_id}",
+    "profile": "GET /profile/me",
+}
+DEFAULT_MIX = "login=1,recommendations=4,places=4,place=6,profile=3"
+
+
+class Workload:
+    def __init__(self, user_docs: List[dict], tokens: List[str], place_ids: List[str], page_size: int):
+        self.users = user_docs
+        self.tokens = tokens
+        self.place_ids = place_ids
+        self.page_size = page_size
+
+    async def call(self, client: ASGIClient, name: str, rng: random.Random):
+        i = rng.randrange(len(self.users))
+        if name == "login":
+            body = {"email": self.users[i]["email"], "password": PASSWORD}
+            return await client.post("/auth/login", body)
+        if name == "recommendations":
+            return await client.get("/recommendations/", bearer(self.tokens[i]))
+        if name == "places":
+            return await client.get(f"/places/?limit={self.page_size}")
+        if name == "place":
+            return await client.get(f"/places/{rng.choice(self.place_ids)}")
+        return await client.get("/profile/me", bearer(self.tokens[i]))
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise argparse.ArgumentTypeError(f"unknown route {name!r} (choose from {', '.join(ROUTES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def seed(user_count: int, place_count: int, seed_value: int) -> Workload:
+    report = await upsert_places(places, ((normalize_place(raw), False) for raw in synthetic_places(place_count, seed_value)))
+    if report.error_count:
+        raise RuntimeError(f"seeding places failed: {report.errors[:3]}")
+    place_ids, vocabulary = [], set()
+    async for doc in places.iterate(projection={"tags": 1}):
+        place_ids.append(str(doc["_id"]))
+        vocabulary.update(doc.get("tags") or [])
+    vocabulary = sorted(vocabulary)
+
+    rng = random.Random(seed_value)
+    password_hash = hash_password(PASSWORD)  # one bcrypt run shared by every user
+    user_docs, tokens = [], []
+    for i in range(user_count):
+        prefs = {
+            "interests": rng.sample(vocabulary, min(len(vocabulary), rng.randint(1, 4))),
+            "budget": rng.choice(list(BUDGET_ORDER)),
+            "travel_style": rng.choice(list(STYLE_TAGS)),
+        }
+        doc = {"name": f"User {i}", "email": f"user{i}@bench.example.com", "password_hash": password_hash,
+               "role": "user", **prefs}
+        user_id = await users.create(doc)
+        await profiles.upsert_for_user(doc["_id"], {"name": doc["name"], "travel_style": prefs["travel_style"]})
+        claims = {"tv": 0}
+        if settings.JWT_EMBED_CLAIMS:
+            claims.update(user_claims(doc))
+        user_docs.append(doc)
+        tokens.append(create_access_token(subject=user_id, claims=claims))
+    return Workload(user_docs, tokens, place_ids, page_size=20)
+
+
+async def drive(workload: Workload, mix: Dict[str, float], concurrency: int, duration: float, seed_value: int):
+    """Run the mix for `duration` seconds; returns per-route latencies, errors and elapsed time."""
+    client = ASGIClient(app)
+    names, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    deadline = time.perf_counter() + duration
+
+    async def worker(n: int):
+        rng = random.Random(seed_value * 1000 + n)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            response = await workload.call(client, name, rng)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if response.status >= 400:
+                errors[name] += 1
+            else:
+                latencies[name].append(elapsed_ms)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run(args) -> dict:
+    mix = parse_mix(args.mix)
+    print(f"🌱 Seeding {args.users} users and {args.places} places (seed {args.seed})...")
+    workload = await seed(args.users, args.places, args.seed)
+    # Started after seeding so the lifespan warms the seeded catalog, like a deploy
+    async with app.router.lifespan_context(app):
+        if args.warmup > 0:
+            print(f"🔥 Warming up for {args.warmup:g}s...")
+            await drive(workload, mix, args.concurrency, args.warmup, args.seed + 1)
+        print(f"🚀 {args.concurrency} workers for {args.duration:g}s, mix {args.mix}")
+        latencies, errors, elapsed = await drive(workload, mix, args.concurrency, args.duration, args.seed)
+
+    routes = {ROUTES[name]: results.summarize(latencies[name], errors[name], elapsed) for name in mix}
+    everything = [ms for name in mix for ms in latencies[name]]
+    return {
+        "benchmark": "load",
+        "environment": results.environment(),
+        "config": {
+            "users": args.users,
+            "places": args.places,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "mix": mix,
+            "seed": args.seed,
+            "jwt_embed_claims": settings.JWT_EMBED_CLAIMS,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "routes": routes,
+        "total": results.summarize(everything, sum(errors.values()), elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--places", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds measured")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds run before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"route=weight,... (default {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="results file to compare p99s against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed p99 growth (0.10 = 10%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p99 growth below this")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    results.print_table(report["routes"])
+    path = results.save(report, args.output, "load")
+    print(f"💾 Results written to {path}")
+
+    if args.baseline:
+        baseline = results.load(args.baseline)
+        failures = results.regressions(report["routes"], baseline["routes"], args.tolerance, args.min_delta_ms)
+        if failures:
+            print(f"❌ p99 regressions against {args.baseline}:")
+            for failure in failures:
+                print(f"   {failure}")
+            sys.exit(1)
+        print(f"✅ No p99 regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
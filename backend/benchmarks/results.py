@@ -0,0 +1,104 @@
+# benchmarks/results.py
+"""Latency summaries, JSON result files and the baseline regression gate."""
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def summarize(latencies_ms: List[float], errors: int, elapsed_s: float) -> dict:
+    """Count, throughput and latency percentiles (ms) of one route."""
+    if not latencies_ms:
+        return {"count": 0, "errors": errors, "rps": 0.0}
+    values = np.asarray(latencies_ms)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed_s, 1) if elapsed_s > 0 else 0.0,
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save(results: dict, path: Optional[str], prefix: str) -> str:
+    """Write results as JSON; defaults to results/<prefix>-<timestamp>.json."""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{prefix}-{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return path
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def regressions(
+    current: Dict[str, dict],
+    baseline: Dict[str, dict],
+    tolerance: float,
+    min_delta_ms: float,
+    metric: str = "p99_ms",
+) -> List[str]:
+    """Entries whose `metric` grew by more than `tolerance` (a fraction) over the baseline.
+
+    Growth below `min_delta_ms` is ignored so sub-millisecond entries don't
+    trip the gate on scheduler noise. Entries missing from either side are
+    skipped.
+    """
+    label = metric.replace("_ms", "")
+    failures = []
+    for name, stats in sorted(current.items()):
+        before = baseline.get(name, {}).get(metric)
+        after = stats.get(metric)
+        if before is None or after is None:
+            continue
+        if after > before * (1 + tolerance) and after - before > min_delta_ms:
+            failures.append(f"{name}: {label} {before:.2f} ms -> {after:.2f} ms (+{(after / before - 1) * 100:.0f}%)")
+    return failures
+
+
+def print_table(routes: Dict[str, dict]):
+    print(f"{'route':<28}{'count':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    for route, s in routes.items():
+        if not s["count"]:
+            print(f"{route:<28}{0:>8}{s['errors']:>6}")
+            continue
+        print(
+            f"{route:<28}{s['count']:>8}{s['errors']:>6}{s['rps']:>9.1f}"
+            f"{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}"
+        )
@@ -0,0 +1,267 @@
+# benchmarks/scale.py
+"""Scale-curve microbenchmarks of recommendation scoring and place serialization.
+
+Usage (from backend/):
+    python -m benchmarks.scale                               # 100, 1k, 10k, 100k places
+    python -m benchmarks.scale --sizes 1000,10000 --interests 1,8
+    python -m benchmarks.scale --cases band,serialize        # name substrings
+    python -m benchmarks.scale --output benchmarks/scale-baseline.json
+    python -m benchmarks.scale --baseline benchmarks/scale-baseline.json --tolerance 0.2
+
+Every case runs on prefixes of one synthetic catalog (app/utils/seeding.py)
+and, for the scoring cases, once per interest-list length. Each measurement
+repeats the call for about `--budget` seconds and records the median and
+minimum time per call; a separate traced call records peak memory
+(tracemalloc, numpy buffers included). The scaling column is the slope of
+log(time) over log(catalog size): ~1 is linear, ~0 is flat.
+
+Engine and index cases are measured warm, like they run behind the catalog:
+built once per size, with their per-interest caches filled by the first
+call. With `--baseline`, the run exits with status 1 if a median time is
+more than `--tolerance` worse than in the baseline file.
+"""
+import os
+
+# The app modules are imported for their functions only; keep them off Mongo
+os.environ["STORAGE_BACKEND"] = "memory"
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.routers.admin import _serialize_place
+from app.routers.recommendations import TOP_K
+from app.utils.bulk_places import place_document
+from app.utils.catalog import serialize_place
+from app.utils.place_index import PlaceIndex
+from app.utils.scoring import Preferences, ScoringEngine, normalize_preferences, score_place
+from app.utils.seeding import normalize_place, synthetic_places
+
+from . import results
+
+DEFAULT_SIZES = "100,1000,10000,100000"
+DEFAULT_INTERESTS = "0,1,3,8"
+
+
+class Catalog:
+    """One catalog size: Mongo-shaped documents, their serialized form, and
+    the scoring structures built from them on first use."""
+
+    def __init__(self, docs: List[dict]):
+        self.docs = docs
+        self.places = [serialize_place(doc) for doc in docs]
+        self._engine: Optional[ScoringEngine] = None
+        self._index: Optional[PlaceIndex] = None
+
+    @property
+    def engine(self) -> ScoringEngine:
+        if self._engine is None:
+            self._engine = ScoringEngine(self.places)
+        return self._engine
+
+    @property
+    def index(self) -> PlaceIndex:
+        if self._index is None:
+            self._index = PlaceIndex()
+            self._index.rebuild(self.places)
+        return self._index
+
+
+def _legacy_list_loop(docs: List[dict]) -> List[dict]:
+    # The loop of the standalone app/routes/places.py list route (that app's
+    # database module isn't importable from here)
+    out = []
+    for doc in docs:
+        doc["id"] = str(doc["_id"])
+        del doc["_id"]
+        out.append(doc)
+    return out
+
+
+def _recommend(catalog: Catalog, prefs: Preferences, seed: str):
+    # routers/recommendations.py without the cache and the HTTP layer
+    if catalog.index.is_selective(prefs, TOP_K):
+        band = catalog.index.band(prefs, TOP_K)
+    else:
+        band = catalog.engine.band(prefs, TOP_K)
+    return band.top_k(TOP_K, seed=seed)
+
+
+class Case(NamedTuple):
+    name: str
+    per_interests: bool
+    # (catalog, prefs) -> (timed call taking the prepared argument, untimed preparation)
+    make: Callable[[Catalog, Preferences], tuple]
+
+
+def _no_prep():
+    return None
+
+
+CASES = [
+    Case("score_place loop", True,
+         lambda c, p: (lambda _: [score_place(place, p) for place in c.places], _no_prep)),
+    Case("ScoringEngine build", False,
+         lambda c, p: (lambda _: ScoringEngine(c.places), _no_prep)),
+    Case("ScoringEngine.band", True,
+         lambda c, p: (lambda _: c.engine.band(p, TOP_K), _no_prep)),
+    Case("PlaceIndex rebuild", False,
+         lambda c, p: (lambda _: PlaceIndex().rebuild(c.places), _no_prep)),
+    Case("PlaceIndex.band", True,
+         lambda c, p: (lambda _: c.index.band(p, TOP_K), _no_prep)),
+    Case("recommend (uncached)", True,
+         lambda c, p: (lambda _: _recommend(c, p, seed="benchmark-user"), _no_prep)),
+    Case("serialize_place (places router)", False,
+         lambda c, p: (lambda _: [serialize_place(doc) for doc in c.docs], _no_prep)),
+    Case("admin _serialize_place", False,
+         lambda c, p: (lambda docs: [_serialize_place(doc) for doc in docs], lambda: [dict(d) for d in c.docs])),
+    Case("app/routes/places.py loop", False,
+         lambda c, p: (_legacy_list_loop, lambda: [dict(d) for d in c.docs])),
+    Case("jsonable_encoder (response)", False,
+         lambda c, p: (lambda _: jsonable_encoder(c.places), _no_prep)),
+]
+
+
+def build_docs(count: int, seed: int) -> List[dict]:
+    docs = []
+    for raw in synthetic_places(count, seed):
+        doc = place_document(normalize_place(raw))
+        doc["_id"] = ObjectId()
+        docs.append(doc)
+    return docs
+
+
+def interest_lists(docs: List[dict], lengths: List[int], seed: int) -> Dict[int, List[str]]:
+    """Interests of each length, mixing common and rare tags of the catalog."""
+    vocabulary = [tag for tag, _ in Counter(t for d in docs for t in d.get("tags") or []).most_common()]
+    rng = random.Random(seed)
+    rng.shuffle(vocabulary)
+    return {n: vocabulary[:n] for n in lengths}
+
+
+def measure(fn: Callable, prepare: Callable, budget: float, max_reps: int) -> dict:
+    arg = prepare()
+    started = time.perf_counter()
+    fn(arg)  # warms caches; also sizes the repetitions
+    first = time.perf_counter() - started
+    reps = max(3, min(max_reps, int(budget / first) if first > 0 else max_reps))
+
+    timings = []
+    for _ in range(reps):
+        arg = prepare()
+        started = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - started)
+
+    arg = prepare()
+    tracemalloc.start()
+    try:
+        fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "reps": reps,
+        "median_ms": round(float(np.median(timings)) * 1000, 4),
+        "min_ms": round(min(timings) * 1000, 4),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def scaling_exponent(sizes: List[int], times_ms: List[float]) -> Optional[float]:
+    points = [(n, t) for n, t in zip(sizes, times_ms) if t > 0]
+    if len(points) < 2:
+        return None
+    slope = np.polyfit(np.log([n for n, _ in points]), np.log([t for _, t in points]), 1)[0]
+    return round(float(slope), 2)
+
+
+def run(args) -> dict:
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    lengths = [int(n) for n in args.interests.split(",")]
+    cases = [c for c in CASES if not args.cases or any(f.lower() in c.name.lower() for f in args.cases.split(","))]
+
+    print(f"🌍 Generating {sizes[-1]} synthetic places (seed {args.seed})...")
+    all_docs = build_docs(sizes[-1], args.seed)
+    interests = interest_lists(all_docs, lengths, args.seed)
+
+    measurements: Dict[str, dict] = {}
+    curves: Dict[str, Dict[int, float]] = {}
+    for size in sizes:
+        catalog = Catalog(all_docs[:size])
+        for case in cases:
+            for length in (lengths if case.per_interests else [None]):
+                user = {"interests": interests[length] if length is not None else [], "budget": "medium",
+                        "travel_style": "relaxed"}
+                fn, prepare = case.make(catalog, normalize_preferences(user))
+                stats = measure(fn, prepare, args.budget, args.max_reps)
+                series = case.name if length is None else f"{case.name} [{length} interests]"
+                measurements[f"{series} n={size}"] = stats
+                curves.setdefault(series, {})[size] = stats["median_ms"]
+                print(f"  {series:<48} n={size:<7} {stats['median_ms']:>11.3f} ms {stats['peak_kib']:>11.1f} KiB")
+
+    scaling = {series: scaling_exponent(list(points), list(points.values())) for series, points in curves.items()}
+    return {
+        "benchmark": "scale",
+        "environment": results.environment(),
+        "config": {"sizes": sizes, "interests": interests, "seed": args.seed, "budget_s": args.budget},
+        "cases": measurements,
+        "curves": curves,
+        "scaling": scaling,
+    }
+
+
+def print_curves(report: dict):
+    sizes = report["config"]["sizes"]
+    header = "".join(f"{f'n={n}':>12}" for n in sizes)
+    print(f"\n{'median ms per call':<48}{header}{'scaling':>9}")
+    for series, points in report["curves"].items():
+        cells = "".join(f"{points.get(n, float('nan')):>12.3f}" for n in sizes)
+        slope = report["scaling"][series]
+        print(f"{series:<48}{cells}{'' if slope is None else f'n^{slope:.2f}':>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"catalog sizes (default {DEFAULT_SIZES})")
+    parser.add_argument("--interests", default=DEFAULT_INTERESTS,
+                        help=f"interest-list lengths (default {DEFAULT_INTERESTS})")
+    parser.add_argument("--cases", help="only cases whose name contains one of these (comma separated)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=0.5, help="seconds of repetitions per measurement")
+    parser.add_argument("--max-reps", type=int, default=200)
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="results file to compare median times against")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="allowed slowdown (0.20 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore slowdowns below this")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_curves(report)
+    path = results.save(report, args.output, "scale")
+    print(f"💾 Results written to {path}")
+
+    if args.baseline:
+        baseline = results.load(args.baseline)
+        failures = results.regressions(
+            report["cases"], baseline["cases"], args.tolerance, args.min_delta_ms, metric="median_ms"
+        )
+        if failures:
+            print(f"❌ Slowdowns against {args.baseline}:")
+            for failure in failures:
+                print(f"   {failure}")
+            sys.exit(1)
+        print(f"✅ No slowdowns against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# seed_catalog.py
+"""Seed and migrate the places collection.
+
+Usage (from backend/):
+    python seed_catalog.py load seed_places.py ../seed_places.py places.ndjson
+    python seed_catalog.py synthetic --count 100000 --seed 42
+    python seed_catalog.py migrate
+
+`load` and `synthetic` normalize every place onto the PlaceCreate schema
+(see app/utils/seeding.py) and upsert it by name in batched bulk writes, so
+running them again updates instead of duplicating. A place in the old
+seeder shape only fills in what a stored place of the same name lacks, so
+loading both seed files keeps the richer modern entries. `migrate`
+rewrites existing documents still in the old shape (address string
+locations, "€€" prices, `type`), also in batched bulk writes, and leaves
+every other document alone.
+
+A running API picks the changes up on restart.
+"""
+import argparse
+import asyncio
+import time
+
+from pydantic import ValidationError
+
+from app.repositories import places
+from app.utils.bulk_places import BATCH_SIZE, place_document, upsert_places
+from app.utils.seeding import LEGACY_FIELDS, is_legacy, load_seed_file, normalize_place, synthetic_places
+
+
+def _report(label: str, report: dict, elapsed: float):
+    rate = report["lines"] / elapsed if elapsed > 0 else 0.0
+    print(
+        f"✅ {label}: {report['lines']} places in {elapsed:.2f}s ({rate:,.0f}/s) — "
+        f"{report['upserted']} inserted, {report['modified']} updated, "
+        f"{report['matched'] - report['modified']} unchanged, {report['error_count']} errors"
+    )
+    for err in report["errors"]:
+        print(f"   ⚠️ #{err['line']}: {err['error']}")
+
+
+def _normalized(raw_places, skipped: list):
+    for position, raw in enumerate(raw_places, start=1):
+        try:
+            yield normalize_place(raw), is_legacy(raw)
+        except ValidationError as e:
+            skipped.append((position, raw.get("name"), e))
+
+
+async def load(paths, batch_size: int):
+    await places.ensure_indexes()
+    for path in paths:
+        raw = load_seed_file(path)
+        skipped = []
+        started = time.perf_counter()
+        report = await upsert_places(places, _normalized(raw, skipped), batch_size)
+        _report(path, report.as_dict(), time.perf_counter() - started)
+        for position, name, error in skipped:
+            print(f"   ⚠️ skipped #{position} ({name}): {error.errors()[0]['msg']}")
+
+
+async def synthetic(count: int, seed: int, batch_size: int):
+    await places.ensure_indexes()
+    print(f"🌍 Generating {count} synthetic places (seed {seed})...")
+    started = time.perf_counter()
+    generated = ((normalize_place(raw), False) for raw in synthetic_places(count, seed))
+    report = await upsert_places(places, generated, batch_size)
+    _report("synthetic", report.as_dict(), time.perf_counter() - started)
+
+
+async def migrate(batch_size: int):
+    started = time.perf_counter()
+    scanned = changed = invalid = 0
+    batch = []
+    async for doc in places.iterate():
+        scanned += 1
+        if not is_legacy(doc):
+            continue
+        try:
+            normalized = place_document(normalize_place(doc))
+        except ValidationError:
+            invalid += 1
+            continue
+        fields = {k: v for k, v in normalized.items() if doc.get(k) != v}
+        unset = tuple(field for field in LEGACY_FIELDS if field in doc)
+        if fields or unset:
+            changed += 1
+            batch.append((doc["_id"], fields, unset))
+            if len(batch) >= batch_size:
+                await places.bulk_update(batch)
+                batch = []
+    await places.bulk_update(batch)
+    elapsed = time.perf_counter() - started
+    print(f"✅ migrate: scanned {scanned} places in {elapsed:.2f}s, normalized {changed}, {invalid} without name/category")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load_cmd = commands.add_parser("load", help="upsert places from seeder modules, JSON or NDJSON files")
+    load_cmd.add_argument("paths", nargs="+")
+
+    synthetic_cmd = commands.add_parser("synthetic", help="upsert a generated Malta catalog")
+    synthetic_cmd.add_argument("--count", type=int, default=10000)
+    synthetic_cmd.add_argument("--seed", type=int, default=0)
+
+    commands.add_parser("migrate", help="normalize existing documents in place")
+
+    args = parser.parse_args()
+    if args.command == "load":
+        asyncio.run(load(args.paths, args.batch_size))
+    elif args.command == "synthetic":
+        asyncio.run(synthetic(args.count, args.seed, args.batch_size))
+    else:
+        asyncio.run(migrate(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
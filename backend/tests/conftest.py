@@ -0,0 +1,128 @@
+# tests/conftest.py
+"""Fixtures for API tests against the in-memory storage backend.
+
+The app is imported once per session with STORAGE_BACKEND=memory, so no
+MongoDB is needed. Every test starts from empty repositories and caches.
+"""
+import os
+from datetime import datetime
+
+# Must be set before the app (and its settings) is imported
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.repositories import places as places_repo
+from app.repositories import profiles, users
+from app.schemas.place import PlaceCreate
+from app.utils.bulk_places import place_document
+from app.utils.catalog import place_catalog
+from app.utils.jwt_handler import create_access_token
+from app.utils.recommendation_cache import recommendation_cache
+from app.utils.seeding import normalize_place, synthetic_places
+from app.utils.user_cache import user_cache
+
+PLACES = [
+    {"name": "Blue Lagoon", "category": "beach", "price_level": "low", "rating": 4.7,
+     "description": "Crystal clear water between Comino and Cominotto, great for snorkeling.",
+     "location": {"lat": 36.0150, "lng": 14.3236}, "tags": ["swimming", "snorkeling", "family"]},
+    {"name": "Golden Bay", "category": "beach", "price_level": "low", "rating": 4.5,
+     "description": "Sandy beach with sunset views and a relaxed atmosphere.",
+     "location": {"lat": 35.9333, "lng": 14.3444}, "tags": ["swimming", "sunset"]},
+    {"name": "Mellieħa Bay", "category": "beach", "price_level": "low", "rating": 4.4,
+     "description": "Malta's longest sandy beach, with shallow water for kids.",
+     "location": {"lat": 35.9556, "lng": 14.3611}, "tags": ["family", "kids", "swimming"]},
+    {"name": "Ħaġar Qim Temples", "category": "museum", "price_level": "medium", "rating": 4.6,
+     "description": "Megalithic temples older than the pyramids.",
+     "location": {"lat": 35.8278, "lng": 14.4419}, "tags": ["history", "unesco"]},
+    {"name": "National Museum of Archaeology", "category": "museum", "price_level": "medium", "rating": 4.3,
+     "description": "Prehistoric finds including the Sleeping Lady.",
+     "location": {"lat": 35.8975, "lng": 14.5125}, "tags": ["history", "indoor"]},
+    {"name": "St. John's Co-Cathedral", "category": "church", "price_level": "medium", "rating": 4.8,
+     "description": "Baroque interior and Caravaggio's Beheading of Saint John.",
+     "location": {"lat": 35.8978, "lng": 14.5123}, "tags": ["history", "art"]},
+    {"name": "Paceville", "category": "nightlife", "price_level": "medium", "rating": 3.9,
+     "description": "Bars and clubs open until dawn.",
+     "location": {"lat": 35.9247, "lng": 14.4886}, "tags": ["nightlife", "bar", "club"]},
+    {"name": "Fontanella Tea Garden", "category": "restaurant", "price_level": "medium", "rating": 4.2,
+     "description": "Famous cakes on the Mdina bastions, with views over the island.",
+     "location": {"lat": 35.8872, "lng": 14.4031}, "tags": ["food", "views"]},
+    {"name": "Diar il-Bniet", "category": "restaurant", "price_level": "high", "rating": 4.6,
+     "description": "Farm-to-table Maltese food in Dingli.",
+     "location": {"lat": 35.8614, "lng": 14.3828}, "tags": ["food", "local"]},
+    {"name": "Dingli Cliffs", "category": "nature", "price_level": "low",
+     "description": "Cliff-top walk with views over Filfla.",
+     "location": {"lat": 35.8597, "lng": 14.3817}, "tags": ["hiking", "views", "adventure"]},
+    {"name": "Valletta Walking Tour", "category": "tour",
+     "description": "Guided walk through the capital's streets and gardens.", "tags": ["history"]},
+]
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Entering the client runs the app's startup (indexes, catalog warmup)
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def run(client):
+    """Run a coroutine function on the app's event loop and return its result."""
+    return client.portal.call
+
+
+@pytest.fixture(autouse=True)
+def empty_storage():
+    for repository in (users, profiles, places_repo):
+        repository.clear()
+    place_catalog.bump_version()
+    user_cache.clear()
+    recommendation_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def synthetic_catalog() -> list:
+    """3000 generated places shaped like catalog entries (no storage involved)."""
+    return [
+        {**normalize_place(raw).dict(), "id": "%024x" % (i * 2654435761)}
+        for i, raw in enumerate(synthetic_places(3000, seed=11))
+    ]
+
+
+@pytest.fixture
+def places(run) -> list:
+    """PLACES stored as the API stores them, in order, with their `id`."""
+    stored = []
+    for data in PLACES:
+        doc = place_document(PlaceCreate(**data))
+        run(places_repo.insert, doc)
+        stored.append({**data, "id": str(doc["_id"])})
+    place_catalog.bump_version()
+    return stored
+
+
+def _headers(user_id: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(user_id, claims={'tv': 0})}"}
+
+
+@pytest.fixture
+def user(run) -> dict:
+    doc = {"name": "Tess", "email": "tess@example.com", "password_hash": "", "role": "user",
+           "created_at": datetime.utcnow()}
+    doc["id"] = run(users.create, doc)
+    return doc
+
+
+@pytest.fixture
+def user_headers(user) -> dict:
+    return _headers(user["id"])
+
+
+@pytest.fixture
+def admin_headers(run) -> dict:
+    doc = {"name": "Admin", "email": "admin@example.com", "password_hash": "", "role": "admin",
+           "created_at": datetime.utcnow()}
+    return _headers(run(users.create, doc))
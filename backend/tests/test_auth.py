@@ -0,0 +1,123 @@
+# tests/test_auth.py
+"""Register, login, token revocation on logout and claims-carrying tokens."""
+import pytest
+
+from app.config import settings
+from app.utils.jwt_handler import decode_payload
+from app.utils.token_versions import token_versions
+from app.utils.user_cache import user_cache
+from app.utils.write_behind import user_sync
+
+EMAIL = "sam@example.com"
+
+
+def _register(client, email: str = EMAIL, password: str = "correct horse"):
+    return client.post("/auth/register", json={"name": "Sam", "email": email, "password": password})
+
+
+def _login(client, email: str = EMAIL, password: str = "correct horse"):
+    return client.post("/auth/login", json={"email": email, "password": password})
+
+
+def _bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def token(client) -> str:
+    assert _register(client).json()["status"] == "success"
+    return _login(client).json()["access_token"]
+
+
+@pytest.fixture
+def embed_claims(run, monkeypatch):
+    """JWT_EMBED_CLAIMS on, with the token version table loaded as at startup."""
+    monkeypatch.setattr(settings, "JWT_EMBED_CLAIMS", True)
+    monkeypatch.setattr(token_versions, "ready", token_versions.ready)
+    run(token_versions.refresh)
+
+
+@pytest.fixture
+def lookups(monkeypatch) -> list:
+    """User ids the auth dependencies load (through the user cache)."""
+    calls = []
+    get = user_cache.get
+
+    async def counting_get(user_id):
+        calls.append(user_id)
+        return await get(user_id)
+
+    monkeypatch.setattr(user_cache, "get", counting_get)
+    return calls
+
+
+def test_register_then_login(client, token):
+    me = client.get("/users/me", headers=_bearer(token))
+
+    assert me.status_code == 200
+    assert me.json()["email"] == EMAIL
+
+
+def test_register_rejects_a_taken_email(client, token):
+    response = _register(client)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User already exists"
+
+
+def test_login_rejects_a_wrong_password_or_unknown_email(client, token):
+    assert _login(client, password="wrong").status_code == 401
+    assert _login(client, email="nobody@example.com").status_code == 401
+
+
+def test_logout_revokes_every_token_issued_so_far(client, token):
+    second = _login(client).json()["access_token"]
+
+    assert client.post("/auth/logout", headers=_bearer(token)).status_code == 200
+
+    for revoked in (token, second):
+        response = client.get("/users/me", headers=_bearer(revoked))
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token revoked"
+    fresh = _login(client).json()["access_token"]
+    assert client.get("/users/me", headers=_bearer(fresh)).status_code == 200
+
+
+def test_admin_routes_need_the_admin_role(client, token):
+    assert client.get("/admin/places", headers=_bearer(token)).status_code == 403
+    assert client.get("/admin/places").status_code == 401
+
+
+def test_embedded_claims_skip_the_user_lookup(client, places, embed_claims, lookups):
+    _register(client)
+    token = _login(client).json()["access_token"]
+
+    response = client.get("/recommendations/", headers=_bearer(token))
+
+    assert response.status_code == 200
+    assert lookups == []
+
+
+def test_logout_revokes_tokens_with_embedded_claims(client, places, embed_claims, lookups):
+    _register(client)
+    token = _login(client).json()["access_token"]
+    client.post("/auth/logout", headers=_bearer(token))
+    lookups.clear()
+
+    response = client.get("/recommendations/", headers=_bearer(token))
+
+    assert (response.status_code, response.json()["detail"]) == (401, "Token revoked")
+    assert lookups == []
+
+
+def test_changed_claims_make_older_tokens_load_the_user(client, run, places, embed_claims, lookups):
+    _register(client)
+    old = _login(client).json()["access_token"]
+    client.put("/profile/me", json={"travel_style": "relaxed"}, headers=_bearer(old))
+    run(user_sync.flush)
+
+    assert client.get("/recommendations/", headers=_bearer(old)).status_code == 200
+    assert len(lookups) == 1
+
+    new = _login(client).json()["access_token"]
+    assert decode_payload(new)["travel_style"] == "relaxed"
@@ -0,0 +1,133 @@
+# tests/test_bulk_places.py
+"""NDJSON import (POST /admin/places/bulk), export (GET /admin/places/export) and admin updates."""
+import json
+
+from bson import ObjectId
+
+from app.repositories import places as places_repo
+from app.utils.bulk_places import MAX_LINE_BYTES
+
+
+def _ndjson(*docs) -> bytes:
+    return b"".join(json.dumps(doc).encode() + b"\n" for doc in docs)
+
+
+def _import(client, admin_headers, body: bytes) -> dict:
+    response = client.post(
+        "/admin/places/bulk", content=body, headers={**admin_headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _export(client, admin_headers) -> list:
+    response = client.get("/admin/places/export", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.content.splitlines()]
+
+
+def test_import_reports_invalid_lines_and_applies_the_rest(client, admin_headers):
+    body = b"\n".join([
+        json.dumps({"name": "Good A", "category": "beach", "tags": ["x"]}).encode(),
+        b"{not json",
+        json.dumps({"category": "beach"}).encode(),  # no name
+        b"[1, 2]",
+        b"",
+        json.dumps({"id": "nope", "name": "Bad id", "category": "beach"}).encode(),
+        json.dumps({"name": "Good B", "category": "beach", "location": {"lat": 35.9, "lng": 14.4}}).encode(),
+    ])
+
+    report = _import(client, admin_headers, body)
+
+    assert report["lines"] == 6  # the blank line is not counted
+    assert report["upserted"] == 2
+    assert report["error_count"] == 4
+    assert [error["line"] for error in report["errors"]] == [2, 3, 4, 6]
+    assert report["errors"][0]["error"].startswith("invalid JSON")
+    assert report["errors"][1]["error"].startswith("name:")
+    assert report["errors"][2]["error"] == "expected a JSON object"
+    assert report["errors"][3]["error"] == "invalid id"
+    assert [place["name"] for place in client.get("/places/").json()] == ["Good A", "Good B"]
+
+
+def test_oversized_line_is_reported_without_stopping_the_import(client, admin_headers):
+    huge = json.dumps({"name": "Huge", "category": "beach", "description": "x" * MAX_LINE_BYTES}).encode()
+    body = huge + b"\n" + _ndjson({"name": "Small", "category": "beach"})
+
+    report = _import(client, admin_headers, body)
+
+    assert report["upserted"] == 1
+    assert report["errors"] == [{"line": 1, "error": f"line longer than {MAX_LINE_BYTES} bytes"}]
+
+
+def test_import_matches_existing_places_by_name(client, admin_headers, places):
+    report = _import(client, admin_headers, _ndjson({"name": "Golden Bay", "category": "beach", "rating": 4.0}))
+
+    assert (report["upserted"], report["matched"], report["modified"]) == (0, 1, 1)
+    golden_bay = client.get(f"/places/{places[1]['id']}").json()
+    assert golden_bay["rating"] == 4.0
+
+
+def test_import_keeps_fields_a_line_leaves_out(client, admin_headers, places, run):
+    _import(client, admin_headers, _ndjson({"name": "Golden Bay", "category": "beach", "rating": 4.0}))
+
+    stored = run(places_repo.get, ObjectId(places[1]["id"]))
+    for field in ("description", "location", "price_level"):
+        assert stored[field] == places[1][field]
+    assert stored["geo"] == {"type": "Point", "coordinates": [14.3444, 35.9333]}
+
+
+def test_import_drops_geo_with_the_coordinates(client, admin_headers, places, run):
+    moved = {"name": "Golden Bay", "category": "beach", "location": {"address": "Golden Bay, Mellieħa"}}
+
+    _import(client, admin_headers, _ndjson(moved))
+
+    stored = run(places_repo.get, ObjectId(places[1]["id"]))
+    assert stored["location"] == moved["location"]
+    assert "geo" not in stored
+    assert places[1]["id"] not in [p["id"] for p in client.get("/places/nearby?lat=35.9333&lng=14.3444").json()]
+
+
+def test_admin_update_keeps_omitted_fields_and_drops_stale_geo(client, admin_headers, places, run):
+    golden_bay = places[1]
+    url = f"/admin/places/{golden_bay['id']}"
+
+    response = client.put(url, json={"name": "Golden Bay", "category": "beach", "rating": 4.9}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert (response.json()["description"], response.json()["rating"]) == (golden_bay["description"], 4.9)
+    assert "geo" in run(places_repo.get, ObjectId(golden_bay["id"]))
+
+    client.put(url, json={"name": "Golden Bay", "category": "beach", "location": {}}, headers=admin_headers)
+
+    stored = run(places_repo.get, ObjectId(golden_bay["id"]))
+    assert (stored["location"], "geo" in stored) == ({}, False)
+
+
+def test_export_round_trips_through_import(client, admin_headers, places):
+    exported = _export(client, admin_headers)
+    assert [place["name"] for place in exported] == [place["name"] for place in places]
+    assert all("geo" not in place and "_id" not in place for place in exported)
+
+    # Unchanged lines are matched by id but not modified, so ETags survive
+    etags = {place["id"]: client.get(f"/places/{place['id']}").headers["ETag"] for place in exported}
+    report = _import(client, admin_headers, _ndjson(*exported))
+    assert (report["upserted"], report["matched"], report["modified"], report["error_count"]) == (0, 11, 0, 0)
+    assert {pid: client.get(f"/places/{pid}").headers["ETag"] for pid in etags} == etags
+
+    # Edited lines update the place with that id
+    exported[0]["rating"] = 5.0
+    report = _import(client, admin_headers, _ndjson(*exported))
+    assert (report["matched"], report["modified"]) == (11, 1)
+    reexported = _export(client, admin_headers)
+    assert reexported[0]["rating"] == 5.0
+    assert reexported[1:] == exported[1:]
+
+
+def test_import_invalidates_cached_place_lists(client, admin_headers, places):
+    etag = client.get("/places/").headers["ETag"]
+
+    _import(client, admin_headers, _ndjson({"name": "New", "category": "beach"}))
+
+    assert client.get("/places/", headers={"If-None-Match": etag}).status_code == 200
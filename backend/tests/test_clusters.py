@@ -0,0 +1,116 @@
+# tests/test_clusters.py
+"""Map marker clusters (GET /places/clusters) against clustering the raw places."""
+import math
+import random
+from collections import defaultdict
+
+import pytest
+
+from app.repositories import places as places_repo
+from app.schemas.place import PlaceCreate
+from app.utils.bulk_places import place_document
+from app.utils.catalog import place_catalog
+
+BBOX = (14.1, 35.7, 14.6, 36.1)
+
+
+def _cell(lat: float, lng: float, zoom: int) -> tuple:
+    # Web Mercator, 4 x 4 cells per 256px tile
+    n = 2 ** (zoom + 2)
+    x = (lng + 180.0) / 360.0
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0
+    return min(int(x * n), n - 1), min(int(y * n), n - 1)
+
+
+def _expected(places: list, zoom: int) -> list:
+    cells = defaultdict(list)
+    for place in places:
+        location = place["location"]
+        cells[_cell(location["lat"], location["lng"], zoom)].append(location)
+    return sorted(
+        (len(points), round(sum(p["lat"] for p in points) / len(points), 6),
+         round(sum(p["lng"] for p in points) / len(points), 6))
+        for points in cells.values()
+    )
+
+
+def _clusters(client, zoom: int, bbox=BBOX):
+    return client.get("/places/clusters", params={"bbox": ",".join(map(str, bbox)), "zoom": zoom})
+
+
+def _actual(client, zoom: int) -> list:
+    response = _clusters(client, zoom)
+    assert response.status_code == 200
+    return sorted((c["count"], c["lat"], c["lng"]) for c in response.json())
+
+
+@pytest.fixture
+def scattered(run) -> list:
+    """40 places spread over BBOX, with their `id`."""
+    rng = random.Random(7)
+    min_lng, min_lat, max_lng, max_lat = BBOX
+    stored = []
+    for i in range(40):
+        data = {"name": f"Spot {i}", "category": rng.choice(["beach", "museum", "cafe"]),
+                "location": {"lat": rng.uniform(min_lat, max_lat), "lng": rng.uniform(min_lng, max_lng)}}
+        doc = place_document(PlaceCreate(**data))
+        run(places_repo.insert, doc)
+        stored.append({**data, "id": str(doc["_id"])})
+    place_catalog.bump_version()
+    return stored
+
+
+def test_clusters_match_brute_force_at_every_zoom(client, scattered):
+    for zoom in range(13):
+        assert _actual(client, zoom) == pytest.approx(_expected(scattered, zoom), abs=1e-6), zoom
+
+    (everything,) = _clusters(client, 0).json()
+    counts = defaultdict(int)
+    for place in scattered:
+        counts[place["category"]] += 1
+    assert {c["category"]: c["count"] for c in everything["top_categories"]} == counts
+
+
+def test_deleting_a_place_updates_its_cell_at_every_zoom(client, admin_headers, scattered):
+    _actual(client, 0)  # load the pyramid before the delete
+    removed = scattered.pop()
+
+    assert client.delete(f"/admin/places/{removed['id']}", headers=admin_headers).status_code == 204
+
+    for zoom in (0, 6, 12):
+        assert _actual(client, zoom) == pytest.approx(_expected(scattered, zoom), abs=1e-6), zoom
+
+
+def test_places_without_location_are_left_out(client, places):
+    located = [p for p in places if p.get("location")]
+
+    assert sum(count for count, _, _ in _actual(client, 3)) == len(located) == len(places) - 1
+
+
+def test_single_place_clusters_link_to_the_place(client, scattered):
+    ids = {place["id"] for place in scattered}
+
+    singles = [c for c in _clusters(client, 12).json() if c["count"] == 1]
+
+    assert singles
+    assert all(c["place_id"] in ids for c in singles)
+
+
+@pytest.mark.parametrize("bbox", [
+    "1,2,3",
+    "a,b,c,d",
+    "nan,0,1,1",
+    "0,0,inf,1",
+    "10,0,5,1",  # min_lng > max_lng
+    "0,10,1,5",  # min_lat > max_lat
+    "-181,0,0,1",
+    "0,-91,1,0",
+])
+def test_invalid_bbox_is_rejected(client, bbox):
+    response = client.get("/places/clusters", params={"bbox": bbox, "zoom": 3})
+
+    assert response.status_code == 400
+
+
+def test_too_many_cells_are_rejected(client):
+    assert _clusters(client, 16).status_code == 400
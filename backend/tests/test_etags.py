@@ -0,0 +1,155 @@
+# tests/test_etags.py
+"""ETags, If-None-Match (304) and If-Match (412) on place routes."""
+from bson import ObjectId
+
+from app.repositories import places as places_repo
+
+
+def _by_name(places: list, name: str) -> dict:
+    return next(place for place in places if place["name"] == name)
+
+
+def test_place_list_revalidates_until_the_catalog_changes(client, admin_headers, places):
+    first = client.get("/places/")
+    etag = first.headers["ETag"]
+    assert etag.startswith('"catalog-')
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    cached = client.get("/places/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    client.post("/admin/places", json={"name": "Popeye Village", "category": "activity"}, headers=admin_headers)
+    changed = client.get("/places/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_page_etag_follows_the_places_on_the_page(client, run, places):
+    url = "/places/?category=beach&limit=2"
+    etag = client.get(url).headers["ETag"]
+    assert etag.startswith('"page-')
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # A write the catalog never hears of (another worker, a script) still changes the page's tag
+    catalog_etag = client.get("/places/").headers["ETag"]
+    run(places_repo.update, ObjectId(_by_name(places, "Paceville")["id"]), {"rating": 4.0})
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    run(places_repo.update, ObjectId(_by_name(places, "Golden Bay")["id"]), {"rating": 4.0})
+
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()[1]["rating"] == 4.0
+    assert client.get("/places/").headers["ETag"] == catalog_etag
+
+
+def test_page_etag_covers_the_next_cursor(client, admin_headers, places):
+    url = "/places/?category=beach&limit=3"
+    etag = client.get(url).headers["ETag"]
+
+    client.post("/admin/places", json={"name": "Għajn Tuffieħa", "category": "beach"}, headers=admin_headers)
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["X-Next-Cursor"]
+
+
+def test_projected_page_is_tagged_without_returning_rev(client, run, places):
+    url = "/places/?fields=name&limit=3"
+    first = client.get(url)
+    assert all(set(place) == {"id", "name"} for place in first.json())
+
+    run(places_repo.update, ObjectId(places[0]["id"]), {"rating": 1.0})
+
+    assert client.get(url, headers={"If-None-Match": first.headers["ETag"]}).status_code == 200
+    assert "rev" in client.get("/places/?fields=name,rev&limit=1").json()[0]
+
+
+def test_admin_list_pages_and_full_list_are_tagged_privately(client, run, admin_headers, places):
+    full = client.get("/admin/places", headers=admin_headers)
+    page = client.get("/admin/places?category=museum", headers=admin_headers)
+
+    assert full.headers["ETag"].startswith('"catalog-') and page.headers["ETag"].startswith('"page-')
+    assert full.headers["Cache-Control"] == page.headers["Cache-Control"] == "private, no-cache"
+    revalidated = client.get("/admin/places?category=museum",
+                             headers={**admin_headers, "If-None-Match": page.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["Cache-Control"] == "private, no-cache"
+
+    run(places_repo.update, ObjectId(_by_name(places, "Ħaġar Qim Temples")["id"]), {"rating": 4.9})
+    changed = client.get("/admin/places?category=museum",
+                         headers={**admin_headers, "If-None-Match": page.headers["ETag"]})
+    assert changed.status_code == 200
+
+
+def test_place_etag_follows_its_revision(client, admin_headers, places):
+    place = places[0]
+    url = f"/places/{place['id']}"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    # Weak comparison for GET: a W/ prefix still matches
+    assert client.get(url, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+    body = {"name": place["name"], "category": place["category"], "rating": 3.0}
+    client.put(f"/admin/places/{place['id']}", json=body, headers=admin_headers)
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_match_applies_an_update_at_the_current_revision(client, admin_headers, places):
+    place = places[0]
+    etag = client.get(f"/places/{place['id']}").headers["ETag"]
+    body = {"name": place["name"], "category": place["category"], "rating": 4.0}
+
+    response = client.put(f"/admin/places/{place['id']}", json=body, headers={**admin_headers, "If-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["rating"] == 4.0
+    assert response.headers["ETag"] != etag
+    assert client.get(f"/places/{place['id']}").headers["ETag"] == response.headers["ETag"]
+
+
+def test_if_match_with_a_stale_etag_fails(client, admin_headers, places):
+    place = places[0]
+    url = f"/admin/places/{place['id']}"
+    stale = client.get(f"/places/{place['id']}").headers["ETag"]
+    body = {"name": place["name"], "category": place["category"]}
+    client.put(url, json={**body, "rating": 1.0}, headers=admin_headers)
+
+    response = client.put(url, json={**body, "rating": 2.0}, headers={**admin_headers, "If-Match": stale})
+
+    assert response.status_code == 412
+    assert client.get(f"/places/{place['id']}").json()["rating"] == 1.0
+
+
+def test_if_match_uses_strong_comparison(client, admin_headers, places):
+    place, other = places[0], places[1]
+    etag = client.get(f"/places/{place['id']}").headers["ETag"]
+    other_etag = client.get(f"/places/{other['id']}").headers["ETag"]
+    body = {"name": place["name"], "category": place["category"]}
+
+    weak = client.put(f"/admin/places/{place['id']}", json=body, headers={**admin_headers, "If-Match": f"W/{etag}"})
+    wrong_place = client.put(
+        f"/admin/places/{place['id']}", json=body, headers={**admin_headers, "If-Match": other_etag}
+    )
+
+    assert weak.status_code == 412
+    assert wrong_place.status_code == 412
+
+
+def test_if_match_star_and_missing_places(client, admin_headers, places):
+    place = places[0]
+    body = {"name": place["name"], "category": place["category"]}
+    missing = "0" * 24
+
+    star = client.put(f"/admin/places/{place['id']}", json=body, headers={**admin_headers, "If-Match": "*"})
+    assert star.status_code == 200
+
+    no_precondition = client.put(f"/admin/places/{missing}", json=body, headers=admin_headers)
+    assert no_precondition.status_code == 404
+    # With a place tag, a missing place fails the precondition instead
+    tagged = client.put(
+        f"/admin/places/{missing}", json=body, headers={**admin_headers, "If-Match": f'"place-{missing}-1"'}
+    )
+    assert tagged.status_code == 412
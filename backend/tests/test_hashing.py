@@ -0,0 +1,56 @@
+# tests/test_hashing.py
+"""Password hashing runs in a bounded pool: 503 when it is full, re-hash on login."""
+import threading
+
+from app.config import settings
+from app.utils import hashing
+from app.utils.hashing import hash_stats
+from app.utils.user_cache import user_cache
+
+CREDENTIALS = {"email": "sam@example.com", "password": "correct horse"}
+
+
+def _register(client):
+    return client.post("/auth/register", json={"name": "Sam", **CREDENTIALS})
+
+
+def _login(client):
+    return client.post("/auth/login", json=CREDENTIALS)
+
+
+def test_hashing_runs_off_the_event_loop(client, monkeypatch):
+    threads = []
+    hash_password = hashing.hash_password
+
+    def recording_hash(password):
+        threads.append(threading.current_thread().name)
+        return hash_password(password)
+
+    monkeypatch.setattr(hashing, "hash_password", recording_hash)
+
+    assert _register(client).status_code == 200
+    assert len(threads) == 1 and threads[0].startswith("bcrypt")
+
+
+def test_full_pool_answers_503_with_retry_after(client, monkeypatch):
+    assert _register(client).status_code == 200
+    monkeypatch.setattr(settings, "HASH_MAX_PENDING", 0)
+    rejected = hash_stats.rejected
+
+    for response in (_register(client), _login(client)):
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+    assert hash_stats.rejected == rejected + 2
+
+
+def test_login_rehashes_with_new_rounds_and_refreshes_the_cached_user(client, run, monkeypatch):
+    user_id = _register(client).json()["user_id"]
+    token = _login(client).json()["access_token"]
+    client.get("/users/me", headers={"Authorization": f"Bearer {token}"})  # caches the user
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", settings.BCRYPT_ROUNDS + 1)
+
+    assert _login(client).status_code == 200  # re-hash runs as a background task
+
+    cached = run(user_cache.get, user_id)
+    assert cached["password_hash"].startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert _login(client).status_code == 200
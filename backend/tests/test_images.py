@@ -0,0 +1,126 @@
+# tests/test_images.py
+"""Image uploads: 413 before an oversized body is read, stored once per content hash."""
+import io
+
+import pytest
+from PIL import Image
+
+from app.config import settings
+from app.main import app
+from app.routers import admin
+from app.utils import images
+
+UPLOAD_PATH = "/admin/places/upload-image"
+BODY_CHUNK = 64 * 1024
+
+
+@pytest.fixture
+def images_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "STATIC_PLACES_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def processed(monkeypatch) -> list:
+    """Filenames handed to the background variant pipeline (not run here)."""
+    names = []
+
+    async def record(filename):
+        names.append(filename)
+
+    monkeypatch.setattr(admin, "process_upload", record)
+    return names
+
+
+def _png(color) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(out, format="PNG")
+    return out.getvalue()
+
+
+def _upload(client, headers, content: bytes, filename="photo.png"):
+    return client.post(UPLOAD_PATH, headers=headers, files={"file": (filename, content, "image/png")})
+
+
+def _post_raw(run, headers: dict, body_chunks) -> tuple:
+    """POST straight to the ASGI app; returns (status, number of body chunks the app read)."""
+    reads = 0
+    sent = []
+
+    async def receive():
+        nonlocal reads
+        chunk = next(body_chunks, None)
+        if chunk is None:
+            return {"type": "http.disconnect"}
+        reads += 1
+        return {"type": "http.request", "body": chunk, "more_body": True}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": UPLOAD_PATH, "raw_path": UPLOAD_PATH.encode(), "root_path": "",
+        "query_string": b"", "server": ("testserver", 80), "client": ("testclient", 50000),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    run(app, scope, receive, send)
+    start = next(m for m in sent if m["type"] == "http.response.start")
+    return start["status"], reads
+
+
+def _endless_body():
+    """A well-formed multipart file part whose content never ends."""
+    yield (b'--b\r\nContent-Disposition: form-data; name="file"; filename="big.png"\r\n'
+           b"Content-Type: image/png\r\n\r\n")
+    while True:
+        yield b"x" * BODY_CHUNK
+
+
+def test_declared_oversized_upload_is_refused_without_reading_the_body(run, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_IMAGE_UPLOAD_BYTES", 1000)
+    headers = {"Content-Type": "multipart/form-data; boundary=b", "Content-Length": str(10 * 1024 * 1024)}
+
+    assert _post_raw(run, headers, _endless_body()) == (413, 0)
+
+
+def test_chunked_upload_is_cut_off_once_past_the_limit(run, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_IMAGE_UPLOAD_BYTES", 1000)
+    limit = settings.MAX_IMAGE_UPLOAD_BYTES + images.MULTIPART_OVERHEAD_BYTES
+    headers = {"Content-Type": "multipart/form-data; boundary=b", "Transfer-Encoding": "chunked"}
+
+    status, reads = _post_raw(run, headers, _endless_body())
+
+    assert status == 413
+    assert reads == limit // BODY_CHUNK + 2  # part headers, then chunks up to the limit
+
+
+def test_store_upload_backstop_rejects_and_leaves_no_temp_file(client, admin_headers, images_dir,
+                                                             processed, monkeypatch):
+    content = _png("red")
+    monkeypatch.setattr(settings, "MAX_IMAGE_UPLOAD_BYTES", len(content) - 1)
+
+    assert _upload(client, admin_headers, content).status_code == 413
+    assert list(images_dir.iterdir()) == [] and processed == []
+
+
+def test_same_content_is_stored_once_under_its_hash(client, admin_headers, images_dir, processed):
+    content = _png("red")
+
+    first = _upload(client, admin_headers, content, "a.png")
+    again = _upload(client, admin_headers, content, "renamed.jpg")
+    other = _upload(client, admin_headers, _png("blue"))
+
+    assert first.status_code == again.status_code == other.status_code == 200
+    assert first.json() == again.json() != other.json()
+    stored = {images.image_url(path.name) for path in images_dir.iterdir()}
+    assert stored == {first.json()["image"], other.json()["image"]}
+    assert (images_dir / processed[0]).read_bytes() == content
+    assert processed[0] == processed[1]
+
+
+def test_content_that_is_not_an_image_is_rejected(client, admin_headers, images_dir, processed):
+    response = _upload(client, admin_headers, b"<html>not a picture</html>")
+
+    assert response.status_code == 400
+    assert list(images_dir.iterdir()) == []
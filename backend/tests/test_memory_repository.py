@@ -0,0 +1,89 @@
+# tests/test_memory_repository.py
+"""The in-memory repositories behave like the Mongo ones for the queries the app makes."""
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.repositories import places as places_repo
+from app.repositories import profiles, users
+from app.repositories.memory import matches, project
+
+
+def _names(run, query=None) -> list:
+    async def collect():
+        return [doc["name"] async for doc in places_repo.iterate(query)]
+    return run(collect)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ({"category": "beach"}, True),
+    ({"category": "museum"}, False),
+    ({"tags": "family"}, True),  # array field matches any element
+    ({"tags": {"$all": ["family", "kids"]}}, True),
+    ({"tags": {"$all": ["family", "history"]}}, False),
+    ({"rating": {"$gt": 4.5}}, False),
+    ({"rating": {"$gte": 4.4, "$lt": 5}}, True),
+    ({"price_level": {"$in": ["low", "medium"]}}, True),
+    ({"price_level": {"$ne": "low"}}, False),
+    ({"duration": None}, True),  # missing equals null
+    ({"duration": {"$exists": True}}, False),
+    ({"location.lat": {"$gt": 35}}, True),
+    ({"name": {"$regex": "^mellie", "$options": "i"}}, True),
+])
+def test_matches_follows_mongo_semantics(query, expected):
+    doc = {"name": "Mellieħa Bay", "category": "beach", "tags": ["family", "kids"], "rating": 4.4,
+           "price_level": "low", "location": {"lat": 35.95, "lng": 14.36}}
+
+    assert matches(doc, query) is expected
+
+
+def test_project_includes_or_excludes_fields():
+    doc = {"_id": 1, "name": "Golden Bay", "location": {"lat": 35.9, "lng": 14.3}, "geo": {}}
+
+    assert project(doc, {"name": 1, "location.lat": 1}) == {"_id": 1, "name": "Golden Bay", "location": {"lat": 35.9}}
+    assert project(doc, {"geo": 0}) == {"_id": 1, "name": "Golden Bay", "location": {"lat": 35.9, "lng": 14.3}}
+
+
+def test_places_scan_in_id_order_after_a_cursor(run, places):
+    ids = [ObjectId(place["id"]) for place in places]
+
+    page = run(places_repo.find_page, {"category": "beach"}, ids[0], 10)
+
+    assert [doc["name"] for doc in page] == ["Golden Bay", "Mellieħa Bay"]
+    assert _names(run, {"tags": "history"}) == [
+        "Ħaġar Qim Temples", "National Museum of Archaeology", "St. John's Co-Cathedral", "Valletta Walking Tour",
+    ]
+
+
+def test_returned_documents_are_copies(run, places):
+    place_id = ObjectId(places[0]["id"])
+    doc = run(places_repo.get, place_id)
+    doc["tags"].append("changed")
+
+    assert run(places_repo.get, place_id)["tags"] == places[0]["tags"]
+
+
+def test_bulk_upsert_matches_by_name_and_counts_like_mongo(run, places):
+    result = run(places_repo.bulk_upsert, [
+        ({"name": "Golden Bay"}, {"rating": 4.5}, ("image",)),  # unchanged
+        ({"name": "Blue Lagoon"}, {"rating": 4.9}, ()),
+        ({"name": "Mellieħa Bay"}, {}, ("geo",)),
+        ({"name": "Comino Caves"}, {"category": "nature"}, ("geo",)),
+    ])
+
+    assert (result["nMatched"], result["nModified"], result["nUpserted"]) == (3, 2, 1)
+    new = run(places_repo.find_page, {"name": "Comino Caves"}, None, 1)[0]
+    assert (new["category"], new["rev"]) == ("nature", 1)
+    unset = run(places_repo.get, ObjectId(places[2]["id"]))
+    assert ("geo" in unset, unset["location"], unset["rev"]) == (False, places[2]["location"], 2)
+
+
+def test_unique_email_and_one_profile_per_user(run):
+    user_id = run(users.create, {"email": "a@example.com"})
+    with pytest.raises(DuplicateKeyError):
+        run(users.create, {"email": "a@example.com"})
+
+    run(profiles.upsert_for_user, ObjectId(user_id), {"budget": "low"})
+    profile = run(profiles.upsert_for_user, ObjectId(user_id), {"travel_style": "relaxed"})
+
+    assert (profile["budget"], profile["travel_style"]) == ("low", "relaxed")
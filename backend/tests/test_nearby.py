@@ -0,0 +1,73 @@
+# tests/test_nearby.py
+"""GET /places/nearby and the SpatialIndex behind it agree with a brute-force scan."""
+import pytest
+
+from app.utils.geo import SpatialIndex, haversine_km, place_coords
+
+VALLETTA = (35.8989, 14.5146)
+
+
+def _brute_force(places, lat, lng, radius_km=None, category=None, limit=20):
+    found = []
+    for place in places:
+        coords = place_coords(place)
+        if coords is None or (category and place.get("category") != category):
+            continue
+        dist = haversine_km(lat, lng, *coords)
+        if radius_km is None or dist <= radius_km:
+            found.append((dist, place["id"]))
+    return sorted(found)[:limit]
+
+
+def test_nearest_first_with_distances(client, places):
+    response = client.get("/places/nearby", params={"lat": VALLETTA[0], "lng": VALLETTA[1], "limit": 4})
+
+    assert response.status_code == 200
+    expected = _brute_force(places, *VALLETTA, limit=4)
+    assert [(p["distance_km"], p["id"]) for p in response.json()] == [(round(d, 3), pid) for d, pid in expected]
+
+
+def test_radius_returns_every_place_inside_it_and_nothing_else(client, places):
+    response = client.get("/places/nearby", params={"lat": VALLETTA[0], "lng": VALLETTA[1], "radius_km": 12})
+
+    expected = _brute_force(places, *VALLETTA, radius_km=12)
+    assert 0 < len(expected) < len([p for p in places if place_coords(p)])
+    assert [p["id"] for p in response.json()] == [pid for _, pid in expected]
+
+
+def test_category_filter_and_places_without_location(client, places):
+    beaches = client.get("/places/nearby", params={"lat": VALLETTA[0], "lng": VALLETTA[1], "category": "beach"})
+    everything = client.get("/places/nearby", params={"lat": VALLETTA[0], "lng": VALLETTA[1], "limit": 100})
+
+    assert {p["name"] for p in beaches.json()} == {"Blue Lagoon", "Golden Bay", "Mellieħa Bay"}
+    assert "Valletta Walking Tour" not in {p["name"] for p in everything.json()}
+    assert len(everything.json()) == len(places) - 1
+
+
+@pytest.mark.parametrize("params", [{"lat": 91, "lng": 14}, {"lat": 35, "lng": 14, "radius_km": 0}, {"lat": 35}])
+def test_invalid_queries(client, params):
+    assert client.get("/places/nearby", params=params).status_code == 422
+
+
+@pytest.mark.parametrize("radius_km", [None, 0.5, 5, 40])
+@pytest.mark.parametrize("point", [VALLETTA, (36.05, 14.25), (35.5, 15.5), (0.0, 0.0)])
+def test_index_matches_brute_force(synthetic_catalog, point, radius_km):
+    index = SpatialIndex()
+    index.rebuild(synthetic_catalog)
+
+    found = index.nearby(*point, radius_km=radius_km, limit=25)
+
+    assert [(d, p["id"]) for p, d in found] == _brute_force(synthetic_catalog, *point, radius_km=radius_km, limit=25)
+
+
+def test_index_follows_upserts_and_removes(synthetic_catalog):
+    index = SpatialIndex()
+    index.rebuild(synthetic_catalog)
+    moved = {**synthetic_catalog[0], "location": {"lat": VALLETTA[0], "lng": VALLETTA[1]}}
+    index.upsert(moved)
+    index.remove(synthetic_catalog[1]["id"])
+    index.upsert({**synthetic_catalog[2], "location": None})
+    current = [moved] + synthetic_catalog[3:]
+
+    assert index.nearby(*VALLETTA, limit=1)[0] == (moved, 0.0)
+    assert [(d, p["id"]) for p, d in index.nearby(*VALLETTA, limit=50)] == _brute_force(current, *VALLETTA, limit=50)
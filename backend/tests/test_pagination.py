@@ -0,0 +1,88 @@
+# tests/test_pagination.py
+"""Keyset pagination, filters and projection of GET /places/ and GET /admin/places."""
+import pytest
+
+from app.repositories import places as places_repo
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+def _walk(client, url: str, headers=None) -> list:
+    pages = []
+    response = client.get(url, headers=headers)
+    while True:
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return pages
+        response = client.get(f"{url}&after={cursor}", headers=headers)
+
+
+def test_pages_cover_every_place_once_in_id_order(client, places):
+    pages = _walk(client, "/places/?limit=4")
+
+    assert [len(page) for page in pages] == [4, 4, 3]
+    assert [place["id"] for page in pages for place in page] == sorted(p["id"] for p in places)
+
+
+def test_last_full_page_has_no_cursor(client, places):
+    pages = _walk(client, "/places/?category=beach&limit=3")
+
+    assert [len(page) for page in pages] == [3]
+
+
+def test_cursor_skips_places_up_to_it(client, places):
+    ids = sorted(p["id"] for p in places if p["category"] == "beach")
+
+    response = client.get(f"/places/?category=beach&after={ids[0]}")
+
+    assert [place["id"] for place in response.json()] == ids[1:]
+
+
+def test_filters_by_price_level_and_all_tags(client, places):
+    response = client.get("/places/?price_level=low&tags=family&tags=swimming")
+
+    assert [place["name"] for place in response.json()] == ["Blue Lagoon", "Mellieħa Bay"]
+
+
+def test_fields_projects_the_listed_fields_and_id(client, places):
+    listed = client.get("/places/?category=church&fields=name,rating").json()
+
+    assert listed == [{"id": places[5]["id"], "name": "St. John's Co-Cathedral", "rating": places[5]["rating"]}]
+
+
+def test_admin_list_pages_like_the_public_one(client, admin_headers, places):
+    pages = _walk(client, "/admin/places?category=museum&limit=1", headers=admin_headers)
+
+    assert [place["id"] for page in pages for place in page] == sorted(
+        p["id"] for p in places if p["category"] == "museum"
+    )
+
+
+def test_admin_list_is_served_from_the_catalog(client, admin_headers, places, monkeypatch):
+    public = client.get("/places/").json()
+
+    def iterate(*args, **kwargs):
+        raise AssertionError("the unfiltered admin list should not read the collection")
+
+    monkeypatch.setattr(places_repo, "iterate", iterate)
+    created = client.post("/admin/places", json={"name": "Popeye Village", "category": "family"}, headers=admin_headers)
+    listed = client.get("/admin/places", headers=admin_headers).json()
+
+    assert listed == public + [created.json()]
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/places/?after=not-an-id")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_invalid_field_name_is_rejected(client):
+    assert client.get("/places/?fields=name,$where").status_code == 400
+
+
+@pytest.mark.parametrize("limit", [0, 201])
+def test_page_size_is_bounded(client, limit):
+    assert client.get(f"/places/?limit={limit}").status_code == 422
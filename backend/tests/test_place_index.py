@@ -0,0 +1,65 @@
+# tests/test_place_index.py
+"""PlaceIndex.band finds the same places as scoring the whole catalog."""
+import pytest
+
+from app.utils import place_index as place_index_module
+from app.utils.place_index import PlaceIndex
+from app.utils.scoring import ScoringEngine, normalize_preferences
+
+PREFERENCES = [
+    {"interests": ["snorkeling"], "budget": "low"},
+    {"interests": ["history", "street food"], "budget": "high"},
+    {"interests": ["views"], "travel_style": "relaxed"},
+    {"interests": ["nothing-matches-this"], "budget": "medium"},
+    {"travel_style": "nightlife"},
+]
+
+
+def _band(band) -> list:
+    return sorted((place["id"], score) for place, score in zip(band.places, band.scores.tolist()))
+
+
+@pytest.fixture
+def catalog(synthetic_catalog) -> list:
+    return [dict(place) for place in synthetic_catalog]
+
+
+@pytest.fixture
+def index(catalog) -> PlaceIndex:
+    index = PlaceIndex()
+    index.rebuild(catalog)
+    return index
+
+
+@pytest.mark.parametrize("user", PREFERENCES)
+def test_band_matches_engine(catalog, index, user):
+    prefs = normalize_preferences(user)
+
+    assert _band(index.band(prefs, 5)) == _band(ScoringEngine(catalog).band(prefs, 5))
+
+
+@pytest.mark.parametrize("user", PREFERENCES)
+def test_band_matches_engine_after_upserts_and_removes(catalog, index, user):
+    prefs = normalize_preferences(user)
+    edited = {**catalog[7], "description": "Snorkeling, street food and history with views.", "rating": 5.0}
+    added = {**catalog[8], "id": "f" * 24, "tags": ["history"], "description": "Nightlife all night."}
+    removed = catalog[9]["id"]
+    for place in (edited, added):
+        index.upsert(place)
+    index.remove(removed)
+    catalog[7] = edited
+    catalog = [p for p in catalog if p["id"] != removed] + [added]
+
+    assert _band(index.band(prefs, 5)) == _band(ScoringEngine(catalog).band(prefs, 5))
+
+
+def test_band_only_scores_places_that_mention_the_interests(index, catalog, monkeypatch):
+    prefs = normalize_preferences({"interests": ["snorkeling"], "budget": "medium"})
+    matching = [p for p in catalog if "snorkeling" in p["tags"] or "snorkeling" in p["description"].lower()]
+    scored = []
+    score_place = place_index_module.score_place
+    monkeypatch.setattr(place_index_module, "score_place", lambda place, *args: scored.append(place) or score_place(place, *args))
+
+    index.band(prefs, 5)
+
+    assert 0 < len(scored) == len(matching)
@@ -0,0 +1,129 @@
+# tests/test_profile.py
+"""PUT /profile/me upserts in one write; travel_style reaches the user through the write-behind queue."""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.repositories import profiles, users
+from app.utils.user_cache import user_cache
+from app.utils.write_behind import UserSyncQueue, user_sync
+
+
+@pytest.fixture
+def queue(run, monkeypatch):
+    """A queue of its own whose background task never flushes during the test."""
+    monkeypatch.setattr(settings, "USER_SYNC_FLUSH_INTERVAL_MS", 60_000)
+    queue = UserSyncQueue()
+    yield queue
+    run(queue.stop)
+
+
+def _enqueue(run, queue, *updates):
+    async def enqueue():
+        for user_id, fields in updates:
+            queue.enqueue(user_id, fields)
+
+    run(enqueue)
+
+
+def _failing_once(monkeypatch) -> list:
+    batches = []
+    bulk_update = users.bulk_update
+
+    async def flaky(updates):
+        batches.append(dict(updates))
+        if len(batches) == 1:
+            raise ConnectionError("primary stepped down")
+        await bulk_update(updates)
+
+    monkeypatch.setattr(users, "bulk_update", flaky)
+    return batches
+
+
+def test_put_creates_then_updates_one_profile(client, user, user_headers, monkeypatch):
+    writes = []
+    upsert = profiles.upsert_for_user
+
+    async def counting_upsert(user_id, fields):
+        writes.append(user_id)
+        return await upsert(user_id, fields)
+
+    monkeypatch.setattr(profiles, "upsert_for_user", counting_upsert)
+
+    created = client.put("/profile/me", json={"name": "Tess", "age": 30}, headers=user_headers).json()
+    updated = client.put("/profile/me", json={"name": "Tess", "nationality": "MT"}, headers=user_headers).json()
+
+    assert len(writes) == 2
+    assert updated["id"] == created["id"]
+    assert (updated["user_id"], updated["nationality"]) == (user["id"], "MT")
+    assert client.get("/profile/me", headers=user_headers).json() == updated
+
+
+def test_travel_style_reaches_the_user_after_the_flush(client, run, user, user_headers):
+    client.get("/users/me", headers=user_headers)  # caches the user
+
+    client.put("/profile/me", json={"travel_style": "relaxed"}, headers=user_headers)
+    run(user_sync.flush)
+
+    assert run(user_cache.get, user["id"])["travel_style"] == "relaxed"
+
+
+def test_updates_for_one_user_are_coalesced(run, user, queue):
+    _enqueue(run, queue, (user["id"], {"travel_style": "relaxed", "budget": "low"}),
+             (user["id"], {"travel_style": "nightlife"}))
+
+    assert queue.pending() == 1
+    assert run(queue.flush) is True
+
+    stored = run(users.get, user["id"])
+    assert (stored["travel_style"], stored["budget"]) == ("nightlife", "low")
+    assert (queue.stats.enqueued, queue.stats.coalesced, queue.stats.batches) == (2, 1, 1)
+
+
+def test_failed_batch_is_retried_and_newer_fields_win(run, user, queue, monkeypatch):
+    batches = _failing_once(monkeypatch)
+    _enqueue(run, queue, (user["id"], {"travel_style": "relaxed", "budget": "low"}))
+
+    assert run(queue.flush) is False
+    _enqueue(run, queue, (user["id"], {"travel_style": "nightlife"}))
+    assert run(queue.flush) is True
+
+    assert batches[1] == {user["id"]: {"travel_style": "nightlife", "budget": "low"}}
+    stored = run(users.get, user["id"])
+    assert (stored["travel_style"], stored["budget"]) == ("nightlife", "low")
+    assert (queue.stats.failures, queue.stats.written, queue.pending()) == (1, 1, 0)
+
+
+def test_updates_are_dropped_after_the_last_retry(run, user, queue, monkeypatch):
+    monkeypatch.setattr(settings, "USER_SYNC_MAX_RETRIES", 2)
+
+    async def failing(updates):
+        raise ConnectionError("primary stepped down")
+
+    monkeypatch.setattr(users, "bulk_update", failing)
+    _enqueue(run, queue, (user["id"], {"travel_style": "relaxed"}))
+
+    results = [run(queue.flush) for _ in range(3)]
+
+    assert results == [False, False, False]
+    assert (queue.stats.failures, queue.stats.dropped, queue.pending()) == (3, 1, 0)
+
+
+def test_background_task_backs_off_and_retries(run, user, monkeypatch):
+    monkeypatch.setattr(settings, "USER_SYNC_FLUSH_INTERVAL_MS", 10)
+    batches = _failing_once(monkeypatch)
+    queue = UserSyncQueue()
+    _enqueue(run, queue, (user["id"], {"travel_style": "relaxed"}))
+
+    async def wait_for_write():
+        for _ in range(200):
+            if queue.stats.written:
+                return
+            await asyncio.sleep(0.01)
+
+    run(wait_for_write)
+    run(queue.stop)
+
+    assert len(batches) == 2
+    assert run(users.get, user["id"])["travel_style"] == "relaxed"
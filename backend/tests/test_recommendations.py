@@ -0,0 +1,76 @@
+# tests/test_recommendations.py
+"""Memoized recommendation bands and their per-user top k."""
+import random
+
+import numpy as np
+import pytest
+
+from app.repositories import users
+from app.utils import scoring
+from app.utils.jwt_handler import create_access_token
+from app.utils.recommendation_cache import recommendation_cache
+from app.utils.scoring import RankedBand, jitter_keys, user_jitter
+
+
+def _sorted_top_k(band: RankedBand, k: int, seed: str) -> list:
+    rounded = np.round(band.scores + user_jitter(seed, band.keys), 3)
+    best = np.lexsort((band.order, -rounded))[:k]
+    return [(band.places[i]["id"], float(rounded[i])) for i in best]
+
+
+def _band(scores: list) -> RankedBand:
+    places = [{"id": "%024x" % random.Random(i).getrandbits(96)} for i in range(len(scores))]
+    return RankedBand(places, scores, range(len(scores)), jitter_keys([p["id"] for p in places]))
+
+
+@pytest.mark.parametrize("scores", [
+    [7.0] * 20_000,  # everybody ties
+    [7.0] * 5_000 + [6.9] * 5_000 + [6.75] * 5_000,  # tiers within jitter range of each other
+    [8.0, 7.9] + [7.0] * 3_000,  # a few clear winners
+    [7.0] * 3,  # fewer members than k
+    [random.Random(i).choice([5.0, 5.1, 5.2, 5.25, 5.3]) for i in range(2_000)],
+])
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_top_k_equals_sorting_every_member(scores, k):
+    band = _band(scores)
+
+    for seed in ("a", "b", "6ad3e21b29fdede235518a62", "zz"):
+        assert [(p["id"], s) for p, s in band.top_k(k, seed)] == _sorted_top_k(band, k, seed)
+
+
+def test_top_k_work_scales_with_k_not_with_ties(monkeypatch):
+    band = _band([7.0] * 20_000)
+    calls = []
+    jitter = scoring._jitter
+    monkeypatch.setattr(scoring, "_jitter", lambda key, seed_hash: calls.append(key) or jitter(key, seed_hash))
+
+    band.top_k(5, "some-user")
+
+    # k plus the members tied with the k-th after rounding (about 20_000 / 300)
+    assert len(calls) < 500
+
+
+def test_same_preferences_share_one_band(client, run, places, user, user_headers):
+    other = run(users.create, {"email": "other@example.com"})
+    for user_id in (user["id"], other):
+        run(users.update, user_id, {"interests": ["history"], "budget": "medium"})
+    other_headers = {"Authorization": f"Bearer {create_access_token(other, claims={'tv': 0})}"}
+
+    assert client.get("/recommendations/", headers=user_headers).status_code == 200
+    hits = recommendation_cache.stats.hits
+    assert client.get("/recommendations/", headers=other_headers).status_code == 200
+
+    assert recommendation_cache.stats.hits == hits + 1
+
+
+def test_catalog_changes_drop_memoized_bands(client, run, places, user, user_headers, admin_headers):
+    run(users.update, user["id"], {"interests": ["history", "underground"], "budget": "medium"})
+    client.get("/recommendations/", headers=user_headers)
+
+    created = client.post("/admin/places", json={
+        "name": "Hypogeum", "category": "museum", "price_level": "medium", "rating": 5.0,
+        "description": "Underground history.", "tags": ["history", "unesco"],
+    }, headers=admin_headers).json()
+    recommendations = client.get("/recommendations/", headers=user_headers).json()["recommendations"]
+
+    assert recommendations[0]["id"] == created["id"]
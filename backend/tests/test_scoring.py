@@ -0,0 +1,82 @@
+# tests/test_scoring.py
+"""The batched ScoringEngine ranks exactly like scoring every place with score_place."""
+import numpy as np
+import pytest
+
+from app.utils.scoring import ScoringEngine, jitter_keys, normalize_preferences, score_place, user_jitter
+
+PREFERENCES = [
+    {},
+    {"interests": ["beach"], "budget": "low"},
+    {"interests": ["history", "food", "views"], "budget": "high", "travel_style": "relaxed"},
+    {"interests": ["snorkeling", "early crowds", "nightlife"], "travel_style": "nightlife"},
+    {"interests": ["museum", "museum", "Hiking "], "budget": "medium", "travel_style": "adventurous"},
+    {"interests": ["nothing-matches-this"], "travel_style": "unknown"},
+]
+
+
+def ranked_by_score_place(places: list, prefs, seed: str, k: int) -> list:
+    """`(id, score)` of the top k: every place scored and jittered, then a stable sort."""
+    scores = np.array([score_place(place, prefs) for place in places], dtype=np.float64)
+    rounded = np.round(scores + user_jitter(seed, jitter_keys([place["id"] for place in places])), 3)
+    best = sorted(range(len(places)), key=lambda i: -rounded[i])[:k]
+    return [(places[i]["id"], float(rounded[i])) for i in best]
+
+
+@pytest.fixture(scope="module")
+def catalog(synthetic_catalog) -> list:
+    return synthetic_catalog
+
+
+@pytest.fixture(scope="module")
+def engine(catalog) -> ScoringEngine:
+    return ScoringEngine(catalog)
+
+
+@pytest.mark.parametrize("user", PREFERENCES)
+def test_scores_match_score_place(catalog, engine, user):
+    prefs = normalize_preferences(user)
+
+    scores = engine.score_all(prefs)
+
+    assert scores.tolist() == pytest.approx([score_place(place, prefs) for place in catalog])
+
+
+@pytest.mark.parametrize("user", PREFERENCES)
+@pytest.mark.parametrize("seed", ["user-a", "user-b"])
+def test_ranking_matches_ranking_every_place(catalog, engine, user, seed):
+    prefs = normalize_preferences(user)
+
+    ranked = engine.band(prefs, 5).top_k(5, seed)
+
+    assert [(place["id"], score) for place, score in ranked] == ranked_by_score_place(catalog, prefs, seed, 5)
+
+
+def test_interests_match_whole_description_words():
+    places = [
+        {"id": "a", "description": "Fresh seafood by the harbour"},
+        {"id": "b", "description": "Street food in the old town; sea views."},
+    ]
+    engine = ScoringEngine(places)
+
+    for interests, hits in [(["sea"], ["b"]), (["seafood"], ["a"]), (["street food"], ["b"]), (["food sea"], ["b"])]:
+        prefs = normalize_preferences({"interests": interests, "budget": "medium"})
+        base = normalize_preferences({"budget": "medium"})
+        gained = engine.score_all(prefs) - engine.score_all(base)
+        assert [place["id"] for place, points in zip(places, gained) if points] == hits
+        assert [score_place(place, prefs) - score_place(place, base) for place in places] == gained.tolist()
+
+
+def test_recommendations_route_returns_the_top_five(client, places, run, user, user_headers):
+    from app.repositories import users
+
+    run(users.update, user["id"], {"interests": ["history", "views"], "budget": "medium"})
+    prefs = normalize_preferences({"interests": ["history", "views"], "budget": "medium"})
+    catalog = client.get("/places/").json()
+
+    response = client.get("/recommendations/", headers=user_headers)
+
+    assert response.status_code == 200
+    assert [(place["id"], place["score"]) for place in response.json()["recommendations"]] == (
+        ranked_by_score_place(catalog, prefs, user["id"], 5)
+    )
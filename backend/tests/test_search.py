@@ -0,0 +1,84 @@
+# tests/test_search.py
+"""Full-text search (GET /places/search) and the SearchIndex behind it."""
+import pytest
+
+from app.utils import search
+from app.utils.search import SearchIndex
+
+
+def _search(client, q: str) -> list:
+    response = client.get("/places/search", params={"q": q})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _names(results: list) -> list:
+    return [result["name"] for result in results]
+
+
+def test_search_folds_case_and_maltese_letters(client, places):
+    results = _search(client, "MELLIEHA")
+
+    assert _names(results) == ["Mellieħa Bay"]
+    assert results[0]["score"] > 0
+
+
+def test_search_ranks_name_matches_first(client, places):
+    assert _names(_search(client, "dingli")) == ["Dingli Cliffs", "Diar il-Bniet"]
+
+
+def test_search_tolerates_one_typo_at_a_lower_score(client, places):
+    (exact,) = _search(client, "cathedral")
+    (fuzzy,) = _search(client, "cathedarl")  # swapped letters
+
+    assert exact["name"] == fuzzy["name"] == "St. John's Co-Cathedral"
+    assert fuzzy["score"] < exact["score"]
+    assert _search(client, "cathxdxal") == []  # two edits away
+
+
+def test_search_follows_admin_writes(client, admin_headers, places):
+    place = places[0]
+    assert _search(client, "azure") == []
+
+    body = {"name": "Azure Window", "category": place["category"]}
+    client.put(f"/admin/places/{place['id']}", json=body, headers=admin_headers)
+    assert [result["id"] for result in _search(client, "azure")] == [place["id"]]
+
+    client.delete(f"/admin/places/{place['id']}", headers=admin_headers)
+    assert _search(client, "azure") == []
+
+
+def _scores(index: SearchIndex, query: str) -> dict:
+    return {place["id"]: score for place, score in index.search(query, 1000)}
+
+
+def test_updates_reuse_their_slot(synthetic_catalog):
+    index = SearchIndex()
+    index.rebuild(synthetic_catalog)
+
+    for place in synthetic_catalog[:500]:
+        index.upsert({**place, "name": place["name"] + " Harbour"})
+
+    assert len(index._places) == len(index) == len(synthetic_catalog)
+    assert len(_scores(index, "harbour")) >= 500
+
+
+def test_removals_are_compacted_and_scores_match_a_fresh_index(synthetic_catalog, monkeypatch):
+    monkeypatch.setattr(search, "COMPACT_MIN_DEAD", 10)
+    index = SearchIndex()
+    index.rebuild(synthetic_catalog)
+
+    kept = synthetic_catalog[::3]
+    for place in synthetic_catalog[1::3] + synthetic_catalog[2::3]:
+        index.remove(place["id"])
+    index.upsert({**kept[0], "name": "Renamed"})
+    kept = [{**kept[0], "name": "Renamed"}] + kept[1:]
+
+    assert len(index) == len(kept)
+    dead = len(index._places) - len(index)
+    assert dead < max(search.COMPACT_MIN_DEAD, search.COMPACT_DEAD_FRACTION * len(index))
+    fresh = SearchIndex()
+    fresh.rebuild(kept)
+    for query in ("beach", "museum sunset", "renamed", "valetta"):
+        expected = _scores(fresh, query)
+        assert _scores(index, query) == pytest.approx(expected), query
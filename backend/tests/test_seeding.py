@@ -0,0 +1,97 @@
+# tests/test_seeding.py
+"""seed_catalog.py: both seed files merge by name, migrate only rewrites legacy documents."""
+import os
+
+import pytest
+
+import seed_catalog
+from app.repositories import places as places_repo
+from app.utils.bulk_places import merge_document
+from app.utils.seeding import is_legacy, load_seed_file
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODERN_SEED = os.path.join(BACKEND, "seed_places.py")
+LEGACY_SEED = os.path.join(os.path.dirname(BACKEND), "seed_places.py")
+SHARED_NAME = "Ħaġar Qim Temples"
+
+
+def _stored(run) -> dict:
+    async def collect():
+        return {doc["name"]: doc async for doc in places_repo.iterate()}
+    return run(collect)
+
+
+def _load(run, *paths):
+    run(seed_catalog.load, list(paths), 100)
+
+
+def test_legacy_seed_only_fills_in_what_the_modern_place_lacks(run, capsys):
+    _load(run, MODERN_SEED)
+    before = _stored(run)[SHARED_NAME]
+
+    _load(run, LEGACY_SEED)
+
+    after = _stored(run)[SHARED_NAME]
+    for field in ("category", "description", "location", "geo", "price_level", "tags"):
+        assert after[field] == before[field], field
+    assert (after["rating"], after["duration"]) == (4.4, "2h")  # missing before, filled in
+    legacy = load_seed_file(LEGACY_SEED)
+    modern = load_seed_file(MODERN_SEED)
+    new_names = {raw["name"] for raw in legacy} - {raw["name"] for raw in modern}
+    assert f"{len(new_names)} inserted, 1 updated" in capsys.readouterr().out
+
+
+def test_loading_both_files_again_changes_nothing(run, capsys):
+    _load(run, MODERN_SEED, LEGACY_SEED)
+    first = _stored(run)
+    capsys.readouterr()
+
+    _load(run, MODERN_SEED, LEGACY_SEED)
+
+    assert _stored(run) == first
+    assert "0 inserted, 0 updated" in capsys.readouterr().out
+
+
+def test_migrate_rewrites_legacy_documents_only(run):
+    modern = {"name": "Upper Barrakka", "category": "Gardens", "tags": [], "location": {"lat": 35.89, "lng": 14.51}}
+    legacy = {"name": "Old Entry", "type": "Beach", "category": "Beach", "price": "€€", "location": "Sliema, Malta"}
+    run(places_repo.insert, dict(modern))
+    run(places_repo.insert, dict(legacy))
+
+    run(seed_catalog.migrate, 100)
+
+    stored = _stored(run)
+    assert stored["Upper Barrakka"]["category"] == "Gardens" and stored["Upper Barrakka"]["tags"] == []
+    migrated = stored["Old Entry"]
+    assert not is_legacy(migrated)
+    assert (migrated["category"], migrated["price_level"], migrated["tags"]) == ("beach", "medium", ["beach"])
+    assert migrated["location"] == {"address": "Sliema, Malta"}
+
+
+STORED = {"name": "Golden Bay", "category": "beach", "tags": ["swimming"],
+          "location": {"lat": 35.93, "lng": 14.34}, "geo": {"type": "Point", "coordinates": [14.34, 35.93]}}
+
+
+@pytest.mark.parametrize("doc, fill_only, expected", [
+    # An address never replaces coordinates, so geo stays
+    ({"name": "Golden Bay", "location": {"address": "Mellieħa"}, "rating": 4.5}, False,
+     ({"name": "Golden Bay", "rating": 4.5}, ())),
+    # Fill-only docs add missing fields and nothing else
+    ({"name": "Golden Bay", "category": "attraction", "tags": ["attraction"], "duration": "2h"}, True,
+     ({"duration": "2h"}, ())),
+    # New coordinates bring their geo along
+    ({"name": "Golden Bay", "location": {"lat": 35.94, "lng": 14.35},
+      "geo": {"type": "Point", "coordinates": [14.35, 35.94]}}, False,
+     ({"name": "Golden Bay", "location": {"lat": 35.94, "lng": 14.35},
+       "geo": {"type": "Point", "coordinates": [14.35, 35.94]}}, ())),
+])
+def test_merge_document(doc, fill_only, expected):
+    assert merge_document(STORED, doc, fill_only) == expected
+
+
+def test_merge_document_drops_geo_when_the_written_location_has_no_coordinates():
+    stored = {"name": "Comino Caves", "location": {}, "geo": {"type": "Point", "coordinates": [14.33, 36.01]}}
+
+    assert merge_document(stored, {"name": "Comino Caves", "location": {"address": "Comino"}}) == (
+        {"name": "Comino Caves", "location": {"address": "Comino"}}, ("geo",),
+    )
@@ -0,0 +1,136 @@
+# tests/test_static_files.py
+"""Place images are served with validators: 304 on a match, 206 for ranges, If-Range."""
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.utils.static_files import IMMUTABLE_CACHE_CONTROL, MUTABLE_CACHE_CONTROL, PlaceImageFiles, parse_range
+
+DIGEST = "ab" * 32
+HASHED = f"{DIGEST}.png"
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / HASHED).write_bytes(CONTENT)
+    (tmp_path / "old-photo.jpg").write_bytes(CONTENT)
+    (tmp_path / "notes.json").write_bytes(b'{"a": 1}')
+    (tmp_path / "notes.json.gz").write_bytes(gzip.compress(b'{"a": 1}'))
+    return TestClient(PlaceImageFiles(str(tmp_path)))
+
+
+def test_content_addressed_file_is_immutable_with_its_hash_as_etag(files):
+    response = files.get(f"/{HASHED}")
+
+    assert response.status_code == 200 and response.content == CONTENT
+    assert response.headers["etag"] == f'"{DIGEST}"'
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert (response.headers["content-type"], response.headers["accept-ranges"]) == ("image/png", "bytes")
+
+
+def test_other_files_get_a_short_max_age(files):
+    assert files.get("/old-photo.jpg").headers["cache-control"] == MUTABLE_CACHE_CONTROL
+
+
+@pytest.mark.parametrize("validator", [
+    {"If-None-Match": f'"other", W/"{DIGEST}"'},
+    {"If-None-Match": "*"},
+    {"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"},
+])
+def test_matching_validator_answers_304_without_a_body(files, validator):
+    response = files.get(f"/{HASHED}", headers=validator)
+
+    assert response.status_code == 304 and response.content == b""
+    assert response.headers["etag"] == f'"{DIGEST}"'
+
+
+def test_if_none_match_wins_over_if_modified_since(files):
+    response = files.get(f"/{HASHED}", headers={
+        "If-None-Match": '"other"', "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT",
+    })
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=1000-", 1000, 1023),
+    ("bytes=-24", 1000, 1023),
+    ("bytes=1000-5000", 1000, 1023),
+])
+def test_single_range_answers_206(files, header, start, end):
+    response = files.get(f"/{HASHED}", headers={"Range": header})
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(CONTENT)}"
+    assert response.content == CONTENT[start:end + 1]
+
+
+def test_unsatisfiable_range_answers_416_and_bad_ones_are_ignored(files):
+    refused = files.get(f"/{HASHED}", headers={"Range": "bytes=5000-"})
+    ignored = files.get(f"/{HASHED}", headers={"Range": "bytes=0-1,5-6"})
+
+    assert refused.status_code == 416
+    assert refused.headers["content-range"] == f"bytes */{len(CONTENT)}"
+    assert ignored.status_code == 200 and ignored.content == CONTENT
+
+
+@pytest.mark.parametrize("if_range, status", [
+    (f'"{DIGEST}"', 206),
+    ('"stale"', 200),
+    (f'W/"{DIGEST}"', 200),  # If-Range needs a strong match
+    ("Fri, 01 Jan 2100 00:00:00 GMT", 206),
+    ("Thu, 01 Jan 1970 00:00:00 GMT", 200),
+])
+def test_if_range_only_honours_the_range_for_the_current_representation(files, if_range, status):
+    response = files.get(f"/{HASHED}", headers={"Range": "bytes=0-9", "If-Range": if_range})
+
+    assert response.status_code == status
+    assert response.content == (CONTENT[:10] if status == 206 else CONTENT)
+
+
+def test_head_sends_headers_only(files):
+    response = files.head(f"/{HASHED}")
+
+    assert response.status_code == 200 and response.content == b""
+    assert response.headers["content-length"] == str(len(CONTENT))
+
+
+def test_precompressed_sibling_is_served_to_clients_accepting_it(files):
+    plain = files.get("/notes.json", headers={"Accept-Encoding": "identity"})
+    zipped = files.get("/notes.json", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert plain.content == zipped.content == b'{"a": 1}'
+    assert "content-encoding" not in plain.headers
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.headers["etag"] != plain.headers["etag"]
+    assert zipped.headers["vary"] == "accept-encoding"
+
+
+@pytest.mark.parametrize("path", ["/missing.png", "/.upload-123", "/%2e%2e/secret"])
+def test_missing_and_hidden_files_are_404(files, path):
+    assert files.get(path).status_code == 404
+
+
+def test_only_get_and_head_are_allowed(files):
+    response = files.post(f"/{HASHED}")
+
+    assert response.status_code == 405 and response.headers["allow"] == "GET, HEAD"
+
+
+def test_parse_range_edge_cases():
+    assert parse_range("bytes=-5000", 100) == (0, 99)
+    assert parse_range("bytes=-", 100) is None
+    assert parse_range("items=0-5", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=-0", 100)
+    with pytest.raises(ValueError):
+        parse_range("bytes=9-3", 100)
+
+
+def test_app_mounts_place_images_before_generic_static(client):
+    response = client.get("/static/places/bleu_lagoon.jpeg", headers={"Range": "bytes=0-1"})
+
+    assert response.status_code == 206 and response.content == b"\xff\xd8"
@@ -0,0 +1,69 @@
+# tests/test_suggest.py
+"""Type-ahead (GET /places/suggest) and the prefix index behind it."""
+import random
+
+from app.utils import suggest
+from app.utils.suggest import SuggestIndex
+
+
+def _suggest(client, prefix: str, limit: int = 5) -> dict:
+    response = client.get("/places/suggest", params={"prefix": prefix, "limit": limit})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_suggest_ranks_places_by_rating_and_terms_by_use(client, places):
+    suggestions = _suggest(client, "B")
+
+    assert [place["name"] for place in suggestions["places"]] == [
+        "Blue Lagoon", "Diar il-Bniet", "Golden Bay", "Mellieħa Bay",
+    ]
+    assert [(term["type"], term["value"], term["places"]) for term in suggestions["terms"]] == [
+        ("category", "beach", 3), ("tag", "bar", 1),
+    ]
+
+
+def test_suggest_matches_any_word_of_a_name_ignoring_accents(client, places):
+    assert [place["name"] for place in _suggest(client, "mellieha b")["places"]] == ["Mellieħa Bay"]
+    assert [place["name"] for place in _suggest(client, "co-cath")["places"]] == ["St. John's Co-Cathedral"]
+    assert _suggest(client, "golden ")["places"][0]["name"] == "Golden Bay"
+    assert _suggest(client, "goldenb") == {"places": [], "terms": []}
+
+
+def test_suggest_follows_admin_writes(client, admin_headers, places):
+    mellieha = places[2]
+    body = {"name": mellieha["name"], "category": mellieha["category"], "rating": 5.0, "tags": ["boat"]}
+    client.put(f"/admin/places/{mellieha['id']}", json=body, headers=admin_headers)
+    client.delete(f"/admin/places/{places[0]['id']}", headers=admin_headers)
+
+    suggestions = _suggest(client, "b")
+
+    assert [place["name"] for place in suggestions["places"]] == ["Mellieħa Bay", "Diar il-Bniet", "Golden Bay"]
+    assert [(term["value"], term["places"]) for term in suggestions["terms"]] == [
+        ("beach", 2), ("bar", 1), ("boat", 1),
+    ]
+
+
+def test_patched_top_lists_match_a_fresh_index(synthetic_catalog, monkeypatch):
+    monkeypatch.setattr(suggest, "SCAN_LIMIT", 4)  # every prefix below uses a kept top list
+    prefixes = ["a", "b", "m", "s", "th", "ma", "the "]
+    index = SuggestIndex()
+    index.rebuild(synthetic_catalog)
+    for prefix in prefixes:
+        index.suggest(prefix, suggest.MAX_SUGGESTIONS)
+
+    rng = random.Random(5)
+    current = {place["id"]: place for place in synthetic_catalog}
+    for place in rng.sample(synthetic_catalog, 600):
+        if rng.random() < 0.3:
+            index.remove(place["id"])
+            del current[place["id"]]
+        else:
+            changed = {**place, "rating": round(rng.uniform(1, 5), 1), "tags": rng.sample(["bay", "boat", "market"], 2)}
+            index.upsert(changed)
+            current[place["id"]] = changed
+
+    fresh = SuggestIndex()
+    fresh.rebuild(list(current.values()))
+    for prefix in prefixes:
+        assert index.suggest(prefix, suggest.MAX_SUGGESTIONS) == fresh.suggest(prefix, suggest.MAX_SUGGESTIONS), prefix
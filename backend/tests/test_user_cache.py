@@ -0,0 +1,85 @@
+# tests/test_user_cache.py
+"""The user lookup cache shared by the auth dependencies."""
+from bson import ObjectId
+
+from app.repositories import users
+from app.utils.user_cache import UserCache, user_cache
+
+
+def _count_lookups(monkeypatch) -> list:
+    calls = []
+    get = users.get
+
+    async def counting_get(user_id):
+        calls.append(user_id)
+        return await get(user_id)
+
+    monkeypatch.setattr(users, "get", counting_get)
+    return calls
+
+
+def test_repeat_requests_skip_the_user_lookup(client, user, user_headers, monkeypatch):
+    lookups = _count_lookups(monkeypatch)
+    before = user_cache.stats_dict()
+
+    for _ in range(3):
+        response = client.get("/users/me", headers=user_headers)
+        assert response.status_code == 200
+        assert response.json()["email"] == user["email"]
+
+    assert lookups == [user["id"]]
+    after = user_cache.stats_dict()
+    assert (after["misses"] - before["misses"], after["hits"] - before["hits"]) == (1, 2)
+
+
+def test_invalidate_makes_the_next_lookup_read_the_store(client, run, user, user_headers):
+    client.get("/users/me", headers=user_headers)
+    invalidations = user_cache.stats.invalidations
+    run(users.update, user["id"], {"name": "Renamed"})
+    assert client.get("/users/me", headers=user_headers).json()["name"] == "Tess"
+
+    user_cache.invalidate(ObjectId(user["id"]))
+
+    assert client.get("/users/me", headers=user_headers).json()["name"] == "Renamed"
+    assert user_cache.stats.invalidations == invalidations + 1
+
+
+def test_returned_users_are_copies(run, user):
+    first = run(user_cache.get, user["id"])
+    first["role"] = "admin"
+
+    assert run(user_cache.get, user["id"])["role"] == "user"
+
+
+def test_missing_users_are_not_cached(run, monkeypatch):
+    lookups = _count_lookups(monkeypatch)
+    missing = str(ObjectId())
+
+    assert run(user_cache.get, missing) is None
+    assert run(user_cache.get, missing) is None
+    assert len(lookups) == 2
+
+
+def test_least_recently_used_entries_are_evicted(run, monkeypatch):
+    ids = [run(users.create, {"email": f"u{i}@example.com"}) for i in range(3)]
+    cache = UserCache(maxsize=2, ttl_seconds=60)
+    lookups = _count_lookups(monkeypatch)
+
+    for user_id in (ids[0], ids[1], ids[0], ids[2], ids[0], ids[1]):
+        run(cache.get, user_id)
+
+    # ids[1] was least recently used when ids[2] came in
+    assert lookups == [ids[0], ids[1], ids[2], ids[1]]
+    assert cache.stats_dict()["evictions"] == 2
+    assert cache.stats_dict()["size"] == 2
+
+
+def test_entries_expire_after_the_ttl(run, user, monkeypatch):
+    cache = UserCache(maxsize=10, ttl_seconds=0)
+    lookups = _count_lookups(monkeypatch)
+
+    run(cache.get, user["id"])
+    run(cache.get, user["id"])
+
+    assert len(lookups) == 2
+    assert cache.stats.expired == 1
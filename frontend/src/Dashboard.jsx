@@ -20,6 +20,16 @@ const getPlaceImageUrl = (place) => {
   return place.image;
 };
 
+// Resized WebP variants built by the backend after an upload, as a srcset
+const getPlaceSrcSet = (place) => {
+  const srcset = place.image_variants && place.image_variants.srcset;
+  if (!srcset) return undefined;
+  return srcset
+    .split(", ")
+    .map((entry) => (entry.startsWith("/static/") ? `${BACKEND_BASE_URL}${entry}` : entry))
+    .join(", ");
+};
+
 const getMapsEmbedUrl = (place) => {
   if (
     place.location &&
@@ -185,8 +195,12 @@ function Dashboard() {
 
               <img
                 src={getPlaceImageUrl(place)}
+                srcSet={getPlaceSrcSet(place)}
+                sizes="(max-width: 600px) 100vw, 400px"
+                loading="lazy"
                 alt={place.name}
                 onError={(e) => {
+                  e.target.removeAttribute("srcset");
                   e.target.src = getPlaceImageUrl(place);
                 }}
               />